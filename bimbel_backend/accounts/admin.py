@@ -82,7 +82,8 @@ class AssignmentsAdmin(admin.ModelAdmin):
 
 @admin.register(StudentClasses)
 class StudentClassesAdmin(admin.ModelAdmin):
-    list_display = ('id', 'student', 'class_field')
+    list_display = ('id', 'student', 'class_field', 'is_current')
+    list_filter = ('is_current',)
     search_fields = ('student__full_name', 'class_field__class_name')
 
 @admin.register(TutorClasses)
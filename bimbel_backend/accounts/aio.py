@@ -0,0 +1,43 @@
+# accounts/aio.py
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+from bimbel_backend.query_budget import capture_thread_queries
+from bimbel_backend.renderers import ORJSONRenderer
+
+_renderer = ORJSONRenderer()
+
+
+def run_query_groups(groups):
+    """Versi sync: grup query {nama: callable} dijalankan berurutan di thread request."""
+    return {name: build() for name, build in groups.items()}
+
+
+def _run_in_worker(build):
+    # Setiap thread worker punya koneksi DB sendiri; kembalikan ke pool/tutup setelah grup selesai
+    try:
+        with capture_thread_queries():
+            return build()
+    finally:
+        close_old_connections()
+
+
+async def gather_query_groups(groups):
+    """
+    Versi async: setiap grup query jalan bersamaan di thread worker terpisah (koneksi DB sendiri),
+    jadi latensi dashboard ≈ grup paling lambat, bukan jumlah semuanya.
+    Hasilnya sama dengan run_query_groups().
+    """
+    names = list(groups)
+    results = await asyncio.gather(*(
+        sync_to_async(_run_in_worker, thread_sensitive=False)(groups[name]) for name in names
+    ))
+    return dict(zip(names, results))
+
+
+def json_response(data, status=200):
+    """Response JSON (orjson, sama dengan renderer DRF) untuk view async non-DRF."""
+    return HttpResponse(_renderer.render(data), content_type="application/json", status=status)
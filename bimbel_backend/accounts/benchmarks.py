@@ -0,0 +1,284 @@
+# accounts/benchmarks.py
+import asyncio
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count, Exists, OuterRef
+from django.test import AsyncClient, Client, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from bimbel_backend.query_budget import QUERY_BUDGET_APPS, QueryRecorder, view_key
+
+from .models import (
+    Assignments,
+    Attendance,
+    Feedbacks,
+    Materials,
+    Schedules,
+    StudentClasses,
+    Students,
+    Subjects,
+    TutorClasses,
+    Tutors,
+    Users,
+)
+
+ROUTE_PARAM_RE = re.compile(r"<(?:\w+:)?(\w+)>")
+
+
+def _walk(patterns, prefix=""):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from _walk(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern):
+            yield prefix + str(pattern.pattern), pattern
+
+
+def _first(qs):
+    return qs.order_by("id").values_list("id", flat=True).first()
+
+
+def build_fixtures():
+    """Principal, id contoh & query param per app dari data yang ada (dump bimbel_db.sql / data sintetis)."""
+    admin = Users.objects.filter(role="admin", is_active=True).order_by("id").first()
+    tutor = Tutors.objects.annotate(n=Count("schedules")).order_by("-n", "id").first()
+    student = (
+        Students.objects
+        .annotate(n=Count("attendance"), has_feedback=Exists(Feedbacks.objects.filter(student=OuterRef("pk"))))
+        .order_by("-has_feedback", "-n", "id")
+        .first()
+    )
+
+    fixtures = {}
+    if admin:
+        fixtures["admin_panel"] = {
+            "params": {"user_id": admin.id},
+            "student_id": student.id if student else None,
+            "tutor_id": tutor.id if tutor else None,
+            "schedule_id": _first(Schedules.objects.all()),
+            "material_id": _first(Materials.objects.all()),
+            "id": _first(Feedbacks.objects.all()),
+            "extra": {
+                "GlobalSearchView": {"q": "a"},
+                "AvailableTutorsView": {
+                    "date": date.today().isoformat(), "start_time": "08:00", "end_time": "09:30",
+                    "subject": Subjects.objects.order_by("id").values_list("name", flat=True).first() or "",
+                },
+                "AdminGradebookExportView": {
+                    "class_id": _first(Assignments.objects.values_list("class_field_id", flat=True)),
+                },
+            },
+        }
+    if tutor:
+        class_ids = TutorClasses.objects.filter(tutor=tutor).values("class_field_id")
+        fixtures["tutor_panel"] = {
+            "params": {"user_id": tutor.user_id, "class_id": class_ids.values_list("class_field_id", flat=True).first()},
+            "schedule_id": _first(Schedules.objects.filter(tutor=tutor)),
+            "material_id": _first(Materials.objects.filter(class_field_id__in=class_ids)),
+            "assignment_id": _first(Assignments.objects.filter(tutor=tutor)),
+            "student_id": _first(Students.objects.filter(studentclasses__class_field_id__in=class_ids)),
+            "feedback_id": _first(Feedbacks.objects.filter(tutor=tutor)),
+            "extra": {"TutorGlobalSearchView": {"q": "a"}},
+        }
+    if student:
+        class_id = (
+            StudentClasses.objects.filter(student=student, is_current=True).values_list("class_field_id", flat=True).first()
+        )
+        feedback_id = _first(Feedbacks.objects.filter(student=student))
+        fixtures["student_panel"] = {
+            "params": {"user_id": student.user_id, "class_id": class_id},
+            "material_id": _first(Materials.objects.filter(class_field_id=class_id, is_approved=True)),
+            "assignment_id": _first(Assignments.objects.filter(class_field_id=class_id)),
+            "schedule_id": _first(Schedules.objects.filter(class_field_id=class_id)),
+            "attendance_id": _first(Attendance.objects.filter(student=student)),
+            # id feedback siswa berformat "fb-<id>" / "sub-<id>"
+            "id": f"fb-{feedback_id}" if feedback_id else None,
+            "extra": {
+                "StudentGlobalSearchView": {"q": "a"},
+                "StudentScheduleListView": {"status": "completed"},
+            },
+        }
+    return fixtures
+
+
+def panel_get_endpoints(app=None, view=None, fixtures=None):
+    """
+    Semua endpoint GET admin_panel / tutor_panel / student_panel sebagai (view_class, path, params).
+    path None jika tidak ada data contoh untuk parameter URL-nya.
+    """
+    fixtures = build_fixtures() if fixtures is None else fixtures
+    for route, pattern in _walk(get_resolver().url_patterns):
+        view_class = getattr(pattern.callback, "view_class", None)
+        view_app = view_class.__module__.split(".")[0] if view_class else None
+        if view_app not in QUERY_BUDGET_APPS or not hasattr(view_class, "get"):
+            continue
+        if app and view_app != app:
+            continue
+        if view and view.lower() not in view_class.__name__.lower():
+            continue
+
+        app_fixtures = fixtures.get(view_app)
+        kwargs = {name: app_fixtures.get(name) for name in pattern.pattern.converters} if app_fixtures else {}
+        if app_fixtures is None or any(v is None for v in kwargs.values()):
+            yield view_class, None, None
+            continue
+
+        path = "/" + ROUTE_PARAM_RE.sub(lambda m: str(kwargs[m.group(1)]), route)
+        yield view_class, path, {**app_fixtures["params"], **app_fixtures["extra"].get(view_class.__name__, {})}
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; cukup untuk puluhan sampel per endpoint."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def _response_size(response):
+    if response.streaming:
+        return sum(len(chunk) for chunk in response.streaming_content)
+    return len(response.content)
+
+
+def benchmark_endpoint(client, path, params, repeat=20, warmup=1):
+    """Latensi (ms) p50/p95, jumlah query & ukuran response satu endpoint lewat Django test client."""
+    for _ in range(warmup):
+        _response_size(client.get(path, params))
+
+    timings = []
+    recorder = None
+    for _ in range(repeat):
+        current = QueryRecorder()
+        started = time.perf_counter()
+        with current.capture():
+            response = client.get(path, params)
+            size = _response_size(response)
+        timings.append((time.perf_counter() - started) * 1000)
+        recorder = recorder or current
+
+    return {
+        "status": response.status_code,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "max_ms": round(max(timings), 2),
+        "queries": recorder.count,
+        "db_ms": round(recorder.duration * 1000, 2),
+        "bytes": size,
+    }
+
+
+def run_panel_benchmark(repeat=20, warmup=1, app=None, view=None, use_cache=False, on_result=None):
+    """
+    Jalankan benchmark_endpoint untuk setiap endpoint panel. Cache response dimatikan kecuali
+    `use_cache`, supaya yang diukur kerja view-nya. Return list dict hasil per endpoint.
+    """
+    results = []
+    client = Client()
+    with override_settings(
+        QUERY_BUDGET_ENABLED=False,
+        RESPONSE_CACHE_ENABLED=use_cache and getattr(settings, "RESPONSE_CACHE_ENABLED", True),
+    ):
+        for view_class, path, params in panel_get_endpoints(app=app, view=view):
+            result = {"view": view_key(view_class), "path": path}
+            if path is None:
+                result["skipped"] = "tidak ada data contoh"
+            else:
+                result.update(benchmark_endpoint(client, path, params, repeat=repeat, warmup=warmup))
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Dashboard sync vs async di bawah request bersamaan
+# ---------------------------------------------------------------------------
+
+# (app, path sync, path async)
+DASHBOARD_ENDPOINTS = (
+    ("admin_panel", "/api/admin/dashboard/", "/api/admin/dashboard/async/"),
+    ("tutor_panel", "/api/tutor/home/", "/api/tutor/home/async/"),
+    ("student_panel", "/api/student/dashboard/", "/api/student/dashboard/async/"),
+)
+
+
+def _latency_summary(timings, wall, statuses):
+    return {
+        "requests": len(timings),
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "max_ms": round(max(timings), 2),
+        "throughput_rps": round(len(timings) / wall, 1) if wall else None,
+        "errors": sum(1 for code in statuses if code >= 400),
+    }
+
+
+def benchmark_sync_concurrent(path, params, concurrency, requests):
+    """`requests` request ke view sync oleh `concurrency` thread (seperti worker gthread)."""
+    def one(_):
+        try:
+            started = time.perf_counter()
+            response = Client().get(path, params)
+            return (time.perf_counter() - started) * 1000, response.status_code
+        finally:
+            close_old_connections()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    return _latency_summary([t for t, _ in results], wall, [code for _, code in results])
+
+
+def benchmark_async_concurrent(path, params, concurrency, requests):
+    """`requests` request ke view async, maksimal `concurrency` sekaligus dalam satu event loop."""
+    async def run():
+        client = AsyncClient()
+        limit = asyncio.Semaphore(concurrency)
+
+        async def one():
+            async with limit:
+                started = time.perf_counter()
+                response = await client.get(path, params)
+                return (time.perf_counter() - started) * 1000, response.status_code
+
+        return await asyncio.gather(*(one() for _ in range(requests)))
+
+    started = time.perf_counter()
+    results = asyncio.run(run())
+    wall = time.perf_counter() - started
+    return _latency_summary([t for t, _ in results], wall, [code for _, code in results])
+
+
+def run_dashboard_benchmark(concurrency_levels=(1, 10, 50), requests=100, app=None, on_result=None):
+    """
+    Bandingkan dashboard sync vs async per tingkat konkurensi. Cache response dimatikan supaya
+    yang diukur query-nya. Test client berjalan in-process: angka absolut tidak sama dengan
+    uvicorn/gunicorn, tapi perbandingan sync vs async pada data yang sama tetap berlaku.
+    """
+    fixtures = build_fixtures()
+    results = []
+    with override_settings(QUERY_BUDGET_ENABLED=False, RESPONSE_CACHE_ENABLED=False):
+        for view_app, sync_path, async_path in DASHBOARD_ENDPOINTS:
+            if app and view_app != app:
+                continue
+            app_fixtures = fixtures.get(view_app)
+            if app_fixtures is None:
+                continue
+            params = {"user_id": app_fixtures["params"]["user_id"]}
+            Client().get(sync_path, params)  # warmup: import, koneksi, cache ORM
+            for concurrency in concurrency_levels:
+                result = {
+                    "app": view_app,
+                    "concurrency": concurrency,
+                    "sync": benchmark_sync_concurrent(sync_path, params, concurrency, requests),
+                    "async": benchmark_async_concurrent(async_path, params, concurrency, requests),
+                }
+                results.append(result)
+                if on_result:
+                    on_result(result)
+    return results
@@ -0,0 +1,250 @@
+# accounts/blobs.py
+import hashlib
+import os
+import re
+import uuid
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Assignments, AssignmentSubmissions, Materials, MediaBlobs
+
+BLOB_DIR = "blobs"
+BLOB_TMP_DIR = "uploads_tmp"
+BLOB_STREAM_BLOCK = 1024 * 1024
+BLOB_GRACE_HOURS = 24  # blob tanpa referensi baru dihapus setelah sekian jam (lihat gc_media_blobs)
+BLOB_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+# Model yang file_url-nya dihitung sebagai referensi blob
+BLOB_FILE_MODELS = (Materials, Assignments, AssignmentSubmissions)
+LEGACY_MEDIA_DIRS = ("material", "tugas", "jawaban_tugas")
+
+BLOB_RE = re.compile(r"(?:^|/)" + BLOB_DIR + r"/[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64})(?:\.\w+)?$")
+
+
+def blob_name(sha256, ext=""):
+    """blobs/ab/cd/<sha256>.<ext> — dua level shard supaya satu folder tidak berisi ribuan file."""
+    ext = f".{ext.lower()}" if ext else ""
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext}"
+
+
+def blob_sha_from_url(file_url):
+    """sha256 dari file_url blob ("blobs/..." atau "/media/blobs/..."), None untuk file lama."""
+    match = BLOB_RE.search(file_url or "")
+    return match.group(1) if match else None
+
+
+def relative_media_path(file_url):
+    # file_url di database tidak seragam: "material/x.pdf" vs "/media/tugas/x.pdf"
+    file_url = file_url or ""
+    if file_url.startswith(settings.MEDIA_URL):
+        return file_url[len(settings.MEDIA_URL):]
+    return file_url.lstrip("/")
+
+
+def _tmp_path():
+    path = os.path.join(settings.MEDIA_ROOT, BLOB_TMP_DIR, f"{uuid.uuid4().hex}.blob")
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def _iter_blocks(fileobj):
+    if hasattr(fileobj, "chunks"):
+        return fileobj.chunks(BLOB_STREAM_BLOCK)
+    return iter(lambda: fileobj.read(BLOB_STREAM_BLOCK), b"")
+
+
+def hash_file(full_path):
+    """(sha256 hex, size) dari file di disk."""
+    sha = hashlib.sha256()
+    size = 0
+    with open(full_path, "rb") as f:
+        for block in iter(lambda: f.read(BLOB_STREAM_BLOCK), b""):
+            sha.update(block)
+            size += len(block)
+    return sha.hexdigest(), size
+
+
+def store_blob(fileobj, ext=""):
+    """
+    Simpan file (UploadedFile / file object) sebagai blob. Hash dihitung sambil menulis,
+    jadi file hanya dibaca sekali. Return path storage, mis. "blobs/ab/cd/<sha256>.pdf".
+    """
+    tmp_path = _tmp_path()
+    sha = hashlib.sha256()
+    size = 0
+    try:
+        with open(tmp_path, "wb") as out:
+            for block in _iter_blocks(fileobj):
+                sha.update(block)
+                out.write(block)
+                size += len(block)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return commit_blob(tmp_path, sha.hexdigest(), size, ext)
+
+
+def store_uploaded_file(uploaded_file):
+    ext = os.path.splitext(uploaded_file.name or "")[1][1:]
+    return store_blob(uploaded_file, ext)
+
+
+def commit_blob(tmp_path, sha256, size, ext=""):
+    """Pindahkan file sementara ke path blob-nya; jika isi yang sama sudah ada, file sementara dibuang."""
+    # Lock baris blob supaya tidak bentrok dengan collect_unreferenced_blobs
+    with transaction.atomic():
+        blob, created = MediaBlobs.objects.select_for_update().get_or_create(
+            sha256=sha256,
+            defaults={"path": blob_name(sha256, ext), "size": size},
+        )
+        if not created:
+            # Perpanjang masa tenggang GC: blob ini akan segera direferensikan lagi
+            MediaBlobs.objects.filter(sha256=sha256).update(updated_at=timezone.now())
+
+        full_path = os.path.join(settings.MEDIA_ROOT, blob.path)
+        if os.path.exists(full_path):
+            os.remove(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(tmp_path, full_path)
+    return blob.path
+
+
+def add_blob_refs(sha256, delta):
+    MediaBlobs.objects.filter(sha256=sha256).update(
+        ref_count=F("ref_count") + delta,
+        updated_at=timezone.now(),
+    )
+
+
+def legacy_full_path(path):
+    """Path absolut file lama (material/, tugas/, jawaban_tugas/) di MEDIA_ROOT, None jika tidak ada."""
+    if not path or path.split("/", 1)[0] not in LEGACY_MEDIA_DIRS:
+        return None
+    full_path = os.path.realpath(os.path.join(settings.MEDIA_ROOT, path))
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    if not full_path.startswith(media_root + os.sep) or not os.path.isfile(full_path):
+        return None
+    return full_path
+
+
+def delete_legacy_file(file_url):
+    """Hapus file lama (non-blob) jika tidak ada baris lain yang masih memakainya."""
+    path = relative_media_path(file_url)
+    full_path = legacy_full_path(path)
+    if full_path is None:
+        return False
+
+    candidates = [path, f"/{path}", settings.MEDIA_URL + path]
+    if any(model.objects.filter(file_url__in=candidates).exists() for model in BLOB_FILE_MODELS):
+        return False
+    os.remove(full_path)
+    return True
+
+
+def release_media_file(file_url):
+    """File tidak lagi dipakai satu baris: kurangi ref blob, atau hapus file lama setelah commit."""
+    sha256 = blob_sha_from_url(file_url)
+    if sha256:
+        add_blob_refs(sha256, -1)
+    elif file_url:
+        transaction.on_commit(lambda: delete_legacy_file(file_url))
+
+
+def recount_blob_refs():
+    """Hitung ulang ref_count dari tabel sumber (perbaikan jika ada update/delete di luar ORM)."""
+    counts = Counter()
+    for model in BLOB_FILE_MODELS:
+        urls = model.objects.filter(file_url__contains=f"{BLOB_DIR}/").values_list("file_url", flat=True)
+        for file_url in urls.iterator():
+            sha256 = blob_sha_from_url(file_url)
+            if sha256:
+                counts[sha256] += 1
+
+    fixed = 0
+    for sha256, ref_count in MediaBlobs.objects.values_list("sha256", "ref_count").iterator():
+        if ref_count != counts.get(sha256, 0):
+            MediaBlobs.objects.filter(sha256=sha256).update(ref_count=counts.get(sha256, 0))
+            fixed += 1
+    return fixed
+
+
+def collect_unreferenced_blobs(hours=BLOB_GRACE_HOURS):
+    """Hapus blob dengan ref_count 0 yang tidak disentuh selama `hours` jam. Return (jumlah, byte)."""
+    cutoff = timezone.now() - timedelta(hours=hours)
+    candidates = MediaBlobs.objects.filter(ref_count__lte=0, updated_at__lt=cutoff).values_list("sha256", flat=True)
+
+    removed = freed = 0
+    for sha256 in list(candidates):
+        with transaction.atomic():
+            # Cek ulang di dalam lock: upload baru dengan isi sama bisa saja baru masuk
+            blob = (
+                MediaBlobs.objects.select_for_update()
+                .filter(sha256=sha256, ref_count__lte=0, updated_at__lt=cutoff)
+                .first()
+            )
+            if blob is None:
+                continue
+            blob.delete()
+            full_path = os.path.join(settings.MEDIA_ROOT, blob.path)
+            if os.path.exists(full_path):
+                os.remove(full_path)
+            removed += 1
+            freed += blob.size
+    return removed, freed
+
+
+def migrate_legacy_files(dry_run=False, keep_originals=False):
+    """
+    Ubah file lama (nama uuid/timestamp per upload) menjadi blob dan arahkan file_url ke blob.
+    File yang isinya sama otomatis jadi satu blob. Return statistik untuk laporan command.
+    """
+    stats = Counter()
+    converted = {}  # path lama -> path blob
+    sizes = {}  # path blob -> ukuran
+
+    for model in BLOB_FILE_MODELS:
+        rows = model.objects.exclude(file_url__isnull=True).exclude(file_url="").values_list("pk", "file_url")
+        for pk, file_url in rows.iterator():
+            if blob_sha_from_url(file_url):
+                continue
+
+            path = relative_media_path(file_url)
+            if path not in converted:
+                full_path = legacy_full_path(path)
+                if full_path is None:
+                    stats["missing"] += 1
+                    continue
+
+                ext = os.path.splitext(path)[1][1:]
+                if dry_run:
+                    sha256, size = hash_file(full_path)
+                    converted[path] = blob_name(sha256, ext)
+                else:
+                    size = os.path.getsize(full_path)
+                    with open(full_path, "rb") as f:
+                        converted[path] = store_blob(f, ext)
+                sizes[converted[path]] = size
+                stats["files"] += 1
+                stats["bytes_before"] += size
+
+            # Pertahankan format file_url per tabel ("material/.." vs "/media/tugas/..")
+            new_url = file_url[:len(file_url) - len(path)] + converted[path]
+            if not dry_run:
+                # .update() tanpa signal; ref_count dihitung ulang sekaligus di akhir
+                model.objects.filter(pk=pk, file_url=file_url).update(file_url=new_url)
+            stats["rows"] += 1
+
+    stats["blobs"] = len(sizes)
+    stats["bytes_after"] = sum(sizes.values())
+
+    if not dry_run:
+        recount_blob_refs()
+        if not keep_originals:
+            stats["deleted"] = sum(1 for path in converted if delete_legacy_file(path))
+    return stats
@@ -0,0 +1,129 @@
+# accounts/cache.py
+import hashlib
+import time
+from datetime import date
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+from bimbel_backend.db_routing import primary_if_recent
+
+TAG_PREFIX = "tag:"
+RESPONSE_PREFIX = "resp:"
+
+
+def get_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def get_tag_versions(tags, create=False):
+    """Ambil versi tiap tag. Tag yang belum ada dibuat (create=True) atau dianggap None."""
+    cache = get_cache()
+    keys = {TAG_PREFIX + t: t for t in tags}
+    found = cache.get_many(keys.keys())
+
+    missing = [k for k in keys if k not in found]
+    if missing and create:
+        for key in missing:
+            # add() supaya tidak menimpa versi yang baru saja dibuat worker lain
+            cache.add(key, _new_version(), timeout=None)
+        found.update(cache.get_many(missing))
+
+    return {keys[k]: found.get(k) for k in keys}
+
+
+def invalidate_tags(*tags):
+    """Naikkan versi tag; semua response yang menyimpan versi lama otomatis kedaluwarsa."""
+    tags = {t for t in tags if t}
+    if not tags:
+        return
+    version = _new_version()
+    get_cache().set_many({TAG_PREFIX + t: version for t in tags}, timeout=None)
+
+
+def invalidate_tags_on_commit(*tags):
+    transaction.on_commit(lambda: invalidate_tags(*tags))
+
+
+def cached_value(key, tags, builder, timeout=None):
+    """
+    Cache hasil `builder()` (dict/list biasa) dengan invalidasi tag yang sama seperti cache_response.
+    Dipakai untuk objek ringkasan yang dibagi beberapa view/parameter.
+    """
+    if not getattr(settings, "RESPONSE_CACHE_ENABLED", True):
+        return builder()
+
+    cache = get_cache()
+    cached = cache.get(key)
+    if cached is not None:
+        versions, value = cached
+        if versions == get_tag_versions(tags):
+            return value
+
+    versions = get_tag_versions(tags, create=True)
+    with primary_if_recent(versions):
+        value = builder()
+    ttl = timeout if timeout is not None else getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)
+    cache.set(key, (versions, value), ttl)
+    return value
+
+
+def build_cache_key(request, view_name):
+    params = sorted(request.query_params.lists())
+    user = getattr(request, "user", None)
+    principal = user.pk if user is not None and user.is_authenticated else "anon"
+    # Host ikut kunci: response bisa berisi URL absolut (build_absolute_uri)
+    raw = f"{view_name}|{request.get_host()}|{request.path}|{principal}|{params}|{date.today().isoformat()}"
+    return RESPONSE_PREFIX + view_name + ":" + hashlib.md5(raw.encode()).hexdigest()
+
+
+def cache_response(tags=None, timeout=None):
+    """
+    Cache response GET per principal + query params dengan tag invalidasi.
+
+    `tags` boleh list statis atau callable(request, *args, **kwargs) yang mengembalikan
+    list tag; jika callable mengembalikan None response tidak di-cache (mis. user tidak valid).
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD") or not getattr(settings, "RESPONSE_CACHE_ENABLED", True):
+                return view_method(self, request, *args, **kwargs)
+
+            resolved = tags(request, *args, **kwargs) if callable(tags) else list(tags or [])
+            if resolved is None:
+                return view_method(self, request, *args, **kwargs)
+
+            cache = get_cache()
+            view_name = f"{type(self).__module__}.{type(self).__name__}"
+            key = build_cache_key(request, view_name)
+
+            cached = cache.get(key)
+            if cached is not None:
+                versions, status_code, data = cached
+                if versions == get_tag_versions(resolved):
+                    response = Response(data, status=status_code)
+                    response["X-Cache"] = "HIT"
+                    return response
+
+            # Versi diambil sebelum view jalan: write yang terjadi di tengah membuat entry ini basi
+            versions = get_tag_versions(resolved, create=True)
+            # Data yang baru berubah mungkin belum sampai di replica: jangan simpan versi basi ke cache
+            with primary_if_recent(versions):
+                response = view_method(self, request, *args, **kwargs)
+
+            if response.status_code == 200 and isinstance(response, Response):
+                ttl = timeout if timeout is not None else getattr(settings, "RESPONSE_CACHE_TIMEOUT", 60)
+                cache.set(key, (versions, response.status_code, response.data), ttl)
+                response["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+    return decorator
@@ -0,0 +1,180 @@
+# accounts/enrollment.py
+from django.db import transaction
+from django.db.models import Count, F, FilteredRelation, Max, Q, Subquery
+
+from .cache import invalidate_tags_on_commit
+from .models import Classes, SignupTokens, StudentClasses, Students
+
+
+class EnrollmentError(Exception):
+    pass
+
+
+class ClassNotFound(EnrollmentError):
+    pass
+
+
+class ClassFull(EnrollmentError):
+    pass
+
+
+class AlreadyEnrolled(EnrollmentError):
+    pass
+
+
+def current_class_id(student_id):
+    """Kelas aktif siswa (baris StudentClasses is_current); baris lain hanya riwayat."""
+    return (
+        StudentClasses.objects
+        .filter(student_id=student_id, is_current=True)
+        .values_list("class_field_id", flat=True)
+        .first()
+    )
+
+
+def current_enrollments():
+    """StudentClasses aktif saja, mis. current_enrollments().filter(class_field=c) untuk daftar siswa kelas."""
+    return StudentClasses.objects.filter(is_current=True)
+
+
+def with_current_class(qs, student_path=""):
+    """
+    Anotasi current_class_id & current_class_name lewat satu LEFT JOIN ke student_classes
+    (is_current, maksimal satu baris per siswa berkat partial unique index).
+    `student_path` = path relasi ke Students dari model qs, mis. "student" untuk Feedbacks.
+    """
+    relation = f"{student_path}__studentclasses" if student_path else "studentclasses"
+    return qs.annotate(
+        current_enrollment=FilteredRelation(relation, condition=Q(**{f"{relation}__is_current": True})),
+    ).annotate(
+        current_class_id=F("current_enrollment__class_field_id"),
+        current_class_name=F("current_enrollment__class_field__class_name"),
+    )
+
+
+def _lock_classes(class_ids):
+    # Lock dengan urutan id tetap: dua pemindahan berlawanan arah tidak saling deadlock
+    ids = sorted({class_id for class_id in class_ids if class_id})
+    return {c.id: c for c in Classes.objects.select_for_update().filter(id__in=ids).order_by("id")}
+
+
+def _shift_count(class_id, delta):
+    qs = Classes.objects.filter(id=class_id)
+    if delta < 0:
+        qs = qs.filter(current_student_count__gt=0)
+    # update() tidak memicu signal cache: invalidate tag kelas manual
+    qs.update(current_student_count=F("current_student_count") + delta)
+    invalidate_tags_on_commit("classes", f"class:{class_id}")
+
+
+def enroll_student(student_id, class_id):
+    """
+    Masukkan siswa ke kelas `class_id`, pindah dari kelas aktifnya jika ada.
+
+    Baris siswa lalu baris kelas lama & baru di-lock (SELECT ... FOR UPDATE) selama transaksi:
+    kapasitas dicek dari nilai yang terkunci dan counter diubah dengan F(), jadi pendaftaran
+    bersamaan ke kelas yang sama tidak kehilangan update atau melewati kapasitas.
+    Raise ClassNotFound / ClassFull / AlreadyEnrolled; tidak ada yang berubah jika gagal.
+    """
+    if not str(class_id).isdigit():
+        raise ClassNotFound(class_id)
+    class_id = int(class_id)
+
+    with transaction.atomic():
+        # Operasi pada siswa yang sama berurutan, supaya "kelas aktif" yang dibaca tidak basi
+        Students.objects.select_for_update().filter(id=student_id).values_list("id", flat=True).first()
+
+        old_class_id = current_class_id(student_id)
+        if old_class_id == class_id:
+            raise AlreadyEnrolled(class_id)
+
+        locked = _lock_classes([class_id, old_class_id])
+        new_class = locked.get(class_id)
+        if new_class is None:
+            raise ClassNotFound(class_id)
+        if new_class.current_student_count >= new_class.capacity:
+            raise ClassFull(class_id)
+
+        # Lepas flag lama dulu: partial unique index hanya mengizinkan satu baris aktif per siswa
+        StudentClasses.objects.filter(student_id=student_id, is_current=True).update(is_current=False)
+        StudentClasses.objects.create(student_id=student_id, class_field=new_class, is_current=True)
+        if old_class_id:
+            _shift_count(old_class_id, -1)
+        _shift_count(new_class.id, 1)
+    return new_class
+
+
+def reserve_class_seat(class_id):
+    """
+    Cek kursi untuk token signup siswa baru di kelas `class_id`, lewat lock kelas yang sama dengan
+    enroll_student. Token siswa yang belum dipakai ikut dihitung sebagai kursi terisi, jadi token
+    yang sudah dibagikan tidak bisa melebihi kapasitas. Panggil di dalam transaction.atomic() yang
+    juga membuat tokennya: lock dipegang sampai token tersimpan. Return kelas yang terkunci;
+    raise ClassNotFound / ClassFull.
+    """
+    if not str(class_id).isdigit():
+        raise ClassNotFound(class_id)
+    class_id = int(class_id)
+
+    new_class = _lock_classes([class_id]).get(class_id)
+    if new_class is None:
+        raise ClassNotFound(class_id)
+    pending = SignupTokens.objects.filter(class_field_id=class_id, role="student", is_used=False).count()
+    if new_class.current_student_count + pending >= new_class.capacity:
+        raise ClassFull(class_id)
+    return new_class
+
+
+def class_student_counts():
+    """{class_id: jumlah siswa aktif} dari StudentClasses, satu query grouped lewat index kelas aktif."""
+    return dict(
+        current_enrollments()
+        .filter(class_field__isnull=False)
+        .values("class_field_id")
+        .annotate(n=Count("id"))
+        .order_by()
+        .values_list("class_field_id", "n")
+    )
+
+
+def repair_current_enrollments():
+    """
+    Siswa yang punya baris StudentClasses tapi tidak ada yang aktif (data import / insert manual):
+    baris terakhirnya dijadikan kelas aktif. Return jumlah baris yang diperbaiki.
+    """
+    latest = (
+        StudentClasses.objects
+        .filter(student__isnull=False)
+        .exclude(student_id__in=current_enrollments().filter(student__isnull=False).values("student_id"))
+        .values("student_id")
+        .annotate(last_id=Max("id"))
+        .values("last_id")
+    )
+    return StudentClasses.objects.filter(id__in=Subquery(latest)).update(is_current=True)
+
+
+def reconcile_class_counts(dry_run=False):
+    """
+    Samakan Classes.current_student_count dengan jumlah siswa aktif di StudentClasses.
+    Semua baris kelas di-lock selama perhitungan supaya tidak bentrok dengan enroll_student.
+    Return (jumlah flag kelas aktif yang diperbaiki, list (class_id, class_name, nilai lama, nilai baru)).
+    """
+    with transaction.atomic():
+        repaired = 0 if dry_run else repair_current_enrollments()
+        classes = list(Classes.objects.select_for_update().order_by("id").only("id", "class_name", "current_student_count"))
+        counts = class_student_counts()
+
+        changed = []
+        for cls in classes:
+            actual = counts.get(cls.id, 0)
+            if cls.current_student_count != actual:
+                changed.append((cls.id, cls.class_name, cls.current_student_count, actual))
+                cls.current_student_count = actual
+
+        if changed and not dry_run:
+            by_id = {c.id: c for c in classes}
+            Classes.objects.bulk_update([by_id[row[0]] for row in changed], ["current_student_count"], batch_size=500)
+            invalidate_tags_on_commit("classes", *(f"class:{row[0]}" for row in changed))
+        if repaired:
+            invalidate_tags_on_commit("student_classes")
+    return repaired, changed
@@ -0,0 +1,287 @@
+# accounts/exports.py
+import csv
+import tempfile
+from datetime import date, datetime, time
+
+from django.db.models import Avg, Count, Exists, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.http import FileResponse, StreamingHttpResponse
+
+from .models import (
+    Assignments,
+    AssignmentSubmissions,
+    Attendance,
+    AttendanceRollups,
+    Feedbacks,
+    Materials,
+    Schedules,
+    StudentClasses,
+    TutorClasses,
+    TutorExpertise,
+    Tutors,
+)
+
+try:
+    from openpyxl import Workbook
+except ImportError:  # pragma: no cover - xlsx opsional
+    Workbook = None
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FILE_TYPES = ("csv", "xlsx")
+
+
+class Echo:
+    """Pseudo-buffer untuk csv.writer: setiap baris langsung dikembalikan, tidak ditampung."""
+
+    def write(self, value):
+        return value
+
+
+def _format(value):
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "Ya" if value else "Tidak"
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    return value
+
+
+def stream_csv(filename, header, rows):
+    writer = csv.writer(Echo())
+
+    def generate():
+        yield "\ufeff"  # BOM supaya Excel membaca UTF-8 dengan benar
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow([_format(v) for v in row])
+
+    response = StreamingHttpResponse(generate(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def write_xlsx(filename, header, rows):
+    # write_only workbook menulis baris ke file sementara, bukan ke memori
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=filename[:31])
+    sheet.append(header)
+    for row in rows:
+        sheet.append([_format(v) for v in row])
+
+    tmp = tempfile.TemporaryFile()
+    workbook.save(tmp)
+    tmp.seek(0)
+    return FileResponse(
+        tmp,
+        as_attachment=True,
+        filename=f"{filename}.xlsx",
+        content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    )
+
+
+def export_response(file_type, filename, header, rows):
+    if file_type == "xlsx":
+        if Workbook is None:
+            raise ValueError("Export xlsx membutuhkan paket openpyxl.")
+        return write_xlsx(filename, header, rows)
+    return stream_csv(filename, header, rows)
+
+
+# === Attendance per kelas / periode ===
+
+ATTENDANCE_HEADER = [
+    "Tanggal", "Mulai", "Selesai", "Kelas", "Subject", "Tutor",
+    "Student ID", "Nama Siswa", "Ditandai Tutor", "Dikonfirmasi Siswa", "Status", "Timestamp",
+]
+
+
+def attendance_rows(class_ids=None, start_date=None, end_date=None, chunk_size=EXPORT_CHUNK_SIZE):
+    qs = Attendance.objects.filter(schedule__isnull=False)
+    if class_ids is not None:
+        qs = qs.filter(schedule__class_field_id__in=class_ids)
+    if start_date:
+        qs = qs.filter(schedule__schedule_date__gte=start_date)
+    if end_date:
+        qs = qs.filter(schedule__schedule_date__lte=end_date)
+
+    qs = qs.order_by("schedule__schedule_date", "schedule__start_time", "schedule_id", "student_id").values_list(
+        "schedule__schedule_date",
+        "schedule__start_time",
+        "schedule__end_time",
+        "schedule__class_field__class_name",
+        "schedule__subject__name",
+        "schedule__tutor__full_name",
+        "student__student_id",
+        "student__full_name",
+        "marked_by_tutor",
+        "confirmed_by_student",
+        "timestamp",
+    )
+
+    for (day, start, end, class_name, subject, tutor, student_code, student_name,
+         marked, confirmed, timestamp) in qs.iterator(chunk_size=chunk_size):
+        present = bool(marked and confirmed)
+        yield [
+            day, start, end, class_name, subject, tutor, student_code, student_name,
+            bool(marked), bool(confirmed), "Present" if present else "Absent", timestamp,
+        ]
+
+
+# === Grade book per tugas / kelas ===
+
+GRADEBOOK_HEADER = [
+    "Tugas", "Kelas", "Subject", "Deadline", "Student ID", "Nama Siswa",
+    "Status", "Dikumpulkan", "Nilai", "Feedback",
+]
+
+
+def _class_roster(class_id):
+    return list(
+        StudentClasses.objects
+        .filter(class_field_id=class_id, student__isnull=False, is_current=True)
+        .order_by("student__full_name")
+        .values_list("student_id", "student__student_id", "student__full_name")
+    )
+
+
+def gradebook_rows(class_ids=None, assignment_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Satu baris per (tugas, siswa di kelas tugas), termasuk siswa yang belum mengumpulkan.
+    Tugas dan submission dibaca berurutan by assignment_id lalu di-merge (2 query + 1 per kelas).
+    """
+    assignments = Assignments.objects.all()
+    if class_ids is not None:
+        assignments = assignments.filter(class_field_id__in=class_ids)
+    if assignment_id:
+        assignments = assignments.filter(id=assignment_id)
+
+    submissions = (
+        AssignmentSubmissions.objects
+        .filter(assignment_id__in=assignments.values("id"))
+        .order_by("assignment_id", "student_id")
+        .values_list("assignment_id", "student_id", "student__student_id", "student__full_name",
+                     "submitted_at", "grade", "feedback")
+        .iterator(chunk_size=chunk_size)
+    )
+    assignments = assignments.order_by("id").values_list(
+        "id", "title", "class_field_id", "class_field__class_name", "subject__name", "due_date"
+    ).iterator(chunk_size=chunk_size)
+
+    rosters = {}
+    pending = next(submissions, None)
+
+    for a_id, title, class_id, class_name, subject, due_date in assignments:
+        subs = {}
+        while pending is not None and pending[0] == a_id:
+            subs[pending[1]] = pending
+            pending = next(submissions, None)
+
+        if class_id not in rosters:
+            rosters[class_id] = _class_roster(class_id) if class_id else []
+
+        base = [title, class_name, subject, due_date]
+        for student_id, student_code, student_name in rosters[class_id]:
+            sub = subs.pop(student_id, None)
+            if sub:
+                yield base + [student_code, student_name, "Submitted", sub[4], sub[5], sub[6]]
+            else:
+                yield base + [student_code, student_name, "Not Submitted", None, None, None]
+
+        # Submission dari siswa yang sudah pindah kelas tetap ikut diekspor
+        for sub in subs.values():
+            yield base + [sub[2], sub[3], "Submitted", sub[4], sub[5], sub[6]]
+
+
+# === Roster tutor + rating ===
+
+TUTOR_ROSTER_HEADER = [
+    "Tutor ID", "Nama", "Email", "Telepon", "Subject", "Status", "Jumlah Kelas",
+    "Jumlah Jadwal", "Jadwal Hadir", "Materi", "Materi Disetujui",
+    "Jumlah Feedback", "Rata-rata Feedback", "Rating",
+]
+
+
+def _count_subquery(qs, group_field):
+    return Coalesce(
+        Subquery(
+            qs.order_by().values(group_field).annotate(total=Count("id")).values("total")[:1]
+        ),
+        0,
+    )
+
+
+def tutor_roster_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    from admin_panel.utils import calculate_tutor_rating
+
+    subjects = {}
+    for tutor_id, name in TutorExpertise.objects.order_by("tutor_id", "subject__name").values_list("tutor_id", "subject__name"):
+        subjects.setdefault(tutor_id, []).append(name)
+
+    tutors = (
+        Tutors.objects
+        .annotate(
+            class_count=_count_subquery(TutorClasses.objects.filter(tutor=OuterRef("pk")), "tutor"),
+            schedule_count=_count_subquery(Schedules.objects.filter(tutor=OuterRef("pk")), "tutor"),
+            attended_count=Coalesce(
+                Subquery(
+                    AttendanceRollups.objects.filter(tutor=OuterRef("pk"))
+                    .order_by().values("tutor").annotate(total=Sum("marked")).values("total")[:1]
+                ),
+                0,
+            ),
+            material_count=_count_subquery(Materials.objects.filter(tutor=OuterRef("pk")), "tutor"),
+            approved_material_count=_count_subquery(
+                Materials.objects.filter(tutor=OuterRef("pk"), is_approved=True), "tutor"
+            ),
+            feedback_count=_count_subquery(Feedbacks.objects.filter(tutor=OuterRef("pk")), "tutor"),
+            feedback_avg=Subquery(
+                Feedbacks.objects.filter(tutor=OuterRef("pk"))
+                .order_by().values("tutor").annotate(avg=Avg("rating")).values("avg")[:1]
+            ),
+            has_expertise=Exists(TutorExpertise.objects.filter(tutor=OuterRef("pk"))),
+        )
+        .order_by("full_name")
+        .values_list(
+            "id", "full_name", "user__email", "phone", "address", "user__is_active",
+            "class_count", "schedule_count", "attended_count", "material_count",
+            "approved_material_count", "feedback_count", "feedback_avg", "has_expertise",
+        )
+    )
+
+    for (tutor_id, name, email, phone, address, is_active, classes, schedules, attended,
+         materials, approved, feedback_count, feedback_avg, has_expertise) in tutors.iterator(chunk_size=chunk_size):
+        feedback_avg = round(feedback_avg, 1) if feedback_avg is not None else None
+        rating = calculate_tutor_rating(
+            phone, address, has_expertise, feedback_count, feedback_avg,
+            schedules, attended, materials, approved,
+        )
+        yield [
+            f"G{tutor_id:03d}", name, email, phone, ", ".join(subjects.get(tutor_id, [])) or "-",
+            "Active" if is_active else "Inactive", classes, schedules, attended, materials, approved,
+            feedback_count, feedback_avg, rating,
+        ]
+
+
+def parse_export_params(query_params):
+    """Ambil file_type & periode (start_date/end_date, format YYYY-MM-DD). Raise ValueError jika tidak valid."""
+    file_type = query_params.get("file_type", "csv").lower()
+    if file_type not in EXPORT_FILE_TYPES:
+        raise ValueError(f"file_type harus salah satu dari: {', '.join(EXPORT_FILE_TYPES)}")
+
+    for key in ("class_id", "assignment_id"):
+        value = query_params.get(key)
+        if value and not str(value).isdigit():
+            raise ValueError(f"{key} tidak valid.")
+
+    dates = {}
+    for key in ("start_date", "end_date"):
+        value = query_params.get(key)
+        try:
+            dates[key] = datetime.strptime(value, "%Y-%m-%d").date() if value else None
+        except ValueError:
+            raise ValueError(f"Format {key} tidak valid (gunakan YYYY-MM-DD).")
+
+    return file_type, dates["start_date"], dates["end_date"]
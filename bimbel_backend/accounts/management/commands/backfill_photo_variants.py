@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Users
+from accounts.photos import DEFAULT_PHOTO_URL, Image, generate_photo_variants
+
+
+class Command(BaseCommand):
+    help = "Buat varian foto profil (48/128/512 px, WebP + JPEG) untuk foto yang sudah ada."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Buat ulang walaupun varian sudah ada")
+
+    def handle(self, *args, **options):
+        if Image is None:
+            raise CommandError("Pillow belum terinstall (pip install Pillow)")
+
+        started = time.perf_counter()
+        photo_urls = (
+            Users.objects.exclude(photo_url__isnull=True).exclude(photo_url="")
+            .values_list("photo_url", flat=True).distinct()
+        )
+
+        processed = written = failed = 0
+        for photo_url in dict.fromkeys([DEFAULT_PHOTO_URL, *photo_urls]):
+            try:
+                count = generate_photo_variants(photo_url, force=options["force"])
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f"  {photo_url}: {e}")
+                continue
+            if count:
+                processed += 1
+                written += count
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"{processed} foto diproses ({written} varian), {failed} gagal, selesai dalam {elapsed:.2f}s"
+        ))
@@ -0,0 +1,88 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from accounts.benchmarks import run_dashboard_benchmark
+from accounts.synthetic import create_missing_tables, flush_accounts_tables, generate_dataset, parse_scale
+
+
+class Command(BaseCommand):
+    help = (
+        "Bandingkan dashboard admin/tutor/siswa versi sync dan async (p50/p95, throughput) "
+        "pada beberapa tingkat request bersamaan, hasil disimpan sebagai JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", default="1,10,50", help="Tingkat konkurensi dipisah koma")
+        parser.add_argument("--requests", type=int, default=100, help="Jumlah request per tingkat konkurensi")
+        parser.add_argument("--app", choices=("admin_panel", "tutor_panel", "student_panel"))
+        parser.add_argument("--scale", default="1k", help="Skala data sintetis, mis. 1k atau 10k")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--keepdb", action="store_true", help="Jangan hapus database test setelah selesai")
+        parser.add_argument(
+            "--existing-db", action="store_true",
+            help="Ukur database yang sedang dikonfigurasi apa adanya (tanpa database test & data sintetis)",
+        )
+        parser.add_argument("--output", help="File JSON hasil (default benchmarks/async-dashboards-<waktu>.json)")
+        parser.add_argument("--noinput", "--no-input", action="store_false", dest="interactive")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(n) for n in options["concurrency"].split(",") if n]
+            students = parse_scale(options["scale"])
+        except ValueError:
+            raise CommandError("--concurrency harus berupa angka dan --scale skala yang valid")
+        if not levels or min(levels) < 1 or options["requests"] < 1:
+            raise CommandError("--concurrency dan --requests minimal 1")
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "requests": options["requests"],
+            "scale": "existing" if options["existing_db"] else options["scale"],
+        }
+
+        if options["existing_db"]:
+            report["results"] = self._run(levels, options)
+        else:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=not options["interactive"], serialize=False, keepdb=options["keepdb"],
+            )
+            try:
+                create_missing_tables()
+                flush_accounts_tables()
+                report["rows"] = generate_dataset(students, seed=options["seed"])
+                report["results"] = self._run(levels, options)
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        output = options["output"] or os.path.join(
+            "benchmarks", f"async-dashboards-{timezone.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Hasil disimpan di {output}"))
+
+    def _run(self, levels, options):
+        self.stdout.write(
+            f"  {'app':<14} {'conc':>5}  {'sync p50':>9} {'p95':>8} {'rps':>7}  {'async p50':>9} {'p95':>8} {'rps':>7}"
+        )
+
+        def show(result):
+            sync, async_ = result["sync"], result["async"]
+            line = (
+                f"  {result['app']:<14} {result['concurrency']:>5}  "
+                f"{sync['p50_ms']:>9.1f} {sync['p95_ms']:>8.1f} {sync['throughput_rps']:>7}  "
+                f"{async_['p50_ms']:>9.1f} {async_['p95_ms']:>8.1f} {async_['throughput_rps']:>7}"
+            )
+            if sync["errors"] or async_["errors"]:
+                line = self.style.WARNING(f"{line}  error: {sync['errors']}/{async_['errors']}")
+            self.stdout.write(line)
+
+        return run_dashboard_benchmark(
+            concurrency_levels=levels, requests=options["requests"], app=options["app"], on_result=show,
+        )
@@ -0,0 +1,120 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from accounts.benchmarks import run_panel_benchmark
+from accounts.synthetic import create_missing_tables, flush_accounts_tables, generate_dataset, parse_scale
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark semua endpoint GET panel (p50/p95, jumlah query, ukuran response) pada data sintetis "
+        "beberapa skala di database test terpisah, hasil disimpan sebagai JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", default="1k,10k", help="Daftar skala dipisah koma, mis. 1k,10k,100k")
+        parser.add_argument("--repeat", type=int, default=20, help="Jumlah request terukur per endpoint")
+        parser.add_argument("--warmup", type=int, default=1)
+        parser.add_argument("--app", choices=("admin_panel", "tutor_panel", "student_panel"))
+        parser.add_argument("--view", help="Hanya view yang namanya mengandung teks ini")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--with-cache", action="store_true", help="Ukur dengan cache response aktif")
+        parser.add_argument("--keepdb", action="store_true", help="Jangan hapus database test setelah selesai")
+        parser.add_argument(
+            "--existing-db", action="store_true",
+            help="Ukur database yang sedang dikonfigurasi apa adanya (tanpa database test & data sintetis)",
+        )
+        parser.add_argument("--output", help="File JSON hasil (default benchmarks/endpoints-<waktu>.json)")
+        parser.add_argument("--compare", help="File JSON hasil sebelumnya untuk dibandingkan")
+        parser.add_argument("--noinput", "--no-input", action="store_false", dest="interactive")
+
+    def handle(self, *args, **options):
+        try:
+            scales = [(label, parse_scale(label)) for label in options["scales"].split(",") if label]
+        except ValueError:
+            raise CommandError(f"Skala tidak valid: {options['scales']}")
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "repeat": options["repeat"],
+            "with_cache": options["with_cache"],
+            "scales": {},
+        }
+
+        if options["existing_db"]:
+            report["scales"]["existing"] = {"endpoints": self._run(options)}
+        else:
+            old_name = connection.creation.create_test_db(
+                verbosity=0, autoclobber=not options["interactive"], serialize=False, keepdb=options["keepdb"],
+            )
+            try:
+                create_missing_tables()
+                for label, students in scales:
+                    self.stdout.write(self.style.MIGRATE_HEADING(f"Skala {label} ({students} siswa)"))
+                    flush_accounts_tables()
+                    started = time.perf_counter()
+                    rows = generate_dataset(students, seed=options["seed"])
+                    generate_s = round(time.perf_counter() - started, 1)
+                    self.stdout.write(f"  data sintetis dibuat dalam {generate_s}s: {rows}")
+                    report["scales"][label] = {
+                        "students": students,
+                        "rows": rows,
+                        "generate_s": generate_s,
+                        "endpoints": self._run(options),
+                    }
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0, keepdb=options["keepdb"])
+
+        output = options["output"] or os.path.join(
+            "benchmarks", f"endpoints-{timezone.now().strftime('%Y%m%d-%H%M%S')}.json"
+        )
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Hasil disimpan di {output}"))
+
+        if options["compare"]:
+            self._compare(options["compare"], report)
+
+    def _run(self, options):
+        self.stdout.write(f"  {'view':<55} {'status':>6} {'p50 ms':>8} {'p95 ms':>8} {'query':>6} {'bytes':>9}")
+
+        def show(result):
+            if "skipped" in result:
+                self.stdout.write(f"  {result['view']:<55} {'SKIP':>6}  {result['skipped']}")
+                return
+            self.stdout.write(
+                f"  {result['view']:<55} {result['status']:>6} {result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} "
+                f"{result['queries']:>6} {result['bytes']:>9}"
+            )
+
+        return run_panel_benchmark(
+            repeat=options["repeat"], warmup=options["warmup"], app=options["app"], view=options["view"],
+            use_cache=options["with_cache"], on_result=show,
+        )
+
+    def _compare(self, path, report):
+        with open(path) as f:
+            previous = json.load(f)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Dibandingkan dengan {path} (p95 ms, query)"))
+        for label, scale in report["scales"].items():
+            before = {r["view"]: r for r in previous.get("scales", {}).get(label, {}).get("endpoints", [])}
+            for result in scale["endpoints"]:
+                old = before.get(result["view"])
+                if not old or "p95_ms" not in old or "p95_ms" not in result:
+                    continue
+                change = (result["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100 if old["p95_ms"] else 0
+                line = (
+                    f"  [{label}] {result['view']:<55} {old['p95_ms']:>8.1f} -> {result['p95_ms']:>8.1f} "
+                    f"({change:+.0f}%)  query {old['queries']} -> {result['queries']}"
+                )
+                if change > 20 or result["queries"] > old["queries"]:
+                    line = self.style.WARNING(line)
+                self.stdout.write(line)
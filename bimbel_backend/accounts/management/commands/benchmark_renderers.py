@@ -0,0 +1,56 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import Tutors
+from admin_panel.views import FeedbackListView, AdminTokenListView
+from tutor_panel.views import TutorTeachingDashboardView
+from bimbel_backend.renderers import ORJSONRenderer, MessagePackRenderer
+
+
+class Command(BaseCommand):
+    help = "Bandingkan waktu serialisasi & ukuran payload JSONRenderer vs orjson vs msgpack pada endpoint terbesar."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument("--tutor-user-id", type=int, help="Default: tutor pertama di database")
+
+    def handle(self, *args, **options):
+        factory = APIRequestFactory()
+        tutor_user_id = options["tutor_user_id"] or (
+            Tutors.objects.exclude(user__isnull=True).values_list("user_id", flat=True).first()
+        )
+
+        endpoints = [
+            ("FeedbackListView", FeedbackListView, {}),
+            ("AdminTokenListView", AdminTokenListView, {}),
+        ]
+        if tutor_user_id:
+            endpoints.append(("TutorTeachingDashboardView", TutorTeachingDashboardView, {"user_id": tutor_user_id}))
+
+        renderers = [
+            ("drf-json", JSONRenderer()),
+            ("orjson", ORJSONRenderer()),
+            ("msgpack", MessagePackRenderer()),
+        ]
+
+        self.stdout.write(f"{'endpoint':<28} {'renderer':<10} {'ms/render':>10} {'bytes':>10}")
+        for name, view_class, params in endpoints:
+            response = view_class.as_view()(factory.get("/", params))
+            data = response.data
+
+            for renderer_name, renderer in renderers:
+                try:
+                    payload = renderer.render(data)
+                except RuntimeError as e:
+                    self.stdout.write(f"{name:<28} {renderer_name:<10} {'-':>10} {str(e)}")
+                    continue
+
+                start = time.perf_counter()
+                for _ in range(options["repeat"]):
+                    renderer.render(data)
+                elapsed_ms = (time.perf_counter() - start) * 1000 / options["repeat"]
+
+                self.stdout.write(f"{name:<28} {renderer_name:<10} {elapsed_ms:>10.3f} {len(payload):>10}")
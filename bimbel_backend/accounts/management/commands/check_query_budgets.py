@@ -0,0 +1,96 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+
+from accounts.benchmarks import panel_get_endpoints
+from accounts.reference import reference_data
+from bimbel_backend.query_budget import QUERY_BUDGET_APPS, QueryRecorder, get_query_budget, view_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Jalankan setiap endpoint GET admin_panel / tutor_panel / student_panel terhadap data di database "
+        "dan bandingkan jumlah query dengan QUERY_BUDGETS di <app>/query_budgets.py. "
+        "Budget POST/PATCH/DELETE tidak dicek di sini (lihat test app panel)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--app", choices=QUERY_BUDGET_APPS, help="Hanya satu app")
+        parser.add_argument("--view", help="Hanya view yang namanya mengandung teks ini")
+        parser.add_argument("--strict", action="store_true", help="Gagal juga jika ada view tanpa budget")
+        parser.add_argument("--suggest", action="store_true", help="Cetak QUERY_BUDGETS dari hasil pengukuran")
+        parser.add_argument("--verbose-sql", action="store_true", help="Tampilkan shape SQL yang berulang")
+
+    def handle(self, *args, **options):
+        # Middleware instrumentasi dimatikan supaya log per request tidak bercampur dengan laporan
+        with override_settings(QUERY_BUDGET_ENABLED=False, RESPONSE_CACHE_ENABLED=False):
+            self._run(options)
+
+    def _run(self, options):
+        client = Client()
+        results = []
+        # Registry referensi dimuat sekali per proses, bukan biaya per request: muat sebelum mengukur
+        reference_data()
+
+        for view_class, path, params in panel_get_endpoints(app=options["app"], view=options["view"]):
+            if path is None:
+                results.append((view_class, None, None, None, "tidak ada data contoh"))
+                continue
+            results.append(self._measure(client, view_class, path, params))
+
+        self._report(results, options)
+
+    def _measure(self, client, view_class, path, params):
+        recorder = QueryRecorder()
+        # Cache response dimatikan & semua perubahan di-rollback: yang diukur jalur dingin
+        with transaction.atomic():
+            with recorder.capture():
+                response = client.get(path, params)
+                if response.streaming:
+                    for _ in response.streaming_content:
+                        pass
+            transaction.set_rollback(True)
+        return view_class, response.status_code, recorder, get_query_budget(view_class, "GET"), None
+
+    def _report(self, results, options):
+        exceeded = missing = 0
+        suggestions = {}
+
+        for view_class, status_code, recorder, budget, note in results:
+            name = view_key(view_class)
+            if recorder is None:
+                self.stdout.write(f"  SKIP  {name:<55} {note}")
+                continue
+
+            repeated = recorder.repeated()
+            suggestions.setdefault(name.split(".")[0], {})[view_class.__name__] = recorder.count
+            if budget is None:
+                missing += 1
+                flag = self.style.WARNING("NOBUD")
+            elif recorder.count > budget:
+                exceeded += 1
+                flag = self.style.ERROR("OVER ")
+            else:
+                flag = self.style.SUCCESS("OK   ")
+
+            budget_text = "-" if budget is None else budget
+            self.stdout.write(
+                f"  {flag} {name:<55} {status_code} {recorder.count:>4}/{budget_text:<4} "
+                f"{recorder.duration * 1000:7.1f}ms" + (f"  repeated: {[n for _, n in repeated]}" if repeated else "")
+            )
+            if options["verbose_sql"]:
+                for sql, n in repeated:
+                    self.stdout.write(f"        {n}x {sql[:160]}")
+
+        if options["suggest"]:
+            for app, views in suggestions.items():
+                self.stdout.write(f"\n# {app}/query_budgets.py")
+                self.stdout.write("QUERY_BUDGETS = {")
+                for view_name, count in sorted(views.items()):
+                    self.stdout.write(f'    "{view_name}": {count},')
+                self.stdout.write("}")
+
+        summary = f"{exceeded} view melebihi budget, {missing} view tanpa budget"
+        if exceeded or (options["strict"] and missing):
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary))
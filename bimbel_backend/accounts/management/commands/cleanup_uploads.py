@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.uploads import UPLOAD_EXPIRE_HOURS, cleanup_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Hapus sesi upload bertahap yang tidak selesai / tidak dipakai (jalankan berkala via cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=UPLOAD_EXPIRE_HOURS)
+
+    def handle(self, *args, **options):
+        removed = cleanup_expired_uploads(hours=options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"{removed} sesi upload dihapus"))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.blobs import BLOB_GRACE_HOURS, collect_unreferenced_blobs
+
+
+class Command(BaseCommand):
+    help = "Hapus blob media yang sudah tidak direferensikan materi/tugas/jawaban (jalankan berkala via cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=BLOB_GRACE_HOURS)
+
+    def handle(self, *args, **options):
+        removed, freed = collect_unreferenced_blobs(hours=options["hours"])
+        self.stdout.write(self.style.SUCCESS(f"{removed} blob dihapus ({freed / (1024 * 1024):.1f} MB)"))
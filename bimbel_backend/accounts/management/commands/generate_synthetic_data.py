@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Users
+from accounts.synthetic import SCALES, create_missing_tables, flush_accounts_tables, generate_dataset, parse_scale
+
+
+class Command(BaseCommand):
+    help = (
+        "Isi database dengan data sintetis (siswa, tutor, kelas, jadwal, absensi, tugas, jawaban) "
+        "untuk uji performa. Jangan dijalankan di database production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", default="1k", help=f"Jumlah siswa: {', '.join(SCALES)} atau angka (default 1k)")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--create-tables", action="store_true", help="Buat tabel accounts yang belum ada dari models.py")
+        parser.add_argument("--flush", action="store_true", help="Kosongkan semua tabel accounts terlebih dahulu")
+        parser.add_argument("--noinput", "--no-input", action="store_false", dest="interactive")
+
+    def handle(self, *args, **options):
+        try:
+            students = parse_scale(options["scale"])
+        except ValueError:
+            raise CommandError(f"Skala tidak valid: {options['scale']}")
+
+        if options["create_tables"]:
+            for table in create_missing_tables():
+                self.stdout.write(f"Tabel {table} dibuat")
+
+        if options["flush"]:
+            if options["interactive"]:
+                answer = input("Semua data di tabel accounts akan DIHAPUS. Ketik 'yes' untuk lanjut: ")
+                if answer != "yes":
+                    raise CommandError("Dibatalkan")
+            flush_accounts_tables()
+        elif Users.objects.exists():
+            raise CommandError("Database tidak kosong; pakai --flush untuk mengosongkan tabel accounts dulu")
+
+        self.stdout.write(f"Membuat data sintetis untuk {students} siswa...")
+        generate_dataset(students, seed=options["seed"], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Selesai. Password semua akun sintetis: password123"))
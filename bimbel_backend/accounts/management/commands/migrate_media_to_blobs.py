@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.blobs import migrate_legacy_files, recount_blob_refs
+
+
+class Command(BaseCommand):
+    help = (
+        "Pindahkan file lama (material/, tugas/, jawaban_tugas/) ke storage blob content-addressed "
+        "dan hitung ulang ref_count. Jalankan saat traffic upload sepi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Hanya hitung, tidak mengubah file/database")
+        parser.add_argument("--keep-originals", action="store_true", help="Jangan hapus file lama setelah dipindah")
+        parser.add_argument("--recount-only", action="store_true", help="Hanya hitung ulang ref_count blob")
+
+    def handle(self, *args, **options):
+        if options["recount_only"]:
+            fixed = recount_blob_refs()
+            self.stdout.write(self.style.SUCCESS(f"ref_count diperbaiki untuk {fixed} blob"))
+            return
+
+        started = time.perf_counter()
+        stats = migrate_legacy_files(dry_run=options["dry_run"], keep_originals=options["keep_originals"])
+        elapsed = time.perf_counter() - started
+
+        saved_mb = (stats["bytes_before"] - stats["bytes_after"]) / (1024 * 1024)
+        prefix = "[dry-run] " if options["dry_run"] else ""
+        self.stdout.write(
+            f"{prefix}{stats['rows']} baris, {stats['files']} file -> {stats['blobs']} blob "
+            f"(hemat {saved_mb:.1f} MB), {stats['missing']} file tidak ditemukan"
+        )
+        if not options["dry_run"] and not options["keep_originals"]:
+            self.stdout.write(f"{stats['deleted']} file lama dihapus")
+        self.stdout.write(self.style.SUCCESS(f"Selesai dalam {elapsed:.2f}s"))
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from bimbel_backend.profiling import PROFILE_MODES, make_profile_token
+
+
+class Command(BaseCommand):
+    help = "Buat token untuk header X-Profile-Token (profiling satu request, butuh PROFILING_ENABLED=1)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--mode", choices=PROFILE_MODES, default="sample")
+
+    def handle(self, *args, **options):
+        self.stdout.write(make_profile_token(options["mode"]))
+        self.stderr.write(f"Berlaku {getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600)} detik")
@@ -0,0 +1,18 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.rollups import rebuild_attendance_rollups
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang tabel attendance_rollups dari data attendance (setelah import data / perbaikan manual)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        total = rebuild_attendance_rollups(batch_size=options["batch_size"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"{total} baris rollup dibuat dalam {elapsed:.2f}s"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from accounts.enrollment import reconcile_class_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Hitung ulang current_student_count setiap kelas dari student_classes (kelas aktif tiap siswa) "
+        "dalam satu query grouped, lalu perbaiki yang berbeda. Siswa tanpa kelas aktif diberi flag "
+        "is_current pada baris terakhirnya."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Tampilkan perbedaan tanpa menyimpan")
+
+    def handle(self, *args, **options):
+        repaired, changed = reconcile_class_counts(dry_run=options["dry_run"])
+        if repaired:
+            self.stdout.write(f"  {repaired} siswa tanpa kelas aktif: baris terakhirnya dijadikan kelas aktif")
+        for class_id, class_name, old, new in changed:
+            self.stdout.write(f"  [{class_id}] {class_name}: {old} -> {new}")
+
+        if not changed:
+            self.stdout.write(self.style.SUCCESS("Semua counter kelas sudah sesuai"))
+        elif options["dry_run"]:
+            self.stdout.write(self.style.WARNING(f"{len(changed)} kelas berbeda (dry run, tidak disimpan)"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(changed)} kelas diperbaiki"))
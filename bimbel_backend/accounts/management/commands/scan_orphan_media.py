@@ -0,0 +1,85 @@
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.media_scan import (
+    ORPHAN_MIN_AGE_HOURS,
+    SCAN_BATCH_SIZE,
+    delete_orphan,
+    quarantine_orphan,
+    scan_media,
+)
+from accounts.models import Classes, Tutors
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Cari file di MEDIA_ROOT yang tidak direferensikan database (materi, tugas, jawaban, foto profil, "
+        "blob, upload bertahap) dan tampilkan pemakaian disk per folder, tutor dan kelas."
+    )
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument("--delete", action="store_true", help="Hapus file yatim")
+        action.add_argument("--quarantine", action="store_true", help="Pindahkan file yatim ke MEDIA_ROOT/_quarantine/")
+        parser.add_argument("--min-age-hours", type=int, default=ORPHAN_MIN_AGE_HOURS)
+        parser.add_argument("--batch-size", type=int, default=SCAN_BATCH_SIZE)
+        parser.add_argument("--top", type=int, default=10, help="Jumlah tutor/kelas terbesar yang ditampilkan")
+        parser.add_argument("--list", action="store_true", help="Tampilkan path setiap file yatim")
+
+    def handle(self, *args, **options):
+        if options["batch_size"] <= 0:
+            raise CommandError("--batch-size harus lebih dari 0")
+
+        action = None
+        if options["delete"]:
+            action = delete_orphan
+        elif options["quarantine"]:
+            action = partial(quarantine_orphan, stamp=time.strftime("%Y%m%d%H%M%S"))
+
+        def on_orphan(path, size):
+            if options["list"]:
+                self.stdout.write(f"  {path} ({_mb(size)})")
+            if action:
+                action(path, size)
+
+        started = time.perf_counter()
+        report = scan_media(
+            batch_size=options["batch_size"],
+            min_age_hours=options["min_age_hours"],
+            on_orphan=on_orphan,
+        )
+        elapsed = time.perf_counter() - started
+
+        totals = report["totals"]
+        self.stdout.write(f"\nTotal: {totals['files']} file, {_mb(totals['bytes'])}")
+
+        self.stdout.write("\nPer folder:")
+        for folder, stats in sorted(report["folders"].items(), key=lambda kv: -kv[1]["bytes"]):
+            self.stdout.write(
+                f"  {folder:<16} {stats['files']:>7} file {_mb(stats['bytes']):>12}"
+                f"   yatim: {stats['orphan_files']} file {_mb(stats['orphan_bytes'])}"
+            )
+
+        self._write_owners("Per tutor", report["tutors"], Tutors, "full_name", options["top"])
+        self._write_owners("Per kelas", report["classes"], Classes, "class_name", options["top"])
+
+        verb = "dihapus" if options["delete"] else "dikarantina" if options["quarantine"] else "ditemukan"
+        self.stdout.write(self.style.SUCCESS(
+            f"\n{totals['orphan_files']} file yatim {verb} ({_mb(totals['orphan_bytes'])}), "
+            f"{totals['recent_files']} file baru dilewati, selesai dalam {elapsed:.2f}s"
+        ))
+
+    def _write_owners(self, title, usage, model, name_field, top):
+        top_items = usage.most_common(top)
+        if not top_items:
+            return
+        names = dict(model.objects.filter(id__in=[pk for pk, _ in top_items]).values_list("id", name_field))
+        self.stdout.write(f"\n{title} (file bersama dihitung untuk setiap pemakai):")
+        for pk, size in top_items:
+            self.stdout.write(f"  {names.get(pk, f'#{pk}'):<30} {_mb(size):>12}")
@@ -0,0 +1,272 @@
+# accounts/media.py
+import mimetypes
+import os
+import re
+import time
+import zipfile
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.urls import reverse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .blobs import BLOB_CACHE_CONTROL, BLOB_DIR, LEGACY_MEDIA_DIRS, blob_sha_from_url, relative_media_path
+from .models import (
+    Assignments,
+    AssignmentSubmissions,
+    Materials,
+    StudentClasses,
+    Students,
+    TutorClasses,
+    Tutors,
+    Users,
+)
+
+PUBLIC_MEDIA_DIRS = ("profile",)
+RANGE_CHUNK_SIZE = 64 * 1024
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Format yang isinya sudah terkompresi: disimpan apa adanya di ZIP (deflate hanya buang CPU)
+ZIP_STORED_EXTENSIONS = {
+    "jpg", "jpeg", "png", "gif", "webp", "heic", "mp3", "m4a", "mp4", "mov", "mkv", "webm",
+    "zip", "rar", "7z", "gz", "docx", "xlsx", "pptx", "odt", "pdf",
+}
+
+
+def media_path_candidates(path):
+    # file_url di database tidak seragam: "material/x.pdf" vs "/media/tugas/x.pdf"
+    return [path, f"/{path}", settings.MEDIA_URL + path]
+
+
+def media_url_builder(request, user_id=None):
+    """
+    Fungsi file_url -> URL absolut ke ProtectedMediaView (/api/media/<path>?user_id=..), None jika kosong.
+    Base URL & query string dibangun sekali per request, bukan build_absolute_uri per item.
+    """
+    route = reverse("protected-media", kwargs={"path": "_"})[:-1]
+    base = request.build_absolute_uri(route)
+    query = f"?{urlencode({'user_id': user_id})}" if user_id else ""
+
+    def build(file_url):
+        path = relative_media_path(file_url)
+        return f"{base}{quote(path)}{query}" if path else None
+
+    return build
+
+
+def resolve_media_file(path):
+    """Path absolut di MEDIA_ROOT, atau None jika di luar MEDIA_ROOT / tidak ada."""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        return None
+    return full_path if os.path.isfile(full_path) else None
+
+
+def can_access_media(user, path):
+    """Admin boleh semua; tutor & siswa hanya file dari kelas/tugas mereka."""
+    folder = path.split("/", 1)[0]
+    if folder in PUBLIC_MEDIA_DIRS:
+        return True
+    if user is None:
+        return False
+    if user.role == "admin":
+        return True
+
+    candidates = media_path_candidates(path)
+    # Blob bisa dipakai bersama materi, tugas, dan jawaban: cukup salah satu yang boleh diakses
+    folders = LEGACY_MEDIA_DIRS if folder == BLOB_DIR else (folder,)
+
+    if user.role == "tutor":
+        tutor_id = Tutors.objects.filter(user=user).values_list("id", flat=True).first()
+        if not tutor_id:
+            return False
+        class_ids = TutorClasses.objects.filter(tutor_id=tutor_id).values("class_field_id")
+        owned = Q(tutor_id=tutor_id) | Q(class_field_id__in=class_ids)
+
+        checks = {
+            "material": lambda: Materials.objects.filter(owned, file_url__in=candidates).exists(),
+            "tugas": lambda: Assignments.objects.filter(owned, file_url__in=candidates).exists(),
+            "jawaban_tugas": lambda: AssignmentSubmissions.objects.filter(file_url__in=candidates).filter(
+                Q(assignment__tutor_id=tutor_id) | Q(assignment__class_field_id__in=class_ids)
+            ).exists(),
+        }
+        return any(checks[f]() for f in folders if f in checks)
+
+    if user.role == "student":
+        student_id = Students.objects.filter(user=user).values_list("id", flat=True).first()
+        if not student_id:
+            return False
+        class_ids = StudentClasses.objects.filter(student_id=student_id, is_current=True).values("class_field_id")
+
+        checks = {
+            "material": lambda: Materials.objects.filter(
+                file_url__in=candidates, is_approved=True, class_field_id__in=class_ids
+            ).exists(),
+            "tugas": lambda: Assignments.objects.filter(file_url__in=candidates, class_field_id__in=class_ids).exists(),
+            "jawaban_tugas": lambda: AssignmentSubmissions.objects.filter(
+                file_url__in=candidates, student_id=student_id
+            ).exists(),
+        }
+        return any(checks[f]() for f in folders if f in checks)
+
+    return False
+
+
+def get_media_user(user_id):
+    if not user_id or not str(user_id).isdigit():
+        return None
+    return Users.objects.filter(id=user_id, is_active=True).only("id", "role").first()
+
+
+def _offload_response(path, full_path, content_type):
+    # Biarkan nginx (X-Accel-Redirect) / Apache-lighttpd (X-Sendfile) yang mengirim isi file
+    accel_prefix = getattr(settings, "MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    if accel_prefix:
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + path
+        return response
+
+    if getattr(settings, "MEDIA_X_SENDFILE", False):
+        response = HttpResponse(content_type=content_type)
+        response["X-Sendfile"] = full_path
+        return response
+
+    return None
+
+
+def _iter_range(full_path, start, length, chunk_size=RANGE_CHUNK_SIZE):
+    with open(full_path, "rb") as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def parse_range(header, size):
+    """(start, end) inklusif untuk satu range "bytes=a-b"; None jika tidak valid/tidak bisa dipenuhi."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first == "":
+        # bytes=-500 -> 500 byte terakhir
+        length = int(last)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+def serve_media(request, path, as_attachment=False):
+    full_path = resolve_media_file(path)
+    if full_path is None:
+        return None
+
+    stat = os.stat(full_path)
+    content_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+
+    # Blob content-addressed: isi untuk URL yang sama tidak pernah berubah, sha256 = ETag
+    sha256 = blob_sha_from_url(path)
+    etag = f'"{sha256}"' if sha256 else None
+    if etag and etag in request.META.get("HTTP_IF_NONE_MATCH", ""):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        response["Cache-Control"] = BLOB_CACHE_CONTROL
+        return response
+    if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), stat.st_mtime):
+        return HttpResponseNotModified()
+
+    response = _offload_response(path, full_path, content_type)
+    if response is None:
+        range_header = request.META.get("HTTP_RANGE")
+        if range_header:
+            byte_range = parse_range(range_header, stat.st_size)
+            if byte_range is None:
+                response = HttpResponse(status=416)
+                response["Content-Range"] = f"bytes */{stat.st_size}"
+                return response
+
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(_iter_range(full_path, start, length), status=206, content_type=content_type)
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            response["Content-Length"] = str(length)
+        else:
+            response = FileResponse(open(full_path, "rb"), content_type=content_type)
+
+    filename = os.path.basename(full_path)
+    disposition = "attachment" if as_attachment else "inline"
+    response["Content-Disposition"] = f'{disposition}; filename="{filename}"'
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Accept-Ranges"] = "bytes"
+    if etag:
+        response["ETag"] = etag
+        response["Cache-Control"] = BLOB_CACHE_CONTROL
+    else:
+        response["Cache-Control"] = "private, max-age=3600"
+    return response
+
+
+class _ZipBuffer:
+    """File object tulis-saja untuk zipfile; isinya diambil per potong oleh stream_zip."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(entries, chunk_size=RANGE_CHUNK_SIZE):
+    """
+    Bangun ZIP sambil dikirim. `entries` berisi (nama di arsip, path absolut atau bytes).
+    Tanpa file sementara dan tanpa arsip utuh di memori: yang ditahan hanya satu chunk.
+    """
+    buffer = _ZipBuffer()
+    # Stream tidak bisa di-seek: zipfile otomatis memakai data descriptor setelah tiap file
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for arcname, source in entries:
+            if isinstance(source, bytes):
+                archive.writestr(arcname, source)
+                yield buffer.drain()
+                continue
+
+            stat = os.stat(source)
+            info = zipfile.ZipInfo(arcname, date_time=time.localtime(stat.st_mtime)[:6])
+            ext = os.path.splitext(arcname)[1][1:].lower()
+            info.compress_type = zipfile.ZIP_STORED if ext in ZIP_STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+            info.file_size = stat.st_size
+
+            with open(source, "rb") as src, archive.open(info, "w", force_zip64=stat.st_size >= zipfile.ZIP64_LIMIT) as dest:
+                for block in iter(lambda: src.read(chunk_size), b""):
+                    dest.write(block)
+                    data = buffer.drain()
+                    if data:
+                        yield data
+            yield buffer.drain()
+    yield buffer.drain()
@@ -0,0 +1,171 @@
+# accounts/media_scan.py
+import os
+import shutil
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+from .blobs import BLOB_DIR, BLOB_TMP_DIR
+from .models import Assignments, AssignmentSubmissions, Materials, MediaBlobs, UploadSessions, Users
+from .photos import variant_source
+
+QUARANTINE_DIR = "_quarantine"
+SCAN_BATCH_SIZE = 500
+ORPHAN_MIN_AGE_HOURS = 24  # file yang lebih baru bisa jadi sedang diunggah / belum disimpan ke DB
+
+# Dipakai langsung oleh kode (default kolom users.photo_url), bukan lewat baris DB
+ALWAYS_REFERENCED = {"profile/default-avatar.png"}
+
+
+def walk_media(root=None):
+    """Yield (path relatif, ukuran, mtime) untuk semua file di MEDIA_ROOT tanpa memuat daftar penuh."""
+    root = root or settings.MEDIA_ROOT
+    stack = [""]
+    while stack:
+        rel_dir = stack.pop()
+        try:
+            entries = os.scandir(os.path.join(root, rel_dir))
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if rel != QUARANTINE_DIR:
+                        stack.append(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    yield rel, stat.st_size, stat.st_mtime
+
+
+def _candidates(paths):
+    # file_url di database tidak seragam: "material/x.pdf" vs "/media/tugas/x.pdf"
+    by_value = {}
+    for path in paths:
+        for value in (path, f"/{path}", settings.MEDIA_URL + path):
+            by_value[value] = path
+    return by_value
+
+
+def _strip(value):
+    if value.startswith(settings.MEDIA_URL):
+        return value[len(settings.MEDIA_URL):]
+    return value.lstrip("/")
+
+
+def find_references(paths):
+    """
+    Cek satu batch path ke semua tabel yang menyimpan file. Setiap lookup `IN (...)` memakai index
+    kolom path-nya (migration 0005), jadi satu batch = beberapa index scan, bukan scan penuh per tabel.
+    Return {path: [(tutor_id, class_id), ...]} untuk path yang direferensikan (list kosong = tanpa pemilik).
+    """
+    refs = {path: [] for path in paths if path in ALWAYS_REFERENCED}
+    # Varian foto profil ikut dipakai selama foto aslinya masih direferensikan
+    variants = {path: variant_source(path) for path in paths}
+    variants = {path: source for path, source in variants.items() if source}
+    by_value = _candidates(set(paths) | set(variants.values()))
+    values = list(by_value)
+
+    owned_sources = (
+        Materials.objects.filter(file_url__in=values).values_list("file_url", "tutor_id", "class_field_id"),
+        Assignments.objects.filter(file_url__in=values).values_list("file_url", "tutor_id", "class_field_id"),
+        AssignmentSubmissions.objects.filter(file_url__in=values).values_list(
+            "file_url", "assignment__tutor_id", "assignment__class_field_id"
+        ),
+    )
+    for rows in owned_sources:
+        for file_url, tutor_id, class_id in rows:
+            refs.setdefault(by_value[file_url], []).append((tutor_id, class_id))
+
+    for photo_url in Users.objects.filter(photo_url__in=values).values_list("photo_url", flat=True):
+        refs.setdefault(by_value[photo_url], [])
+
+    blob_paths = [p for p in paths if p.startswith(f"{BLOB_DIR}/")]
+    if blob_paths:
+        # Blob dengan ref_count 0 masih tercatat: dibersihkan gc_media_blobs setelah masa tenggang
+        for path in MediaBlobs.objects.filter(path__in=blob_paths).values_list("path", flat=True):
+            refs.setdefault(path, [])
+
+    tmp_paths = [p for p in paths if p.startswith(f"{BLOB_TMP_DIR}/") and p.endswith(".part")]
+    if tmp_paths:
+        # uploads_tmp/<uuid hex>.part milik sesi upload bertahap yang masih ada
+        by_id = {os.path.basename(p)[:-len(".part")]: p for p in tmp_paths}
+        ids = [upload_id for upload_id in by_id if len(upload_id) == 32]
+        for upload_id in UploadSessions.objects.filter(id__in=ids).values_list("id", flat=True):
+            refs.setdefault(by_id[upload_id.hex], [])
+
+    for file_path in UploadSessions.objects.filter(file_path__in=paths).values_list("file_path", flat=True):
+        refs.setdefault(_strip(file_path), [])
+
+    for path, source in variants.items():
+        if source in refs or source in ALWAYS_REFERENCED:
+            refs.setdefault(path, [])
+    return refs
+
+
+def _folder(path):
+    parts = path.split("/")
+    return parts[0] if len(parts) > 1 else "."
+
+
+def scan_media(batch_size=SCAN_BATCH_SIZE, min_age_hours=ORPHAN_MIN_AGE_HOURS, on_orphan=None, root=None):
+    """
+    Bandingkan isi MEDIA_ROOT dengan referensi di database per batch (memori terbatas pada satu batch).
+    `on_orphan(path, size)` dipanggil untuk setiap file yatim yang cukup tua. Return laporan dict.
+    """
+    cutoff = time.time() - min_age_hours * 3600
+    folders = defaultdict(Counter)
+    tutors = Counter()
+    classes = Counter()
+    totals = Counter()
+
+    def flush(batch):
+        refs = find_references([path for path, _, _ in batch])
+        for path, size, mtime in batch:
+            stats = folders[_folder(path)]
+            stats["files"] += 1
+            stats["bytes"] += size
+
+            if path in refs:
+                # File yang dipakai bersama (blob) dihitung untuk setiap tutor/kelas pemakainya
+                for tutor_id in {t for t, _ in refs[path] if t}:
+                    tutors[tutor_id] += size
+                for class_id in {c for _, c in refs[path] if c}:
+                    classes[class_id] += size
+                continue
+
+            if mtime > cutoff:
+                totals["recent_files"] += 1
+                continue
+            stats["orphan_files"] += 1
+            stats["orphan_bytes"] += size
+            totals["orphan_files"] += 1
+            totals["orphan_bytes"] += size
+            if on_orphan:
+                on_orphan(path, size)
+
+    batch = []
+    for item in walk_media(root):
+        totals["files"] += 1
+        totals["bytes"] += item[1]
+        batch.append(item)
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    return {"totals": totals, "folders": folders, "tutors": tutors, "classes": classes}
+
+
+def delete_orphan(path, size=None, root=None):
+    os.remove(os.path.join(root or settings.MEDIA_ROOT, path))
+
+
+def quarantine_orphan(path, size=None, root=None, stamp=None):
+    """Pindahkan ke MEDIA_ROOT/_quarantine/<stamp>/<path> supaya masih bisa dikembalikan."""
+    root = root or settings.MEDIA_ROOT
+    target = os.path.join(root, QUARANTINE_DIR, stamp or time.strftime("%Y%m%d%H%M%S"), path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(os.path.join(root, path), target)
@@ -0,0 +1,327 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppSettings',
+            fields=[
+                ('key', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.CharField(max_length=255)),
+            ],
+            options={
+                'db_table': 'app_settings',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Assignments',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True, null=True)),
+                ('file_url', models.TextField(blank=True, null=True)),
+                ('due_date', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'assignments',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AssignmentSubmissions',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_url', models.TextField(blank=True, null=True)),
+                ('grade', models.IntegerField(blank=True, null=True)),
+                ('feedback', models.TextField(blank=True, null=True)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'assignment_submissions',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Attendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('marked_by_tutor', models.BooleanField(blank=True, null=True)),
+                ('confirmed_by_student', models.BooleanField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'attendance',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='BimbelRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('professionalism', models.FloatField()),
+                ('attendance', models.FloatField()),
+                ('subject_mastery', models.FloatField()),
+                ('admin_notes', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'bimbel_rating',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Classes',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('class_name', models.CharField(max_length=100)),
+                ('level', models.CharField(blank=True, max_length=50, null=True)),
+                ('capacity', models.IntegerField(default=30)),
+                ('current_student_count', models.IntegerField(default=0)),
+                ('is_deleted', models.BooleanField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'classes',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Feedbacks',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rating', models.IntegerField(blank=True, null=True)),
+                ('comment', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('is_approved', models.BooleanField(default=True)),
+            ],
+            options={
+                'db_table': 'feedbacks',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Materials',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('file_url', models.TextField(blank=True, null=True)),
+                ('type', models.CharField(max_length=50)),
+                ('subject', models.CharField(blank=True, max_length=255, null=True)),
+                ('is_approved', models.BooleanField(blank=True, null=True)),
+                ('uploaded_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'materials',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='RescheduleRequests',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reason', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(blank=True, max_length=20, null=True)),
+                ('requested_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'reschedule_requests',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleAssignments',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'schedule_assignments',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleMaterials',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'schedule_materials',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Schedules',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('schedule_date', models.DateField()),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+                ('status', models.CharField(max_length=20)),
+                ('room', models.CharField(blank=True, max_length=100, null=True)),
+            ],
+            options={
+                'db_table': 'schedules',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SignupTokens',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=100, unique=True)),
+                ('role', models.CharField(max_length=20)),
+                ('full_name', models.CharField(max_length=255)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('address', models.TextField(blank=True, null=True)),
+                ('is_used', models.BooleanField(default=False)),
+                ('gender', models.CharField(blank=True, max_length=10, null=True)),
+                ('birthdate', models.DateField(blank=True, null=True)),
+                ('parent_contact', models.CharField(blank=True, max_length=20, null=True)),
+                ('expertise', models.CharField(blank=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'signup_tokens',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentClasses',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'student_classes',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Students',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('student_id', models.CharField(blank=True, max_length=20, null=True)),
+                ('full_name', models.CharField(max_length=255)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('address', models.TextField(blank=True, null=True)),
+                ('gender', models.CharField(blank=True, max_length=10, null=True)),
+                ('birthdate', models.DateField(blank=True, null=True)),
+                ('parent_contact', models.CharField(blank=True, max_length=20, null=True)),
+            ],
+            options={
+                'db_table': 'students',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Subjects',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+            ],
+            options={
+                'db_table': 'subjects',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TutorAvailability',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day_of_week', models.CharField(max_length=10)),
+                ('start_time', models.TimeField()),
+                ('end_time', models.TimeField()),
+            ],
+            options={
+                'db_table': 'tutor_availability',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TutorClasses',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'tutor_classes',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TutorExpertise',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+            ],
+            options={
+                'db_table': 'tutor_expertise',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Tutors',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_name', models.CharField(max_length=255)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('expertise', models.CharField(blank=True, max_length=255, null=True)),
+                ('address', models.TextField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'tutors',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='Users',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, unique=True)),
+                ('email', models.CharField(max_length=150, unique=True)),
+                ('password', models.CharField(max_length=255)),
+                ('role', models.CharField(max_length=20)),
+                ('full_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('photo_url', models.CharField(blank=True, default='/media/profile/default-avatar.png', max_length=255)),
+                ('phone', models.CharField(blank=True, max_length=20, null=True)),
+                ('address', models.TextField(blank=True, null=True)),
+                ('bio', models.TextField(blank=True, null=True)),
+                ('is_active', models.BooleanField(blank=True, null=True)),
+                ('date_joined', models.DateTimeField(auto_now_add=True)),
+                ('reset_token', models.CharField(blank=True, max_length=6, null=True)),
+                ('reset_token_created_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'users',
+                'managed': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='AttendanceRollups',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField()),
+                ('scheduled', models.IntegerField(default=0)),
+                ('marked', models.IntegerField(default=0)),
+                ('confirmed', models.IntegerField(default=0)),
+                ('present', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('class_field', models.ForeignKey(db_column='class_id', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='accounts.classes')),
+                ('student', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='accounts.students')),
+                ('tutor', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='accounts.tutors')),
+            ],
+            options={
+                'db_table': 'attendance_rollups',
+                'managed': True,
+                'indexes': [models.Index(fields=['tutor', 'period'], name='attendance_rollups_tutor_idx')],
+                'constraints': [models.UniqueConstraint(fields=('student', 'class_field', 'tutor', 'period'), name='attendance_rollups_unique_key')],
+            },
+        ),
+    ]
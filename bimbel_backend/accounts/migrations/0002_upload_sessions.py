@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSessions',
+            fields=[
+                ('id', models.UUIDField(primary_key=True, serialize=False)),
+                ('purpose', models.CharField(max_length=20)),
+                ('filename', models.CharField(max_length=255)),
+                ('total_size', models.BigIntegerField()),
+                ('received', models.BigIntegerField(default=0)),
+                ('checksum', models.CharField(blank=True, max_length=64, null=True)),
+                ('status', models.CharField(default='uploading', max_length=20)),
+                ('file_path', models.CharField(blank=True, max_length=255, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, to='accounts.users')),
+            ],
+            options={
+                'db_table': 'upload_sessions',
+                'managed': True,
+            },
+        ),
+    ]
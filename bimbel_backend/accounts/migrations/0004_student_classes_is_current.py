@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# student_classes tidak dikelola Django (managed=False): kolom & index ditambahkan manual.
+# Database test/benchmark kosong belum punya tabelnya saat migrate; di sana tabel dibuat
+# belakangan dari models.py (create_missing_tables) lengkap dengan kolom & index ini.
+FORWARD_SQL = [
+    "ALTER TABLE student_classes ADD COLUMN is_current boolean NOT NULL DEFAULT false",
+    # Kelas aktif = baris terakhir per siswa (aturan lama `order_by('-id').first()`)
+    "UPDATE student_classes SET is_current = true WHERE id IN ("
+    " SELECT MAX(id) FROM student_classes WHERE student_id IS NOT NULL GROUP BY student_id)",
+    "CREATE UNIQUE INDEX student_classes_one_current ON student_classes (student_id) WHERE is_current",
+    "CREATE INDEX student_classes_current_class ON student_classes (class_id) WHERE is_current",
+]
+
+BACKWARD_SQL = [
+    "DROP INDEX IF EXISTS student_classes_current_class",
+    "DROP INDEX IF EXISTS student_classes_one_current",
+    "ALTER TABLE student_classes DROP COLUMN is_current",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        connection = schema_editor.connection
+        if "student_classes" not in connection.introspection.table_names():
+            return
+        with connection.cursor() as cursor:
+            columns = {c.name for c in connection.introspection.get_table_description(cursor, "student_classes")}
+        # Tabel yang dibuat dari models.py sudah punya kolomnya
+        if ("is_current" in columns) == (statements is FORWARD_SQL):
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_media_blobs'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(BACKWARD_SQL)),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+# Kolom path file di tabel managed=False: dicari per batch oleh scan_orphan_media (`file_url IN (...)`)
+# dan oleh cek akses media. Tabel yang dibuat dari models.py (create_missing_tables) sudah punya index ini.
+INDEXES = {
+    "materials_file_url_idx": ("materials", "file_url"),
+    "assignments_file_url_idx": ("assignments", "file_url"),
+    "submissions_file_url_idx": ("assignment_submissions", "file_url"),
+    "users_photo_url_idx": ("users", "photo_url"),
+}
+
+
+def create_indexes(apps, schema_editor):
+    tables = set(schema_editor.connection.introspection.table_names())
+    for name, (table, column) in INDEXES.items():
+        if table in tables:
+            schema_editor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({column})")
+
+
+def drop_indexes(apps, schema_editor):
+    for name in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_student_classes_is_current'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediablobs',
+            index=models.Index(fields=['path'], name='media_blobs_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='uploadsessions',
+            index=models.Index(fields=['file_path'], name='upload_sessions_file_path_idx'),
+        ),
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -26,6 +26,10 @@ class AssignmentSubmissions(models.Model):
     class Meta:
         managed = False
         db_table = 'assignment_submissions'
+        indexes = [
+            # Lookup file -> baris (cek akses media, scan_orphan_media); dibuat oleh migration 0005
+            models.Index(fields=['file_url'], name='submissions_file_url_idx'),
+        ]
 
 
 class Assignments(models.Model):
@@ -41,6 +45,9 @@ class Assignments(models.Model):
     class Meta:
         managed = False
         db_table = 'assignments'
+        indexes = [
+            models.Index(fields=['file_url'], name='assignments_file_url_idx'),
+        ]
 
 
 class Attendance(models.Model):
@@ -106,6 +113,9 @@ class Materials(models.Model):
     class Meta:
         managed = False
         db_table = 'materials'
+        indexes = [
+            models.Index(fields=['file_url'], name='materials_file_url_idx'),
+        ]
 
 
 class RescheduleRequests(models.Model):
@@ -156,10 +166,23 @@ class SignupTokens(models.Model):
 class StudentClasses(models.Model):
     student = models.ForeignKey('Students', models.DO_NOTHING, blank=True, null=True)
     class_field = models.ForeignKey(Classes, models.DO_NOTHING, db_column='class_id', blank=True, null=True)  # Field renamed because it was a Python reserved word.
+    # Kelas aktif siswa; baris lama tetap ada sebagai riwayat. Diatur oleh accounts.enrollment.
+    is_current = models.BooleanField(default=False)
 
     class Meta:
         managed = False
         db_table = 'student_classes'
+        constraints = [
+            # Maksimal satu kelas aktif per siswa; sekaligus index lookup kelas aktif
+            models.UniqueConstraint(
+                fields=['student'], condition=models.Q(is_current=True), name='student_classes_one_current',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['class_field'], condition=models.Q(is_current=True), name='student_classes_current_class',
+            ),
+        ]
 
 
 class Students(models.Model):
@@ -255,3 +278,73 @@ class Users(models.Model):
     class Meta:
         managed = False
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['photo_url'], name='users_photo_url_idx'),
+        ]
+
+class AttendanceRollups(models.Model):
+    # Ringkasan kehadiran per siswa / kelas / tutor / bulan (period = tanggal 1).
+    # Data turunan dari `attendance`, dibuat ulang dengan `manage.py rebuild_attendance_rollups`.
+    student = models.ForeignKey('Students', models.DO_NOTHING, db_constraint=False)
+    class_field = models.ForeignKey('Classes', models.DO_NOTHING, db_column='class_id', db_constraint=False)
+    tutor = models.ForeignKey('Tutors', models.DO_NOTHING, db_constraint=False)
+    period = models.DateField()
+    scheduled = models.IntegerField(default=0)
+    marked = models.IntegerField(default=0)
+    confirmed = models.IntegerField(default=0)
+    present = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True  # tabel baru, dibuat lewat migration accounts
+        db_table = 'attendance_rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'class_field', 'tutor', 'period'],
+                name='attendance_rollups_unique_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['tutor', 'period'], name='attendance_rollups_tutor_idx'),
+        ]
+
+
+class UploadSessions(models.Model):
+    # Upload bertahap (resumable): file ditulis ke MEDIA_ROOT/uploads_tmp/<id>.part sampai lengkap
+    id = models.UUIDField(primary_key=True)
+    user = models.ForeignKey('Users', models.DO_NOTHING, db_constraint=False)
+    purpose = models.CharField(max_length=20)  # material / assignment / submission
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    received = models.BigIntegerField(default=0)
+    checksum = models.CharField(max_length=64, blank=True, null=True)  # sha256 hex seluruh file (opsional)
+    status = models.CharField(max_length=20, default='uploading')  # uploading / writing (chunk sedang ditulis) / complete / attached
+    file_path = models.CharField(max_length=255, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True  # tabel baru, dibuat lewat migration accounts
+        db_table = 'upload_sessions'
+        indexes = [
+            models.Index(fields=['file_path'], name='upload_sessions_file_path_idx'),
+        ]
+
+
+class MediaBlobs(models.Model):
+    # File media content-addressed: satu baris per isi file (sha256), dipakai bersama banyak baris
+    # materials / assignments / assignment_submissions. ref_count dijaga lewat signal (accounts/signals.py).
+    sha256 = models.CharField(primary_key=True, max_length=64)
+    path = models.CharField(max_length=255)  # blobs/ab/cd/<sha256>.<ext>
+    size = models.BigIntegerField()
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        managed = True  # tabel baru, dibuat lewat migration accounts
+        db_table = 'media_blobs'
+        indexes = [
+            models.Index(fields=['ref_count', 'updated_at'], name='media_blobs_gc_idx'),
+            models.Index(fields=['path'], name='media_blobs_path_idx'),
+        ]
@@ -0,0 +1,153 @@
+# accounts/photos.py
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow opsional: tanpa Pillow response tetap memakai foto asli
+    Image = None
+    ImageOps = None
+
+from .blobs import relative_media_path
+
+logger = logging.getLogger(__name__)
+
+PHOTO_DIR = "profile"
+PHOTO_VARIANT_DIR = "profile/variants"
+PHOTO_SIZES = (48, 128, 512)
+# ekstensi -> (format Pillow, opsi save). WebP utama, JPEG untuk client lama.
+PHOTO_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+DEFAULT_PHOTO_URL = "/media/profile/default-avatar.png"
+
+# Resize dijalankan di luar request; 2 worker cukup untuk upload foto profil
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="photo-variants")
+
+
+def variant_path(source_path, size, ext):
+    """profile/user_12_foto.png -> profile/variants/user_12_foto.png-48.webp"""
+    return f"{PHOTO_VARIANT_DIR}/{os.path.basename(source_path)}-{size}.{ext}"
+
+
+def variant_source(path):
+    """Kebalikan variant_path: path foto asli, None jika bukan varian."""
+    if not path.startswith(PHOTO_VARIANT_DIR + "/"):
+        return None
+    name = path[len(PHOTO_VARIANT_DIR) + 1:]
+    source, sep, _ = name.rpartition("-")
+    return f"{PHOTO_DIR}/{source}" if sep and source else None
+
+
+def _source_path(photo_url):
+    path = relative_media_path(photo_url)
+    if not path.startswith(PHOTO_DIR + "/") or path.startswith(PHOTO_VARIANT_DIR + "/"):
+        return None
+    return path
+
+
+def _media_file(path):
+    return os.path.join(settings.MEDIA_ROOT, path)
+
+
+def _marker(source_path):
+    # Varian ditulis berurutan; file terakhir menandakan satu set sudah lengkap
+    return variant_path(source_path, PHOTO_SIZES[-1], list(PHOTO_FORMATS)[-1])
+
+
+def variants_up_to_date(source_path):
+    try:
+        return os.path.getmtime(_media_file(_marker(source_path))) >= os.path.getmtime(_media_file(source_path))
+    except OSError:
+        return False
+
+
+def generate_photo_variants(photo_url, force=False):
+    """Buat varian persegi 48/128/512 px (WebP + JPEG). Return jumlah file yang ditulis."""
+    if Image is None:
+        return 0
+    source_path = _source_path(photo_url)
+    if source_path is None or not os.path.isfile(_media_file(source_path)):
+        return 0
+    if not force and variants_up_to_date(source_path):
+        return 0
+
+    written = 0
+    with Image.open(_media_file(source_path)) as original:
+        image = ImageOps.exif_transpose(original)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+        # JPEG tidak punya alpha: tempel di atas latar putih
+        if image.mode == "RGBA":
+            flat = Image.new("RGB", image.size, (255, 255, 255))
+            flat.paste(image, mask=image.getchannel("A"))
+        else:
+            flat = image
+
+        os.makedirs(_media_file(PHOTO_VARIANT_DIR), exist_ok=True)
+        for size in PHOTO_SIZES:
+            # Jangan upscale foto kecil
+            side = min(size, *image.size)
+            for ext, (fmt, options) in PHOTO_FORMATS.items():
+                source = image if fmt == "WEBP" else flat
+                thumb = ImageOps.fit(source, (side, side), Image.LANCZOS)
+                target = _media_file(variant_path(source_path, size, ext))
+                tmp = f"{target}.tmp"
+                thumb.save(tmp, fmt, **options)
+                os.replace(tmp, target)  # client tidak pernah melihat file setengah jadi
+                written += 1
+    return written
+
+
+def _generate_in_background(photo_url):
+    try:
+        generate_photo_variants(photo_url)
+    except Exception:
+        logger.exception("Gagal membuat varian foto profil %s", photo_url)
+
+
+def schedule_photo_variants(photo_url):
+    """Dipanggil setelah upload foto profil; resize berjalan di thread setelah transaksi commit."""
+    if Image is None or _source_path(photo_url) is None:
+        return
+    transaction.on_commit(lambda: _executor.submit(_generate_in_background, photo_url))
+
+
+def photo_variants(photo_url):
+    """
+    {"48": {"webp": url, "jpg": url}, "128": ..., "512": ...} untuk foto yang variannya sudah ada,
+    {} jika belum (client memakai photo_url asli). URL diberi ?v=<mtime> supaya foto baru tidak tertahan cache.
+    """
+    source_path = _source_path(photo_url or DEFAULT_PHOTO_URL)
+    if source_path is None:
+        return {}
+    try:
+        version = int(os.path.getmtime(_media_file(_marker(source_path))))
+        if version < int(os.path.getmtime(_media_file(source_path))):
+            return {}
+    except OSError:
+        return {}
+
+    return {
+        str(size): {
+            ext: f"{settings.MEDIA_URL}{variant_path(source_path, size, ext)}?v={version}"
+            for ext in PHOTO_FORMATS
+        }
+        for size in PHOTO_SIZES
+    }
+
+
+def photo_url_for_size(photo_url, size, ext="webp"):
+    """URL varian terkecil yang >= size, jatuh ke foto asli jika varian belum ada."""
+    photo_url = photo_url or DEFAULT_PHOTO_URL
+    variants = photo_variants(photo_url)
+    if not variants:
+        return photo_url
+    chosen = next((s for s in PHOTO_SIZES if s >= size), PHOTO_SIZES[-1])
+    return variants[str(chosen)][ext]
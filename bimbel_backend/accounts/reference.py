@@ -0,0 +1,118 @@
+# accounts/reference.py
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection
+
+from bimbel_backend.db_routing import primary_if_recent
+
+from .cache import get_tag_versions
+from .models import Classes, Subjects, TutorExpertise
+
+# Tag nama tabel; sudah dinaikkan signal cache setiap save/delete Subjects, Classes & TutorExpertise
+REFERENCE_TAGS = ("subjects", "classes", "tutor_expertise")
+REFERENCE_MAX_AGE = 60  # detik; default REFERENCE_DATA_MAX_AGE
+
+
+class ReferenceData:
+    """
+    Snapshot data referensi (mata pelajaran, kelas, keahlian tutor) yang dibagi semua thread
+    di satu proses. Anggap read-only: perubahan data membuat snapshot baru, bukan mengubah yang lama.
+    """
+
+    def __init__(self, versions, subjects, classes, expertise):
+        self.versions = versions
+        self.loaded_at = time.monotonic()
+
+        self.subject_names = dict(subjects)  # id -> nama
+        self.subject_ids = {}                # nama casefold -> id, pengganti name__iexact
+        self.subject_exact_ids = {}          # nama persis -> id, pengganti name=
+        for subject_id, name in subjects:
+            self.subject_ids.setdefault(name.casefold(), subject_id)
+            self.subject_exact_ids.setdefault(name, subject_id)
+
+        self.class_names = {class_id: class_name for class_id, class_name, _ in classes}  # id -> nama
+        self.active_class_ids = frozenset(class_id for class_id, _, is_deleted in classes if not is_deleted)
+        # class_name -> id; kelas aktif didahulukan dari kelas terhapus dengan nama sama
+        self.class_ids = {}
+        for class_id, class_name, is_deleted in sorted(classes, key=lambda row: (bool(row[2]), row[0])):
+            self.class_ids.setdefault(class_name, class_id)
+
+        tutor_subjects = defaultdict(list)
+        for tutor_id, subject_id in expertise:
+            if subject_id in self.subject_names:
+                tutor_subjects[tutor_id].append(self.subject_names[subject_id])
+        self.tutor_subjects = {tutor_id: tuple(names) for tutor_id, names in tutor_subjects.items()}
+
+    def subject_id(self, name, exact=False):
+        if exact:
+            return self.subject_exact_ids.get(name)
+        return self.subject_ids.get(str(name or "").casefold())
+
+    def active_class_id(self, class_id):
+        """id kelas yang belum dihapus (class_id boleh string dari form), selain itu None."""
+        class_id = int(class_id) if str(class_id).isdigit() else None
+        return class_id if class_id in self.active_class_ids else None
+
+    def class_id(self, class_name):
+        return self.class_ids.get(class_name)
+
+    def tutor_subject_names(self, tutor_id):
+        return list(self.tutor_subjects.get(tutor_id, ()))
+
+    def tutor_subject_text(self, tutor_id, empty=""):
+        """Format lama `", ".join(te.subject.name ...)`; `empty` untuk tutor tanpa keahlian."""
+        return ", ".join(self.tutor_subjects.get(tutor_id, ())) or empty
+
+    def tutor_ids_for_subject(self, name):
+        key = str(name or "").casefold()
+        return [
+            tutor_id for tutor_id, names in self.tutor_subjects.items()
+            if any(n.casefold() == key for n in names)
+        ]
+
+
+_lock = threading.Lock()
+_snapshot = None
+
+
+def _load(versions):
+    with primary_if_recent(versions):
+        subjects = list(Subjects.objects.order_by("id").values_list("id", "name"))
+        classes = list(Classes.objects.order_by("id").values_list("id", "class_name", "is_deleted"))
+        expertise = list(TutorExpertise.objects.order_by("id").values_list("tutor_id", "subject_id"))
+    return ReferenceData(versions, subjects, classes, expertise)
+
+
+def _is_fresh(data, versions):
+    max_age = getattr(settings, "REFERENCE_DATA_MAX_AGE", REFERENCE_MAX_AGE)
+    return data is not None and data.versions == versions and time.monotonic() - data.loaded_at < max_age
+
+
+def reference_data():
+    """
+    Snapshot ReferenceData terbaru. Cek versi = satu get_many ke cache; dimuat ulang (3 query)
+    jika salah satu tag REFERENCE_TAGS naik sejak snapshot dibuat, jadi proses lain yang
+    menulis (AddSubjectView, AddClassView, UpdateTutorView) ikut terlihat lewat cache bersama.
+    Dengan cache per proses (LocMemCache) versi tag tidak dibagi antar worker: snapshot juga
+    dimuat ulang setelah REFERENCE_DATA_MAX_AGE detik.
+    """
+    global _snapshot
+    versions = get_tag_versions(REFERENCE_TAGS, create=True)
+    data = _snapshot
+    if _is_fresh(data, versions):
+        return data
+
+    # Di dalam transaksi bisa ada tulisan yang belum commit (versi baru naik saat commit):
+    # pakai untuk request ini saja, jangan dibagi ke thread lain
+    if connection.in_atomic_block:
+        return _load(versions)
+
+    with _lock:
+        data = _snapshot
+        if not _is_fresh(data, versions):
+            # Versi diambil sebelum memuat: tulisan di tengah pemuatan membuat snapshot ini dimuat ulang
+            data = _snapshot = _load(versions)
+    return data
@@ -0,0 +1,145 @@
+# accounts/rollups.py
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, TruncMonth
+
+from .cache import invalidate_tags
+from .models import Attendance, AttendanceRollups
+
+ROLLUP_FIELDS = ("scheduled", "marked", "confirmed", "present")
+
+# Satu definisi hitungan kehadiran yang dipakai semua dashboard
+ROLLUP_COUNTS = {
+    "scheduled": Count("id"),
+    "marked": Count("id", filter=Q(marked_by_tutor=True)),
+    "confirmed": Count("id", filter=Q(confirmed_by_student=True)),
+    "present": Count("id", filter=Q(marked_by_tutor=True, confirmed_by_student=True)),
+}
+
+
+def period_start(day):
+    return day.replace(day=1)
+
+
+def next_period(period):
+    return date(period.year + (period.month == 12), period.month % 12 + 1, 1)
+
+
+def refresh_attendance_rollups(schedule, student_ids=None):
+    """
+    Hitung ulang baris rollup (siswa, kelas, tutor, bulan) yang terkena perubahan absensi di `schedule`.
+    Hanya satu bulan milik satu kelas/tutor yang di-scan, bukan seluruh tabel attendance.
+    """
+    if not schedule.class_field_id or not schedule.tutor_id:
+        return
+
+    period = period_start(schedule.schedule_date)
+    attendance = Attendance.objects.filter(
+        schedule__class_field_id=schedule.class_field_id,
+        schedule__tutor_id=schedule.tutor_id,
+        schedule__schedule_date__gte=period,
+        schedule__schedule_date__lt=next_period(period),
+        student__isnull=False,
+    )
+    if student_ids is None:
+        student_ids = Attendance.objects.filter(schedule=schedule, student__isnull=False).values_list("student_id", flat=True)
+    student_ids = set(student_ids)
+    if not student_ids:
+        return
+
+    counts = {
+        row["student_id"]: row
+        for row in attendance.filter(student_id__in=student_ids).values("student_id").annotate(**ROLLUP_COUNTS)
+    }
+
+    rollups = []
+    for student_id in student_ids:
+        row = counts.get(student_id, {})
+        rollups.append(AttendanceRollups(
+            student_id=student_id,
+            class_field_id=schedule.class_field_id,
+            tutor_id=schedule.tutor_id,
+            period=period,
+            **{field: row.get(field, 0) for field in ROLLUP_FIELDS},
+        ))
+
+    AttendanceRollups.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=["student", "class_field", "tutor", "period"],
+        update_fields=[*ROLLUP_FIELDS, "updated_at"],
+    )
+    # bulk_create tidak memicu signal; dashboard yang sudah di-cache sebelum refresh ikut dibuang
+    invalidate_tags(
+        f"class:{schedule.class_field_id}",
+        f"tutor:{schedule.tutor_id}",
+        *(f"student:{student_id}" for student_id in student_ids),
+    )
+
+
+def refresh_attendance_rollups_on_commit(schedule, student_ids=None):
+    student_ids = list(student_ids) if student_ids is not None else None
+    transaction.on_commit(lambda: refresh_attendance_rollups(schedule, student_ids))
+
+
+def rebuild_attendance_rollups(batch_size=1000):
+    """Bangun ulang seluruh tabel rollup dari attendance (dipakai oleh management command)."""
+    rows = (
+        Attendance.objects
+        .filter(
+            student__isnull=False,
+            schedule__class_field__isnull=False,
+            schedule__tutor__isnull=False,
+        )
+        .annotate(period=TruncMonth("schedule__schedule_date"))
+        .values("student_id", "schedule__class_field_id", "schedule__tutor_id", "period")
+        .annotate(**ROLLUP_COUNTS)
+        .order_by()
+    )
+
+    with transaction.atomic():
+        AttendanceRollups.objects.all().delete()
+        batch, total = [], 0
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(AttendanceRollups(
+                student_id=row["student_id"],
+                class_field_id=row["schedule__class_field_id"],
+                tutor_id=row["schedule__tutor_id"],
+                period=row["period"],
+                **{field: row[field] for field in ROLLUP_FIELDS},
+            ))
+            if len(batch) >= batch_size:
+                AttendanceRollups.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            AttendanceRollups.objects.bulk_create(batch)
+            total += len(batch)
+    invalidate_tags("attendance_rollups")
+    return total
+
+
+def _sums():
+    return {field: Coalesce(Sum(field), 0) for field in ROLLUP_FIELDS}
+
+
+def attendance_totals(**filters):
+    """Total scheduled/marked/confirmed/present dari rollup, mis. attendance_totals(student=s)."""
+    return AttendanceRollups.objects.filter(**filters).aggregate(**_sums())
+
+
+def attendance_totals_by(field, **filters):
+    """Sama seperti attendance_totals, dikelompokkan per `field` (mis. "student_id")."""
+    return {
+        row[field]: row
+        for row in AttendanceRollups.objects.filter(**filters).values(field).annotate(**_sums()).order_by()
+    }
+
+
+def attendance_percent(totals):
+    scheduled = totals.get("scheduled", 0) if totals else 0
+    if not scheduled:
+        return "0%"
+    return f"{round(totals['present'] / scheduled * 100)}%"
@@ -0,0 +1,164 @@
+# accounts/signals.py
+import functools
+
+from django.db.models.signals import post_init, pre_save, post_save, post_delete
+
+from . import models
+from .blobs import BLOB_FILE_MODELS, add_blob_refs, blob_sha_from_url, release_media_file
+from .cache import invalidate_tags_on_commit
+
+# field -> prefix tag. Setiap model juga selalu meng-invalidate tag nama tabelnya (mis. "schedules").
+TAG_FIELDS = {
+    models.Users: {"id": "user"},
+    models.Students: {"id": "student", "user_id": "user"},
+    models.Tutors: {"id": "tutor", "user_id": "user"},
+    models.Classes: {"id": "class"},
+    models.StudentClasses: {"student_id": "student", "class_field_id": "class"},
+    models.TutorClasses: {"tutor_id": "tutor", "class_field_id": "class"},
+    models.Schedules: {"id": "schedule", "class_field_id": "class", "tutor_id": "tutor"},
+    models.Attendance: {"student_id": "student", "schedule_id": "schedule"},
+    models.Assignments: {"id": "assignment", "class_field_id": "class", "tutor_id": "tutor"},
+    models.AssignmentSubmissions: {"student_id": "student", "assignment_id": "assignment"},
+    models.Materials: {"id": "material", "class_field_id": "class", "tutor_id": "tutor"},
+    models.RescheduleRequests: {"schedule_id": "schedule", "requested_by_tutor_id": "tutor"},
+    models.Feedbacks: {"student_id": "student", "tutor_id": "tutor"},
+    models.TutorExpertise: {"tutor_id": "tutor"},
+    models.TutorAvailability: {"tutor_id": "tutor"},
+    models.BimbelRating: {"tutor_id": "tutor"},
+    models.ScheduleMaterials: {"schedule_id": "schedule", "material_id": "material"},
+    models.ScheduleAssignments: {"schedule_id": "schedule", "assignment_id": "assignment"},
+    models.Subjects: {},
+    models.SignupTokens: {},
+    models.AppSettings: {},
+}
+
+
+@functools.cache
+def tracked_fields(model):
+    # Kolom yang nilai lamanya dibutuhkan pre_save: FK untuk tag lama, file_url untuk ref count blob
+    fields = [f for f in TAG_FIELDS.get(model, {}) if f != "id"]
+    if model in BLOB_FILE_MODELS:
+        fields.append("file_url")
+    return tuple(fields)
+
+
+def remember_loaded_values(sender, instance, **kwargs):
+    # Dicatat saat instance dibuat (post_init, termasuk dari query): pre_save tidak perlu SELECT baris lama
+    instance._loaded_values = {f: instance.__dict__[f] for f in tracked_fields(sender) if f in instance.__dict__}
+
+
+def loaded_values(sender, instance, fields):
+    """
+    Nilai `fields` saat instance dimuat/disimpan terakhir. Kolom yang di-defer (.only()) dibaca dari
+    database sekali dan diisi ke instance, supaya tag baru tidak memicu query deferred lagi.
+    """
+    values = getattr(instance, "_loaded_values", {})
+    missing = [f for f in fields if f not in values]
+    if missing:
+        row = sender.objects.filter(pk=instance.pk).values(*missing).first() or {}
+        for f, value in row.items():
+            instance.__dict__.setdefault(f, value)
+        values = instance._loaded_values = {**values, **row}
+    return {f: values.get(f) for f in fields}
+
+
+def track_loaded_values(model):
+    if not tracked_fields(model):
+        return
+    uid = f"loaded-values-{model.__name__}"
+    post_init.connect(remember_loaded_values, sender=model, dispatch_uid=uid)
+    # Setelah save, nilai yang baru disimpan menjadi nilai lama untuk save berikutnya
+    post_save.connect(remember_loaded_values, sender=model, dispatch_uid=uid)
+
+
+def assignment_tutor_id(instance, assignment_id):
+    # Pakai assignment yang sudah ter-cache di instance (mis. update_or_create(assignment=...)) jika ada
+    field = instance._meta.get_field("assignment")
+    if field.is_cached(instance):
+        assignment = field.get_cached_value(instance)
+        if assignment is not None and assignment.id == assignment_id:
+            return assignment.tutor_id
+    return models.Assignments.objects.filter(id=assignment_id).values_list("tutor_id", flat=True).first()
+
+
+def tags_for_instance(instance, values=None):
+    fields = TAG_FIELDS.get(type(instance), {})
+    values = values if values is not None else {f: getattr(instance, f, None) for f in fields}
+    tags = {instance._meta.db_table}
+    for field, prefix in fields.items():
+        if values.get(field) is not None:
+            tags.add(f"{prefix}:{values[field]}")
+
+    # Submission tidak menyimpan tutor_id, padahal dashboard tutor menghitung submission
+    if isinstance(instance, models.AssignmentSubmissions) and values.get("assignment_id"):
+        tutor_id = assignment_tutor_id(instance, values["assignment_id"])
+        if tutor_id:
+            tags.add(f"tutor:{tutor_id}")
+    return tags
+
+
+def remember_old_tags(sender, instance, raw=False, **kwargs):
+    # Simpan tag dari nilai lama, supaya pindah kelas/tutor juga meng-invalidate pemilik lama
+    instance._old_cache_tags = set()
+    fk_fields = [f for f in TAG_FIELDS.get(sender, {}) if f != "id"]
+    if raw or instance.pk is None or instance._state.adding or not fk_fields:
+        return
+    old = loaded_values(sender, instance, fk_fields)
+    # FK tidak berubah: tag lama sama dengan tag baru
+    if all(old[f] == getattr(instance, f, None) for f in fk_fields):
+        return
+    old["id"] = instance.pk
+    instance._old_cache_tags = tags_for_instance(instance, old)
+
+
+def invalidate_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    tags = tags_for_instance(instance) | getattr(instance, "_old_cache_tags", set())
+    invalidate_tags_on_commit(*tags)
+
+
+def invalidate_on_delete(sender, instance, **kwargs):
+    invalidate_tags_on_commit(*tags_for_instance(instance))
+
+
+def connect_cache_signals():
+    for model in TAG_FIELDS:
+        uid = f"response-cache-{model.__name__}"
+        track_loaded_values(model)
+        pre_save.connect(remember_old_tags, sender=model, dispatch_uid=uid)
+        post_save.connect(invalidate_on_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(invalidate_on_delete, sender=model, dispatch_uid=uid)
+
+
+def remember_old_file(sender, instance, raw=False, **kwargs):
+    instance._old_file_url = None
+    if raw or instance.pk is None or instance._state.adding:
+        return
+    instance._old_file_url = loaded_values(sender, instance, ["file_url"])["file_url"]
+
+
+def count_file_on_save(sender, instance, raw=False, **kwargs):
+    # Ganti file (edit materi/tugas, submit ulang): blob baru +1, file lama dilepas
+    old_url = getattr(instance, "_old_file_url", None)
+    if raw or instance.file_url == old_url:
+        return
+    sha256 = blob_sha_from_url(instance.file_url)
+    if sha256:
+        add_blob_refs(sha256, 1)
+    if old_url:
+        release_media_file(old_url)
+
+
+def release_file_on_delete(sender, instance, **kwargs):
+    if instance.file_url:
+        release_media_file(instance.file_url)
+
+
+def connect_blob_signals():
+    for model in BLOB_FILE_MODELS:
+        uid = f"media-blobs-{model.__name__}"
+        track_loaded_values(model)
+        pre_save.connect(remember_old_file, sender=model, dispatch_uid=uid)
+        post_save.connect(count_file_on_save, sender=model, dispatch_uid=uid)
+        post_delete.connect(release_file_on_delete, sender=model, dispatch_uid=uid)
@@ -0,0 +1,285 @@
+# accounts/synthetic.py
+import random
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import get_cache
+from .models import (
+    Assignments,
+    AssignmentSubmissions,
+    Attendance,
+    Classes,
+    Feedbacks,
+    Materials,
+    RescheduleRequests,
+    Schedules,
+    StudentClasses,
+    Students,
+    Subjects,
+    TutorAvailability,
+    TutorClasses,
+    TutorExpertise,
+    Tutors,
+    Users,
+)
+from .rollups import rebuild_attendance_rollups
+
+# Jumlah siswa per skala; data lain proporsional terhadap jumlah siswa
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+STUDENTS_PER_CLASS = 25
+STUDENTS_PER_TUTOR = 20
+TUTORS_PER_CLASS = 2
+PAST_WEEKS = 8  # satu pertemuan per kelas per minggu, semuanya sudah diabsen
+UPCOMING_WEEKS = 2
+ASSIGNMENTS_PER_CLASS = 4
+MATERIALS_PER_CLASS = 3
+SUBMISSION_RATE = 0.75
+FEEDBACK_RATE = 0.25
+RESCHEDULE_RATE = 0.1
+BULK_BATCH_SIZE = 2000
+
+SYNTHETIC_PASSWORD = "password123"
+SUBJECT_NAMES = ("Matematika", "Fisika", "Kimia", "Biologi", "Bahasa Indonesia", "Bahasa Inggris", "Ekonomi", "Geografi")
+LEVELS = ("SD", "SMP", "SMA")
+DAYS = ("Senin", "Selasa", "Rabu", "Kamis", "Jumat", "Sabtu")
+FIRST_NAMES = ("Andi", "Budi", "Citra", "Dewi", "Eka", "Fajar", "Gita", "Hadi", "Indah", "Joko", "Kartika", "Lestari")
+LAST_NAMES = ("Pratama", "Saputra", "Wijaya", "Lestari", "Hidayat", "Nugroho", "Santoso", "Kurniawan", "Permata")
+
+
+def parse_scale(value):
+    """"10k" / "10000" -> 10000."""
+    if value in SCALES:
+        return SCALES[value]
+    if value.lower().endswith("k") and value[:-1].isdigit():
+        return int(value[:-1]) * 1000
+    return int(value)
+
+
+def create_missing_tables():
+    """
+    Buat tabel model accounts (managed=False) yang belum ada, langsung dari definisi di models.py.
+    Dipakai untuk database test/benchmark yang kosong; tabel managed dibuat oleh migrate.
+    """
+    existing = set(connection.introspection.table_names())
+    created = []
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config("accounts").get_models():
+            if model._meta.db_table not in existing:
+                editor.create_model(model)
+                # create_model melewati Meta.indexes untuk model managed=False
+                if not model._meta.managed:
+                    for index in model._meta.indexes:
+                        editor.add_index(model, index)
+                existing.add(model._meta.db_table)
+                created.append(model._meta.db_table)
+    return created
+
+
+def flush_accounts_tables():
+    """Kosongkan semua tabel accounts (TRUNCATE di PostgreSQL) tanpa signal per baris."""
+    existing = set(connection.introspection.table_names())
+    tables = [
+        model._meta.db_table
+        for model in apps.get_app_config("accounts").get_models()
+        if model._meta.db_table in existing
+    ]
+    connection.ops.execute_sql_flush(connection.ops.sql_flush(no_style(), tables, reset_sequences=True))
+    get_cache().clear()
+
+
+def _bulk(model, objs, batch_size=BULK_BATCH_SIZE):
+    """bulk_create per batch dari iterator; return list id (PostgreSQL & SQLite mengembalikan pk)."""
+    ids = []
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return ids
+        ids.extend(obj.pk for obj in model.objects.bulk_create(batch))
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _at(day, at):
+    value = datetime.combine(day, at)
+    return timezone.make_aware(value) if settings.USE_TZ else value
+
+
+def generate_dataset(students, seed=42, today=None, stdout=None):
+    """
+    Isi database dengan data sintetis untuk `students` siswa: kelas, tutor, jadwal 8 minggu terakhir
+    + 2 minggu ke depan, absensi, tugas, jawaban, materi, feedback dan permintaan reschedule.
+    Semua insert lewat bulk_create (tanpa signal cache/blob). Return dict jumlah baris per tabel.
+    """
+    rng = random.Random(seed)
+    today = today or date.today()
+    now = timezone.now()
+    password = make_password(SYNTHETIC_PASSWORD)  # satu hash untuk semua akun, make_password lambat
+    n_classes = max(1, -(-students // STUDENTS_PER_CLASS))
+    n_tutors = max(TUTORS_PER_CLASS, students // STUDENTS_PER_TUTOR)
+    counts = {}
+
+    def log(table, ids):
+        counts[table] = len(ids)
+        if stdout:
+            stdout.write(f"  {table:<24} {len(ids):>9}")
+        return ids
+
+    with transaction.atomic():
+        subject_ids = log("subjects", _bulk(Subjects, (Subjects(name=name) for name in SUBJECT_NAMES)))
+
+        admin_ids = _bulk(Users, [Users(
+            username="admin", email="admin@bimbel.test", password=password, role="admin",
+            full_name="Admin Bimbel", is_active=True,
+        )])
+
+        tutor_names = [_name(rng) for _ in range(n_tutors)]
+        tutor_user_ids = _bulk(Users, (
+            Users(
+                username=f"tutor{i}", email=f"tutor{i}@bimbel.test", password=password, role="tutor",
+                full_name=name, is_active=True,
+            )
+            for i, name in enumerate(tutor_names, 1)
+        ))
+        tutor_ids = log("tutors", _bulk(Tutors, (
+            Tutors(user_id=user_id, full_name=name, phone=f"08{rng.randrange(10**9, 10**10)}", address="Jakarta")
+            for user_id, name in zip(tutor_user_ids, tutor_names)
+        )))
+        tutor_subjects = {tutor_id: rng.sample(subject_ids, 2) for tutor_id in tutor_ids}
+        log("tutor_expertise", _bulk(TutorExpertise, (
+            TutorExpertise(tutor_id=tutor_id, subject_id=subject_id)
+            for tutor_id, subject_ids_ in tutor_subjects.items() for subject_id in subject_ids_
+        )))
+        log("tutor_availability", _bulk(TutorAvailability, (
+            TutorAvailability(tutor_id=tutor_id, day_of_week=day, start_time=time(8), end_time=time(17))
+            for tutor_id in tutor_ids for day in rng.sample(DAYS, 3)
+        )))
+
+        class_ids = log("classes", _bulk(Classes, (
+            Classes(
+                class_name=f"Kelas {i}", level=LEVELS[i % len(LEVELS)], capacity=STUDENTS_PER_CLASS + 5,
+                current_student_count=min(STUDENTS_PER_CLASS, students - (i - 1) * STUDENTS_PER_CLASS),
+                is_deleted=False, created_at=now,
+            )
+            for i in range(1, n_classes + 1)
+        )))
+        class_tutors = {
+            class_id: [tutor_ids[(i * TUTORS_PER_CLASS + k) % len(tutor_ids)] for k in range(TUTORS_PER_CLASS)]
+            for i, class_id in enumerate(class_ids)
+        }
+        log("tutor_classes", _bulk(TutorClasses, (
+            TutorClasses(tutor_id=tutor_id, class_field_id=class_id)
+            for class_id, tutor_ids_ in class_tutors.items() for tutor_id in tutor_ids_
+        )))
+
+        student_names = [_name(rng) for _ in range(students)]
+        student_user_ids = _bulk(Users, (
+            Users(
+                username=f"siswa{i}", email=f"siswa{i}@bimbel.test", password=password, role="student",
+                full_name=name, is_active=True,
+            )
+            for i, name in enumerate(student_names, 1)
+        ))
+        log("users", admin_ids + tutor_user_ids + student_user_ids)
+        student_ids = log("students", _bulk(Students, (
+            Students(
+                user_id=user_id, student_id=f"S{i:06d}", full_name=name, gender=rng.choice(("Laki-laki", "Perempuan")),
+                birthdate=date(2008, 1, 1) + timedelta(days=rng.randrange(3000)), parent_contact="0811",
+            )
+            for i, (user_id, name) in enumerate(zip(student_user_ids, student_names), 1)
+        )))
+        class_students = {
+            class_id: student_ids[i * STUDENTS_PER_CLASS:(i + 1) * STUDENTS_PER_CLASS]
+            for i, class_id in enumerate(class_ids)
+        }
+        log("student_classes", _bulk(StudentClasses, (
+            StudentClasses(student_id=student_id, class_field_id=class_id, is_current=True)
+            for class_id, ids in class_students.items() for student_id in ids
+        )))
+
+        # Jadwal: satu pertemuan per kelas per minggu, bergantian antar tutor kelas
+        schedule_rows = [
+            (class_id, class_tutors[class_id][week % TUTORS_PER_CLASS], today + timedelta(weeks=week, days=i % 6))
+            for i, class_id in enumerate(class_ids)
+            for week in range(-PAST_WEEKS, UPCOMING_WEEKS)
+        ]
+        schedule_ids = log("schedules", _bulk(Schedules, (
+            Schedules(
+                class_field_id=class_id, tutor_id=tutor_id, subject_id=tutor_subjects[tutor_id][0],
+                schedule_date=day, start_time=time(8 + class_id % 8), end_time=time(9 + class_id % 8),
+                status="completed" if day < today else "upcoming", room=f"R{class_id % 20 + 1}",
+            )
+            for class_id, tutor_id, day in schedule_rows
+        )))
+        schedules = list(zip(schedule_ids, schedule_rows))
+
+        log("attendance", _bulk(Attendance, (
+            Attendance(
+                student_id=student_id, schedule_id=schedule_id, marked_by_tutor=rng.random() < 0.9,
+                confirmed_by_student=rng.random() < 0.8, timestamp=_at(day, time(9)),
+            )
+            for schedule_id, (class_id, _, day) in schedules if day < today
+            for student_id in class_students[class_id]
+        )))
+        log("reschedule_requests", _bulk(RescheduleRequests, (
+            RescheduleRequests(
+                schedule_id=schedule_id, requested_by_tutor_id=tutor_id, reason="Bentrok jadwal",
+                status="Pending", requested_at=now,
+            )
+            for schedule_id, (_, tutor_id, day) in schedules if day >= today and rng.random() < RESCHEDULE_RATE
+        )))
+
+        assignment_rows = [
+            (class_id, class_tutors[class_id][k % TUTORS_PER_CLASS], k)
+            for class_id in class_ids for k in range(ASSIGNMENTS_PER_CLASS)
+        ]
+        assignment_ids = log("assignments", _bulk(Assignments, (
+            Assignments(
+                class_field_id=class_id, tutor_id=tutor_id, title=f"Tugas {k + 1}", description="Kerjakan soal latihan",
+                file_url=None, subject_id=tutor_subjects[tutor_id][0],
+                due_date=now + timedelta(days=7 * (k - ASSIGNMENTS_PER_CLASS + 2)),
+                created_at=now - timedelta(days=7 * (ASSIGNMENTS_PER_CLASS - k)),
+            )
+            for class_id, tutor_id, k in assignment_rows
+        )))
+        log("assignment_submissions", _bulk(AssignmentSubmissions, (
+            AssignmentSubmissions(
+                assignment_id=assignment_id, student_id=student_id, file_url="/media/jawaban_tugas/contoh.pdf",
+                grade=rng.randrange(50, 101) if k < ASSIGNMENTS_PER_CLASS - 1 else None,
+                feedback="Bagus" if k < ASSIGNMENTS_PER_CLASS - 1 else None,
+                submitted_at=now - timedelta(days=7 * (ASSIGNMENTS_PER_CLASS - k) - 2),
+            )
+            for assignment_id, (class_id, _, k) in zip(assignment_ids, assignment_rows)
+            for student_id in class_students[class_id] if rng.random() < SUBMISSION_RATE
+        )))
+
+        log("materials", _bulk(Materials, (
+            Materials(
+                class_field_id=class_id, tutor_id=class_tutors[class_id][k % TUTORS_PER_CLASS],
+                title=f"Materi {k + 1}", file_url=f"material/contoh-{k + 1}.pdf", type="pdf",
+                subject=SUBJECT_NAMES[(class_id + k) % len(SUBJECT_NAMES)], is_approved=k > 0,
+                uploaded_at=now - timedelta(days=k),
+            )
+            for class_id in class_ids for k in range(MATERIALS_PER_CLASS)
+        )))
+        log("feedbacks", _bulk(Feedbacks, (
+            Feedbacks(
+                student_id=student_id, tutor_id=class_tutors[class_id][0], rating=rng.randrange(3, 6),
+                comment="Penjelasannya jelas", is_approved=rng.random() < 0.9,
+            )
+            for class_id, ids in class_students.items() for student_id in ids if rng.random() < FEEDBACK_RATE
+        )))
+
+    counts["attendance_rollups"] = rebuild_attendance_rollups()
+    get_cache().clear()
+    return counts
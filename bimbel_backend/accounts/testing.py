@@ -0,0 +1,94 @@
+# accounts/testing.py
+from django.test import TestCase, override_settings
+
+from bimbel_backend.query_budget import assert_max_queries, get_query_budget, view_key
+
+from .benchmarks import build_fixtures, panel_get_endpoints
+from .cache import get_cache
+from .reference import reference_data
+from .synthetic import create_missing_tables, flush_accounts_tables, generate_dataset
+
+
+class AccountsTestCase(TestCase):
+    """
+    TestCase untuk model accounts (managed=False): tabelnya dibuat dari models.py sebelum
+    transaksi test dibuka (schema editor SQLite tidak bisa dipakai di dalam atomic).
+    Cache dikosongkan per test supaya versi tag & response cache tidak bocor antar test.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        create_missing_tables()
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+
+
+@override_settings(QUERY_BUDGET_ENABLED=False, RESPONSE_CACHE_ENABLED=False)
+class QueryBudgetTestCase(TestCase):
+    """
+    Isi database test dengan data sintetis lalu panggil setiap endpoint GET app panel
+    (`app`, atau semua QUERY_BUDGET_APPS jika None) dengan budget dari <app>/query_budgets.py.
+
+    Data dibuat sekali per class di luar transaksi test (tabel accounts managed=False dibuat
+    dari models.py), supaya snapshot reference_data() bisa dimuat dulu seperti di
+    `manage.py check_query_budgets`. Cache response dimatikan: yang diukur jalur dingin.
+    """
+
+    app = None
+    students = 200  # skala yang sama dengan `generate_synthetic_data --scale 200`
+
+    @classmethod
+    def setUpClass(cls):
+        create_missing_tables()
+        flush_accounts_tables()
+        generate_dataset(cls.students)
+        reference_data()
+        cls.endpoint_fixtures = cls.build_fixtures()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        flush_accounts_tables()
+
+    @classmethod
+    def build_fixtures(cls):
+        return build_fixtures()
+
+    def get_endpoints(self):
+        return list(panel_get_endpoints(app=self.app, fixtures=self.endpoint_fixtures))
+
+    def assert_get_views_within_budget(self):
+        endpoints = self.get_endpoints()
+        self.assertTrue(endpoints, f"tidak ada endpoint GET di {self.app or 'app panel'}")
+
+        for view_class, path, params in endpoints:
+            name = view_key(view_class)
+            with self.subTest(view=name):
+                self.assertIsNotNone(path, f"{name}: tidak ada data contoh untuk parameter URL")
+                budget = get_query_budget(view_class, "GET")
+                self.assertIsNotNone(budget, f"{name}: belum ada di QUERY_BUDGETS")
+
+                with assert_max_queries(budget, name):
+                    response = self.client.get(path, params)
+                    if response.streaming:
+                        for _ in response.streaming_content:
+                            pass
+                self.assertEqual(response.status_code, 200, f"{name}: {path}")
+
+    def assert_write_within_budget(self, view_class, method, path, data=None, **extra):
+        """
+        Satu request tulis di dalam `assert_max_queries` dengan budget `method` view tsb. Callback
+        on_commit (invalidasi cache, refresh rollup) dijalankan di dalam blok: ikut dihitung.
+        """
+        name = f"{view_key(view_class)} {method}"
+        budget = get_query_budget(view_class, method)
+        self.assertIsNotNone(budget, f"{name}: belum ada di QUERY_BUDGETS")
+
+        with assert_max_queries(budget, name):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = getattr(self.client, method.lower())(path, data, **extra)
+        return response
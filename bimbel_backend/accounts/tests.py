@@ -1,3 +1,549 @@
-from django.test import TestCase
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+
+from admin_panel.views import AdminDashboardView
+from bimbel_backend.profiling import save_profile
+from student_panel.views import SubmitAssignmentView
+from tutor_panel.views import MarkAttendanceView
+
+from . import reference
+from .blobs import collect_unreferenced_blobs, recount_blob_refs, store_blob
+from .cache import cached_value, get_tag_versions
+from .enrollment import (
+    AlreadyEnrolled,
+    ClassFull,
+    current_class_id,
+    current_enrollments,
+    enroll_student,
+    reconcile_class_counts,
+    reserve_class_seat,
+)
+from .media import parse_range
+from .media_scan import scan_media
+from .models import (
+    Attendance,
+    Classes,
+    Materials,
+    MediaBlobs,
+    Schedules,
+    SignupTokens,
+    StudentClasses,
+    Students,
+    Subjects,
+    Tutors,
+    UploadSessions,
+    Users,
+)
+from .reference import REFERENCE_TAGS, ReferenceData, reference_data
+from .rollups import refresh_attendance_rollups
+from .testing import AccountsTestCase, QueryBudgetTestCase
+from .uploads import UPLOAD_CLAIM_TIMEOUT, UploadError, create_upload, take_completed_upload
+
+
+class ReferenceDataTests(AccountsTestCase):
+    def setUp(self):
+        super().setUp()
+        snapshot = reference._snapshot
+        self.addCleanup(setattr, reference, "_snapshot", snapshot)
+
+    def test_snapshot_reloaded_after_max_age_without_tag_bump(self):
+        # bulk_create tanpa signal = subject yang ditambah worker lain (versi tag di LocMemCache tidak ikut naik)
+        Subjects.objects.bulk_create([Subjects(name="Fisika")])
+        reference._snapshot = ReferenceData(get_tag_versions(REFERENCE_TAGS, create=True), [], [], [])
+
+        self.assertIsNone(reference_data().subject_id("fisika"))
+        with override_settings(REFERENCE_DATA_MAX_AGE=0):
+            self.assertIsNotNone(reference_data().subject_id("fisika"))
+
+    def test_tag_bump_reloads_snapshot(self):
+        reference._snapshot = ReferenceData(get_tag_versions(REFERENCE_TAGS, create=True), [], [], [])
+        # Versi tag naik saat commit; di dalam TestCase callback on_commit dijalankan manual
+        with self.captureOnCommitCallbacks(execute=True):
+            Subjects.objects.create(name="Kimia")
+        self.assertIsNotNone(reference_data().subject_id("Kimia"))
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=True)
+class TagInvalidationTests(AccountsTestCase):
+    def test_cached_value_refreshed_after_commit(self):
+        cls = Classes.objects.create(class_name="Kelas A")
+        key, tags = "test:class-name", [f"class:{cls.id}"]
+
+        def class_name():
+            return Classes.objects.get(id=cls.id).class_name
+
+        self.assertEqual(cached_value(key, tags, class_name), "Kelas A")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            cls.class_name = "Kelas B"
+            cls.save()
+            # Belum commit: request lain masih melihat nilai lama
+            self.assertEqual(cached_value(key, tags, class_name), "Kelas A")
+        self.assertTrue(callbacks)
+
+        for callback in callbacks:
+            callback()
+        self.assertEqual(cached_value(key, tags, class_name), "Kelas B")
+
+    def test_moving_row_invalidates_old_and_new_owner(self):
+        old_class = Classes.objects.create(class_name="Kelas A")
+        new_class = Classes.objects.create(class_name="Kelas B")
+        schedule = Schedules.objects.create(
+            class_field=old_class, schedule_date=timezone.localdate(),
+            start_time="08:00", end_time="09:30", status="scheduled",
+        )
+        tags = ["schedules", f"class:{old_class.id}", f"class:{new_class.id}"]
+        before = get_tag_versions(tags, create=True)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            schedule.class_field = new_class
+            schedule.save()
+
+        after = get_tag_versions(tags)
+        for tag in tags:
+            with self.subTest(tag=tag):
+                self.assertNotEqual(after[tag], before[tag])
+
+    def test_old_owner_read_from_loaded_instance(self):
+        class_a = Classes.objects.create(class_name="Kelas A")
+        class_b = Classes.objects.create(class_name="Kelas B")
+        schedule_id = Schedules.objects.create(
+            class_field=class_a, schedule_date=timezone.localdate(),
+            start_time="08:00", end_time="09:30", status="scheduled",
+        ).id
+
+        # Nilai lama dicatat saat baris dimuat: save hanya menjalankan UPDATE, tanpa SELECT baris lama.
+        # .only() men-defer FK, jadi nilai lamanya dibaca dari database saat save.
+        for queryset, old_class, new_class, queries in (
+            (Schedules.objects.all(), class_a, class_b, 1),
+            (Schedules.objects.only("id"), class_b, class_a, 2),
+        ):
+            with self.subTest(old_class=old_class.class_name):
+                schedule = queryset.get(id=schedule_id)
+                before = get_tag_versions([f"class:{old_class.id}"], create=True)
+                with self.captureOnCommitCallbacks(execute=True):
+                    schedule.class_field = new_class
+                    with self.assertNumQueries(queries):
+                        schedule.save()
+                after = get_tag_versions([f"class:{old_class.id}"])
+                self.assertNotEqual(after, before)
+
+
+class MediaTestCase(AccountsTestCase):
+    """MEDIA_ROOT sementara per test: file upload/blob tidak menyentuh folder media proyek."""
+
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+    def write_media(self, path, data):
+        full_path = os.path.join(self.media_root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "wb") as f:
+            f.write(data)
+        return full_path
+
+
+class ParseRangeTests(SimpleTestCase):
+    def test_satisfiable_ranges(self):
+        cases = {
+            "bytes=0-9": (0, 9),
+            "bytes=90-": (90, 99),
+            "bytes=95-200": (95, 99),
+            "bytes=-10": (90, 99),
+            "bytes=-500": (0, 99),
+            " bytes=5-5 ": (5, 5),
+        }
+        for header, expected in cases.items():
+            with self.subTest(header=header):
+                self.assertEqual(parse_range(header, 100), expected)
+
+    def test_invalid_or_unsatisfiable_ranges(self):
+        for header in ("bytes=100-", "bytes=10-5", "bytes=-0", "bytes=-", "bytes=0-1,5-6", "items=0-9", "bytes=a-b"):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 100))
+
+
+class ProtectedMediaRangeTests(MediaTestCase):
+    data = bytes(range(256)) * 4
+
+    def setUp(self):
+        super().setUp()
+        self.write_media("material/contoh.pdf", self.data)
+        admin = Users.objects.create(username="admin", email="admin@example.com", password="x", role="admin", is_active=True)
+        self.url = f"/api/media/material/contoh.pdf?user_id={admin.id}"
+
+    def test_range_request_returns_partial_content(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{len(self.data)}")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(b"".join(response.streaming_content), self.data[10:20])
+
+    def test_suffix_range_returns_file_tail(self):
+        response = self.client.get(self.url, HTTP_RANGE="bytes=-4")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), self.data[-4:])
+
+    def test_unsatisfiable_range_returns_416(self):
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.data)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.data)}")
+
+    def test_without_range_returns_whole_file(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(b"".join(response.streaming_content), self.data)
+
+
+class UploadTestCase(MediaTestCase):
+    def setUp(self):
+        super().setUp()
+        self.owner = Users.objects.create(username="siswa1", email="siswa1@example.com", password="x", role="student")
+        self.other = Users.objects.create(username="siswa2", email="siswa2@example.com", password="x", role="student")
+
+    def start_upload(self, data=b"isi file pdf", **kwargs):
+        return create_upload(self.owner.id, "submission", "jawaban.pdf", len(data), **kwargs)
+
+    def send_chunk(self, upload, data, offset, user=None, **headers):
+        return self.client.patch(
+            f"/api/uploads/{upload.id}/?user_id={(user or self.owner).id}",
+            data,
+            content_type="application/offset+octet-stream",
+            HTTP_UPLOAD_OFFSET=str(offset),
+            **headers,
+        )
+
+
+class UploadOwnershipTests(UploadTestCase):
+    def test_offset_only_visible_to_owner(self):
+        upload = self.start_upload()
+
+        response = self.client.get(f"/api/uploads/{upload.id}/?user_id={self.owner.id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Upload-Offset"], "0")
+
+        for query in (f"?user_id={self.other.id}", ""):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f"/api/uploads/{upload.id}/{query}").status_code, 404)
+
+    def test_chunk_from_other_user_rejected(self):
+        upload = self.start_upload()
+
+        response = self.send_chunk(upload, b"isi", 0, user=self.other)
+        self.assertEqual(response.status_code, 404)
+        upload.refresh_from_db()
+        self.assertEqual((upload.received, upload.status), (0, "uploading"))
+
+        self.assertEqual(self.send_chunk(upload, b"isi", 0).status_code, 200)
+
+    def test_completed_upload_attached_once_by_owner(self):
+        data = b"isi file pdf"
+        upload = self.start_upload(data)
+        self.send_chunk(upload, data, 0)
+
+        with self.assertRaises(UploadError) as error:
+            take_completed_upload(upload.id, "submission", self.other.id)
+        self.assertEqual(error.exception.status, 403)
+
+        path = take_completed_upload(upload.id, "submission", self.owner.id)
+        with open(os.path.join(self.media_root, path), "rb") as f:
+            self.assertEqual(f.read(), data)
+        with self.assertRaises(UploadError):
+            take_completed_upload(upload.id, "submission", self.owner.id)
+
+
+class UploadProtocolTests(UploadTestCase):
+    data = b"0123456789" * 10
+
+    def test_resume_from_last_offset(self):
+        upload = self.start_upload(self.data)
+
+        response = self.send_chunk(upload, self.data[:40], 0)
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (200, "40"))
+
+        # Chunk yang sama dikirim ulang (client tidak tahu chunk pertama sudah masuk): 409 + offset benar
+        response = self.send_chunk(upload, self.data[:40], 0)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual((response.json()["offset"], response["Upload-Offset"]), (40, "40"))
+
+        response = self.send_chunk(upload, self.data[40:], 40)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "complete")
+
+        upload.refresh_from_db()
+        with open(os.path.join(self.media_root, upload.file_path), "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_claimed_upload_rejects_concurrent_chunk(self):
+        upload = self.start_upload(self.data)
+        UploadSessions.objects.filter(id=upload.id).update(status="writing", updated_at=timezone.now())
+
+        response = self.send_chunk(upload, self.data[:10], 0)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response["Upload-Offset"], "0")
+
+        # Klaim yang sudah kedaluwarsa (request-nya mati) boleh diambil alih
+        UploadSessions.objects.filter(id=upload.id).update(updated_at=timezone.now() - UPLOAD_CLAIM_TIMEOUT * 2)
+        self.assertEqual(self.send_chunk(upload, self.data[:10], 0).status_code, 200)
+
+    def test_chunk_checksum_mismatch_returns_422(self):
+        upload = self.start_upload(self.data)
+        chunk = self.data[:10]
+
+        def checksum(data):
+            return "sha256 " + base64.b64encode(hashlib.sha256(data).digest()).decode()
+
+        response = self.send_chunk(upload, chunk, 0, HTTP_UPLOAD_CHECKSUM=checksum(b"lain"))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["code"], "chunk_checksum_mismatch")
+        self.assertEqual(response["Upload-Offset"], "0")
+        upload.refresh_from_db()
+        self.assertEqual((upload.received, upload.status), (0, "uploading"))
+
+        response = self.send_chunk(upload, chunk, 0, HTTP_UPLOAD_CHECKSUM=checksum(chunk))
+        self.assertEqual((response.status_code, response["Upload-Offset"]), (200, "10"))
+
+    def test_file_checksum_mismatch_restarts_upload(self):
+        upload = self.start_upload(self.data, checksum=hashlib.sha256(b"file lain").hexdigest())
+
+        response = self.send_chunk(upload, self.data, 0)
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["code"], "file_checksum_mismatch")
+        self.assertEqual(response["Upload-Offset"], "0")
+
+        upload.refresh_from_db()
+        self.assertEqual((upload.received, upload.status, upload.file_path), (0, "uploading", None))
+        self.assertFalse(MediaBlobs.objects.exists())
+
+
+class BlobRefCountTests(MediaTestCase):
+    def store(self, data):
+        return store_blob(ContentFile(data), "pdf")
+
+    def ref_count(self, path):
+        return MediaBlobs.objects.get(path=path).ref_count
+
+    def test_same_content_stored_once(self):
+        first, second = self.store(b"materi"), self.store(b"materi")
+        self.assertEqual(first, second)
+        self.assertEqual(MediaBlobs.objects.count(), 1)
+
+    def test_ref_count_follows_rows(self):
+        shared, other = self.store(b"materi"), self.store(b"materi lain")
+        first = Materials.objects.create(title="A", type="pdf", file_url=shared)
+        second = Materials.objects.create(title="B", type="pdf", file_url=shared)
+        self.assertEqual(self.ref_count(shared), 2)
+
+        first.file_url = other
+        first.save()
+        self.assertEqual((self.ref_count(shared), self.ref_count(other)), (1, 1))
+
+        second.delete()
+        self.assertEqual(self.ref_count(shared), 0)
+
+    def test_gc_removes_only_unreferenced_blobs(self):
+        used, unused = self.store(b"dipakai"), self.store(b"tidak dipakai")
+        Materials.objects.create(title="A", type="pdf", file_url=used)
+        MediaBlobs.objects.update(updated_at=timezone.now() - timedelta(hours=2))
+
+        # Masih dalam masa tenggang: tidak ada yang dihapus
+        self.assertEqual(collect_unreferenced_blobs(hours=3), (0, 0))
+
+        self.assertEqual(collect_unreferenced_blobs(hours=1), (1, len(b"tidak dipakai")))
+        self.assertFalse(os.path.exists(os.path.join(self.media_root, unused)))
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, used)))
+        self.assertEqual(list(MediaBlobs.objects.values_list("path", flat=True)), [used])
+
+    def test_recount_fixes_changes_outside_orm(self):
+        path = self.store(b"materi")
+        Materials.objects.create(title="A", type="pdf", file_url=path)
+        # .update() tidak memicu signal: ref_count tertinggal
+        Materials.objects.update(file_url=None)
+        self.assertEqual(self.ref_count(path), 1)
+
+        self.assertEqual(recount_blob_refs(), 1)
+        self.assertEqual(self.ref_count(path), 0)
+
+
+class MediaScanTests(MediaTestCase):
+    def test_orphans_found_across_url_formats(self):
+        for path in ("material/dipakai.pdf", "tugas/dipakai.pdf", "material/yatim.pdf", "profile/foto.jpg"):
+            self.write_media(path, b"isi")
+        # file_url di database tidak seragam: dengan/tanpa "/" dan prefix MEDIA_URL
+        Materials.objects.create(title="A", type="pdf", file_url="material/dipakai.pdf")
+        Materials.objects.create(title="B", type="pdf", file_url="/media/tugas/dipakai.pdf")
+        Users.objects.create(username="u", email="u@example.com", password="x", role="student", photo_url="/media/profile/foto.jpg")
+
+        orphans = []
+        report = scan_media(batch_size=2, min_age_hours=0, on_orphan=lambda path, size: orphans.append(path))
+        self.assertEqual(orphans, ["material/yatim.pdf"])
+        self.assertEqual((report["totals"]["files"], report["totals"]["orphan_files"]), (4, 1))
+
+
+class EnrollmentCapacityTests(AccountsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.small = Classes.objects.create(class_name="Kelas Kecil", capacity=1)
+        self.big = Classes.objects.create(class_name="Kelas Besar", capacity=10)
+        self.first = Students.objects.create(full_name="Siswa Satu")
+        self.second = Students.objects.create(full_name="Siswa Dua")
+
+    def counts(self):
+        return dict(Classes.objects.values_list("id", "current_student_count"))
+
+    def test_enroll_respects_capacity(self):
+        enroll_student(self.first.id, self.small.id)
+        with self.assertRaises(ClassFull):
+            enroll_student(self.second.id, self.small.id)
+        with self.assertRaises(AlreadyEnrolled):
+            enroll_student(self.first.id, self.small.id)
+
+        self.assertEqual(self.counts()[self.small.id], 1)
+        self.assertIsNone(current_class_id(self.second.id))
+
+    def test_move_frees_seat_in_old_class(self):
+        enroll_student(self.first.id, self.small.id)
+        enroll_student(self.first.id, self.big.id)
+        self.assertEqual(self.counts(), {self.small.id: 0, self.big.id: 1})
+        self.assertEqual(current_class_id(self.first.id), self.big.id)
+        # Riwayat kelas lama tetap ada, hanya satu baris aktif
+        self.assertEqual(StudentClasses.objects.filter(student=self.first).count(), 2)
+
+        enroll_student(self.second.id, self.small.id)
+        self.assertEqual(self.counts()[self.small.id], 1)
+
+    def test_reconcile_class_counts(self):
+        enroll_student(self.first.id, self.big.id)
+        # Data import: siswa tanpa baris aktif & counter yang tidak sesuai
+        StudentClasses.objects.create(student=self.second, class_field=self.big, is_current=False)
+        Classes.objects.filter(id=self.small.id).update(current_student_count=5)
+
+        repaired, changed = reconcile_class_counts(dry_run=True)
+        self.assertEqual(repaired, 0)
+        self.assertEqual(changed, [(self.small.id, "Kelas Kecil", 5, 0)])
+        self.assertEqual(self.counts()[self.small.id], 5)
+
+        repaired, changed = reconcile_class_counts()
+        self.assertEqual(repaired, 1)
+        self.assertEqual(sorted(changed), sorted([(self.small.id, "Kelas Kecil", 5, 0), (self.big.id, "Kelas Besar", 1, 2)]))
+        self.assertEqual(self.counts(), {self.small.id: 0, self.big.id: 2})
+        self.assertEqual(current_enrollments().filter(class_field=self.big).count(), 2)
+
+    def generate_token(self, class_id):
+        return self.client.post("/api/auth/generate-token/", {
+            "role": "student", "full_name": "Calon Siswa", "phone": "0800", "class_id": class_id,
+            "parent_contact": "0811",
+        }, content_type="application/json")
+
+    def test_unused_tokens_hold_seats(self):
+        response = self.generate_token(self.small.id)
+        self.assertEqual(response.status_code, 201)
+        # Kelas belum ada siswanya, tapi satu-satunya kursi sudah dipegang token yang belum dipakai
+        self.assertEqual(self.counts()[self.small.id], 0)
+        response = self.generate_token(self.small.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(SignupTokens.objects.filter(class_field=self.small).count(), 1)
+
+        self.assertEqual(self.generate_token(999999).status_code, 404)
+
+        # Token terpakai: kursinya dihitung lewat current_student_count, bukan dua kali
+        SignupTokens.objects.filter(class_field=self.small).update(is_used=True)
+        self.assertEqual(reserve_class_seat(self.small.id), self.small)
+        enroll_student(self.first.id, self.small.id)
+        with self.assertRaises(ClassFull):
+            reserve_class_seat(self.small.id)
+
+
+
+class AttendanceRollupTests(AccountsTestCase):
+    def test_admin_average_attendance_uses_rollups(self):
+        view = AdminDashboardView()
+        self.assertEqual(view.calculate_average_attendance(), "0%")
+
+        schedule = Schedules.objects.create(
+            class_field=Classes.objects.create(class_name="Kelas A"),
+            tutor=Tutors.objects.create(full_name="Tutor A"),
+            schedule_date=timezone.localdate(), start_time="08:00", end_time="09:30", status="scheduled",
+        )
+        # Hadir = ditandai tutor dan dikonfirmasi siswa
+        for name, marked, confirmed in (("Hadir", True, True), ("Belum konfirmasi", True, False)):
+            Attendance.objects.create(
+                student=Students.objects.create(full_name=name), schedule=schedule,
+                marked_by_tutor=marked, confirmed_by_student=confirmed,
+            )
+        refresh_attendance_rollups(schedule)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(view.calculate_average_attendance(), "50%")
+
+
+class PanelQueryBudgetTests(QueryBudgetTestCase):
+    @classmethod
+    def build_fixtures(cls):
+        fixtures = super().build_fixtures()
+
+        # ProfileDetailView & ProfileCollapsedView membaca profil dari PROFILING_DIR, bukan database
+        profiles_dir = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, profiles_dir, ignore_errors=True)
+        profiling = override_settings(PROFILING_DIR=profiles_dir)
+        profiling.enable()
+        cls.addClassCleanup(profiling.disable)
+
+        fixtures["admin_panel"]["profile_id"] = save_profile(
+            {"view": "admin_panel.TutorListView", "duration_ms": 12.5}, ["TutorListView.get 1"]
+        )
+        return fixtures
+
+    def test_get_views_within_query_budget(self):
+        self.assert_get_views_within_budget()
+
+    def test_mark_attendance_within_query_budget(self):
+        schedule = Schedules.objects.get(id=self.endpoint_fixtures["tutor_panel"]["schedule_id"])
+        student_ids = list(
+            current_enrollments().filter(class_field=schedule.class_field).values_list("student_id", flat=True)
+        )
+        self.assertTrue(student_ids)
+
+        response = self.assert_write_within_budget(
+            MarkAttendanceView, "POST", f"/api/tutor/my-schedule/{schedule.id}/mark-attendance/",
+            {"attendance": [{"student_id": student_id, "marked_by_tutor": True} for student_id in student_ids]},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            Attendance.objects.filter(schedule=schedule, student_id__in=student_ids, marked_by_tutor=True).count(),
+            len(student_ids),
+        )
+
+    def test_submit_assignment_within_query_budget(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+        fixtures = self.endpoint_fixtures["student_panel"]
+        path = f"/api/student/my-learning/assignment/{fixtures['assignment_id']}/submit/"
+        user_id = fixtures["params"]["user_id"]
+
+        # Submit lalu submit ulang (file lama dilepas)
+        for content in (b"jawaban pertama", b"jawaban kedua"):
+            with self.subTest(content=content):
+                response = self.assert_write_within_budget(
+                    SubmitAssignmentView, "POST", path,
+                    {"user_id": user_id, "file": SimpleUploadedFile("jawaban.pdf", content)},
+                )
+                self.assertEqual(response.status_code, 201)
+        student = Students.objects.get(user_id=user_id)
+        self.assertEqual(student.assignmentsubmissions_set.filter(assignment_id=fixtures["assignment_id"]).count(), 1)
@@ -0,0 +1,289 @@
+# accounts/uploads.py
+import base64
+import hashlib
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .blobs import blob_sha_from_url, commit_blob, hash_file
+from .models import AppSettings, UploadSessions, Users
+
+UPLOAD_TMP_DIR = "uploads_tmp"
+UPLOAD_CHUNK_SIZE = 5 * 1024 * 1024  # ukuran chunk yang disarankan ke client
+UPLOAD_MAX_CHUNK_SIZE = 16 * 1024 * 1024
+UPLOAD_STREAM_BLOCK = 64 * 1024
+UPLOAD_EXPIRE_HOURS = 24
+# Klaim chunk ("writing") yang lebih lama dari ini dianggap request-nya mati dan boleh diambil alih
+UPLOAD_CLAIM_TIMEOUT = timedelta(minutes=15)
+
+# purpose -> role yang boleh upload
+UPLOAD_PURPOSES = {
+    "material": ("admin", "tutor"),
+    "assignment": ("tutor",),
+    "submission": ("student",),
+}
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None, code=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+        self.code = code
+
+
+def get_learning_content_settings():
+    """(max_mb, allowed_types) dari app_settings, default sama dengan halaman Learning Content."""
+    values = dict(
+        AppSettings.objects
+        .filter(key__in=["max_material_file_size_mb", "allowed_material_types"])
+        .values_list("key", "value")
+    )
+    max_mb = int(values.get("max_material_file_size_mb") or 50)
+    allowed_types = (values.get("allowed_material_types") or "pdf,mp4,docx").split(",")
+    return max_mb, [t.strip().lower() for t in allowed_types if t.strip()]
+
+
+def _tmp_path(upload):
+    return os.path.join(settings.MEDIA_ROOT, UPLOAD_TMP_DIR, f"{upload.id.hex}.part")
+
+
+def create_upload(user_id, purpose, filename, size, checksum=None):
+    user = Users.objects.filter(id=user_id).first() if str(user_id or "").isdigit() else None
+    if not user:
+        raise UploadError("User tidak ditemukan", status=404)
+
+    if purpose not in UPLOAD_PURPOSES:
+        raise UploadError(f"purpose harus salah satu dari: {', '.join(UPLOAD_PURPOSES)}")
+    if user.role not in UPLOAD_PURPOSES[purpose]:
+        raise UploadError("Role user tidak boleh mengunggah file ini", status=403)
+
+    try:
+        size = int(size)
+    except (TypeError, ValueError):
+        raise UploadError("size wajib berupa angka (byte)")
+    if size <= 0:
+        raise UploadError("size harus lebih dari 0")
+
+    filename = os.path.basename(filename or "")
+    ext = os.path.splitext(filename)[1][1:].lower()
+
+    # Validasi di awal, sebelum satu byte pun dikirim
+    max_mb, allowed_types = get_learning_content_settings()
+    if ext not in allowed_types:
+        raise UploadError(f"Tipe file .{ext} tidak diizinkan. Diizinkan: {', '.join(allowed_types)}")
+    if size > max_mb * 1024 * 1024:
+        raise UploadError(f"Ukuran file melebihi batas {max_mb} MB")
+
+    if checksum and (len(checksum) != 64 or any(c not in "0123456789abcdef" for c in checksum.lower())):
+        raise UploadError("checksum harus sha256 dalam format hex")
+
+    upload = UploadSessions.objects.create(
+        id=uuid.uuid4(),
+        user=user,
+        purpose=purpose,
+        filename=filename,
+        total_size=size,
+        checksum=checksum.lower() if checksum else None,
+    )
+
+    os.makedirs(os.path.dirname(_tmp_path(upload)), exist_ok=True)
+    open(_tmp_path(upload), "wb").close()
+    return upload
+
+
+def _owned_uploads(user_id):
+    """Sesi upload milik `user_id`; upload user lain diperlakukan seperti tidak ada (404)."""
+    if not str(user_id or "").isdigit():
+        return UploadSessions.objects.none()
+    return UploadSessions.objects.filter(user_id=user_id)
+
+
+def get_upload(upload_id, user_id):
+    upload = _owned_uploads(user_id).filter(id=upload_id).first() if _is_uuid(upload_id) else None
+    if upload is None:
+        raise UploadError("Upload tidak ditemukan", status=404)
+    return upload
+
+
+def parse_chunk_checksum(header):
+    """Header `Upload-Checksum: <sha256|md5> <base64>` (format tus). Return (algoritma, digest bytes)."""
+    if not header:
+        return None
+    try:
+        algorithm, value = header.split(" ", 1)
+        digest = base64.b64decode(value.strip(), validate=True)
+    except ValueError:
+        raise UploadError("Format Upload-Checksum tidak valid")
+    algorithm = algorithm.lower()
+    if algorithm not in ("sha256", "md5"):
+        raise UploadError("Algoritma checksum harus sha256 atau md5")
+    return algorithm, digest
+
+
+def _claim_chunk(upload_id, user_id, offset, length):
+    """
+    Cek offset lalu klaim sesi (status "writing") dalam transaksi singkat. Lock baris hanya dipegang
+    selama pengecekan ini, bukan selama chunk dibaca dari client. Return upload dengan updated_at
+    = tanda klaim.
+    """
+    with transaction.atomic():
+        upload = _owned_uploads(user_id).select_for_update().filter(id=upload_id).first()
+        if upload is None:
+            raise UploadError("Upload tidak ditemukan", status=404)
+        if upload.status == "writing" and upload.updated_at > timezone.now() - UPLOAD_CLAIM_TIMEOUT:
+            raise UploadError("Chunk lain sedang dikirim untuk upload ini", status=409, offset=upload.received)
+        if upload.status not in ("uploading", "writing"):
+            raise UploadError("Upload sudah selesai", status=409, offset=upload.received)
+
+        try:
+            offset, length = int(offset), int(length)
+        except (TypeError, ValueError):
+            raise UploadError("Header Upload-Offset dan Content-Length wajib diisi")
+        if offset != upload.received:
+            raise UploadError("Offset tidak sesuai", status=409, offset=upload.received)
+        if length <= 0 or length > UPLOAD_MAX_CHUNK_SIZE:
+            raise UploadError(f"Ukuran chunk harus 1 - {UPLOAD_MAX_CHUNK_SIZE} byte")
+        if offset + length > upload.total_size:
+            raise UploadError("Chunk melebihi ukuran file yang dideklarasikan")
+
+        upload.status = "writing"
+        upload.save(update_fields=["status", "updated_at"])
+    return upload, offset, length
+
+
+def _finish_claim(upload, **fields):
+    """Simpan hasil chunk & lepas klaim; gagal (False) jika klaim sudah kedaluwarsa dan diambil request lain."""
+    fields.setdefault("status", "uploading")
+    now = timezone.now()
+    saved = UploadSessions.objects.filter(
+        id=upload.id, status="writing", updated_at=upload.updated_at,
+    ).update(updated_at=now, **fields)
+    for name, value in fields.items():
+        setattr(upload, name, value)
+    upload.updated_at = now
+    return saved == 1
+
+
+def write_chunk(upload_id, user_id, offset, length, stream, checksum_header=None):
+    """
+    Tulis satu chunk pada `offset`. Offset harus sama dengan jumlah byte yang sudah diterima,
+    supaya client yang putus cukup HEAD lalu lanjut dari offset terakhir. Hanya user yang
+    memulai upload (`user_id`) yang boleh menulis.
+
+    Chunk dibaca & ditulis di luar transaksi: client lambat tidak menahan lock maupun koneksi DB.
+    """
+    checksum = parse_chunk_checksum(checksum_header)
+
+    if not _is_uuid(upload_id):
+        raise UploadError("Upload tidak ditemukan", status=404)
+
+    upload, offset, length = _claim_chunk(upload_id, user_id, offset, length)
+    tmp_path = _tmp_path(upload)
+    try:
+        hasher = hashlib.new(checksum[0]) if checksum else None
+        written = 0
+        with open(tmp_path, "r+b") as f:
+            f.seek(offset)
+            while written < length:
+                block = stream.read(min(UPLOAD_STREAM_BLOCK, length - written))
+                if not block:
+                    break
+                f.write(block)
+                if hasher:
+                    hasher.update(block)
+                written += len(block)
+
+            if written != length:
+                # Chunk terputus: buang, client mengulang dari offset yang sama
+                f.truncate(offset)
+                raise UploadError("Chunk tidak lengkap", offset=offset)
+            if hasher and hasher.digest() != checksum[1]:
+                f.truncate(offset)
+                raise UploadError("Checksum chunk tidak cocok", status=422, offset=offset, code="chunk_checksum_mismatch")
+
+        fields = {"received": offset + written}
+        if fields["received"] == upload.total_size:
+            fields = _assemble(upload, tmp_path)
+    except BaseException:
+        _finish_claim(upload)
+        raise
+
+    if not _finish_claim(upload, **fields):
+        current = UploadSessions.objects.filter(id=upload.id).values_list("received", flat=True).first()
+        raise UploadError("Upload diubah request lain, lanjutkan dari offset terbaru", status=409, offset=current)
+    if fields["received"] == 0:
+        raise UploadError(
+            "Checksum file tidak cocok, upload diulang dari awal",
+            status=422, offset=0, code="file_checksum_mismatch",
+        )
+    return upload
+
+
+def _assemble(upload, tmp_path):
+    """Field yang disimpan setelah chunk terakhir: blob siap dipakai, atau mulai ulang jika checksum salah."""
+    # Satu kali baca: sha256 dipakai untuk verifikasi checksum sekaligus alamat blob
+    sha256, size = hash_file(tmp_path)
+    if upload.checksum and sha256 != upload.checksum:
+        # File lengkap tapi tidak sesuai checksum awal: mulai ulang dari 0
+        open(tmp_path, "wb").close()
+        return {"received": 0}
+
+    ext = os.path.splitext(upload.filename)[1][1:].lower()
+    return {
+        "received": size,
+        "status": "complete",
+        "file_path": commit_blob(tmp_path, sha256, size, ext),
+    }
+
+
+def take_completed_upload(upload_id, purpose, user_id):
+    """
+    Tandai upload lengkap sebagai terpakai dan kembalikan path storage-nya (mis. "blobs/ab/cd/<sha256>.pdf").
+    Dipakai view materi/tugas/submission sebagai pengganti request.FILES["file"].
+    Hanya user yang memulai upload (`user_id`) yang boleh memakainya.
+    """
+    with transaction.atomic():
+        upload = UploadSessions.objects.select_for_update().filter(id=upload_id).first() if _is_uuid(upload_id) else None
+        if upload is None:
+            raise UploadError("Upload tidak ditemukan", status=404)
+        if upload.purpose != purpose:
+            raise UploadError("Upload ini bukan untuk jenis file ini")
+        if not user_id or str(upload.user_id) != str(user_id):
+            raise UploadError("Upload ini milik user lain", status=403)
+        if upload.status != "complete":
+            raise UploadError("Upload belum selesai" if upload.status == "uploading" else "Upload sudah dipakai")
+
+        upload.status = "attached"
+        upload.save(update_fields=["status", "updated_at"])
+    return upload.file_path
+
+
+def _is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+    except ValueError:
+        return False
+    return True
+
+
+def cleanup_expired_uploads(hours=UPLOAD_EXPIRE_HOURS):
+    """Hapus sesi upload yang tidak selesai/tidak dipakai dalam `hours` jam beserta filenya."""
+    cutoff = timezone.now() - timedelta(hours=hours)
+    expired = UploadSessions.objects.filter(updated_at__lt=cutoff).exclude(status="attached")
+
+    removed = 0
+    for upload in expired.iterator():
+        if os.path.exists(_tmp_path(upload)):
+            os.remove(_tmp_path(upload))
+        # Blob tidak dihapus di sini (bisa dipakai bersama); tanpa referensi ia dibersihkan gc_media_blobs
+        if upload.status == "complete" and upload.file_path and not blob_sha_from_url(upload.file_path):
+            default_storage.delete(upload.file_path)
+        upload.delete()
+        removed += 1
+    return removed
@@ -8,6 +8,7 @@ from django.utils.timezone import is_naive, make_aware
 from django.contrib.auth.hashers import make_password, check_password
 from django.core.mail import send_mail, EmailMultiAlternatives
 from django.urls import reverse
+from django.db import transaction
 
 from rest_framework import status
 from rest_framework.views import APIView
@@ -21,7 +22,6 @@ from .models import (
     Classes,
     StudentClasses,
     TutorExpertise,
-    Subjects,
 )
 
 from .serializers import (
@@ -32,6 +32,10 @@ from .serializers import (
     ResetPasswordSerializer,
 )
 
+from .enrollment import ClassFull, ClassNotFound, enroll_student, reserve_class_seat
+from .media import can_access_media, get_media_user, serve_media
+from .reference import reference_data
+from .uploads import UPLOAD_CHUNK_SIZE, UploadError, create_upload, get_upload, write_chunk
 from .utils import generate_simple_token
 
 
@@ -57,69 +61,69 @@ class SignupView(APIView):
                 else:
                     return Response({'token': 'Token tidak ditemukan.'}, status=status.HTTP_400_BAD_REQUEST)
 
-            # Simpan user
-            hashed_password = make_password(password)
-            user = Users.objects.create(
-                username=username,
-                email=email,
-                password=hashed_password,
-                full_name=token.full_name,
-                role=token.role,
-                is_active=True,
-                phone=token.phone,      
-                address=token.address,
-                bio="Profil belum diperbarui."
-            )
-
-            # Simpan ke students atau tutors
-            if token.role == 'student':
-                # Generate student_id otomatis
-                last_student = Students.objects.order_by('-id').first()
-                next_id = (last_student.id + 1) if last_student else 1
-                student_id = f"S{next_id:03}"
-
-                student = Students.objects.create(
-                    user=user,
-                    student_id=student_id,
-                    full_name=token.full_name,
-                    phone=token.phone,
-                    address=token.address,
-                    gender=token.gender,
-                    birthdate=token.birthdate,
-                    parent_contact=token.parent_contact
-                )
-
-                # Tambahkan ke tabel StudentClasses jika ada class_field
-                if token.class_field:
-                    StudentClasses.objects.create(
-                        student=student,
-                        class_field=token.class_field
+            # Buat akun, profil, kelas & tandai token dalam satu transaksi: gagal di tengah = tidak ada yang tersimpan
+            try:
+                with transaction.atomic():
+                    # Lock token supaya tidak bisa dipakai dua signup bersamaan
+                    if not SignupTokens.objects.select_for_update().filter(id=token.id, is_used=False).values_list("id", flat=True).first():
+                        return Response({'token': 'Token sudah digunakan.'}, status=status.HTTP_400_BAD_REQUEST)
+
+                    # Simpan user
+                    hashed_password = make_password(password)
+                    user = Users.objects.create(
+                        username=username,
+                        email=email,
+                        password=hashed_password,
+                        full_name=token.full_name,
+                        role=token.role,
+                        is_active=True,
+                        phone=token.phone,      
+                        address=token.address,
+                        bio="Profil belum diperbarui."
                     )
-                
-                if token.role == "student":
-                    class_obj = token.class_field
-                    class_obj.current_student_count += 1
-                    class_obj.save()
-
-            elif token.role == 'tutor':
-                tutor = Tutors.objects.create(
-                    user=user,
-                    full_name=token.full_name,
-                    phone=token.phone,
-                    address=token.address
-                )
-            if token.expertise:
-                subjects = [s.strip() for s in token.expertise.split(",")]
-                for name in subjects:
-                    try:
-                        subject_obj = Subjects.objects.get(name__iexact=name)
-                        TutorExpertise.objects.create(tutor=tutor, subject=subject_obj)
-                    except Subjects.DoesNotExist:
-                        continue 
-
-            # Tandai token sebagai sudah digunakan
-            token.is_used = True
-            token.save()
+
+                    # Simpan ke students atau tutors
+                    if token.role == 'student':
+                        # Generate student_id otomatis
+                        last_student = Students.objects.order_by('-id').first()
+                        next_id = (last_student.id + 1) if last_student else 1
+                        student_id = f"S{next_id:03}"
+
+                        student = Students.objects.create(
+                            user=user,
+                            student_id=student_id,
+                            full_name=token.full_name,
+                            phone=token.phone,
+                            address=token.address,
+                            gender=token.gender,
+                            birthdate=token.birthdate,
+                            parent_contact=token.parent_contact
+                        )
+
+                        # Masukkan ke kelas dari token (counter kelas ikut diperbarui, kapasitas dicek)
+                        if token.class_field_id:
+                            enroll_student(student.id, token.class_field_id)
+
+                    elif token.role == 'tutor':
+                        tutor = Tutors.objects.create(
+                            user=user,
+                            full_name=token.full_name,
+                            phone=token.phone,
+                            address=token.address
+                        )
+                    if token.expertise:
+                        reference = reference_data()
+                        subjects = [s.strip() for s in token.expertise.split(",")]
+                        for name in subjects:
+                            subject_id = reference.subject_id(name)
+                            if subject_id is not None:
+                                TutorExpertise.objects.create(tutor=tutor, subject_id=subject_id)
+
+                    # Tandai token sebagai sudah digunakan
+                    token.is_used = True
+                    token.save()
+            except ClassFull:
+                return Response({'token': 'Kelas untuk token ini sudah penuh.'}, status=status.HTTP_400_BAD_REQUEST)
 
             # Kirim email selamat datang
             html_content = f"""
@@ -226,13 +230,6 @@ class GenerateSignupTokenView(APIView):
                 return Response({'error': 'Class harus diisi'}, status=status.HTTP_400_BAD_REQUEST)
             if not parent_contact:
                 return Response({'error': 'Kontak orang tua wajib diisi untuk siswa'}, status=status.HTTP_400_BAD_REQUEST)
-            try:
-                class_instance = Classes.objects.get(id=class_id)
-            except Classes.DoesNotExist:
-                return Response({'error': 'Class tidak ditemukan'}, status=status.HTTP_404_NOT_FOUND)
-
-            if class_instance.current_student_count >= class_instance.capacity:
-                return Response({"error": "Class is already full."}, status=400)
 
         elif role == "tutor":
             # Opsional: tutor bisa di-assign ke kelas awal atau tidak
@@ -243,25 +240,36 @@ class GenerateSignupTokenView(APIView):
                     return Response({'error': 'Class tidak ditemukan'}, status=status.HTTP_404_NOT_FOUND)
             parent_contact = None  # Tutor tidak perlu parent contact
 
-        # Generate unique token
-        while True:
-            token = generate_simple_token()
-            if not SignupTokens.objects.filter(token=token).exists():
-                break
-
-        # Simpan token
-        SignupTokens.objects.create(
-            token=token,
-            role=role,
-            full_name=full_name,
-            phone=phone,
-            address=address,
-            class_field=class_instance,
-            gender=gender,
-            birthdate=birthdate,
-            parent_contact=parent_contact,
-            expertise=",".join(expertise_list) if role == "tutor" else None  # temporarily stringified
-        )
+        try:
+            with transaction.atomic():
+                # Kursi dicek dengan kelas terkunci & token yang belum dipakai ikut dihitung,
+                # sampai token ini tersimpan: token bersamaan tidak bisa melewati kapasitas
+                if role == "student":
+                    class_instance = reserve_class_seat(class_id)
+
+                # Generate unique token
+                while True:
+                    token = generate_simple_token()
+                    if not SignupTokens.objects.filter(token=token).exists():
+                        break
+
+                # Simpan token
+                SignupTokens.objects.create(
+                    token=token,
+                    role=role,
+                    full_name=full_name,
+                    phone=phone,
+                    address=address,
+                    class_field=class_instance,
+                    gender=gender,
+                    birthdate=birthdate,
+                    parent_contact=parent_contact,
+                    expertise=",".join(expertise_list) if role == "tutor" else None  # temporarily stringified
+                )
+        except ClassNotFound:
+            return Response({'error': 'Class tidak ditemukan'}, status=status.HTTP_404_NOT_FOUND)
+        except ClassFull:
+            return Response({"error": "Class is already full."}, status=400)
 
         return Response({'token': token}, status=status.HTTP_201_CREATED)
     
@@ -374,3 +382,99 @@ class ResetPasswordView(APIView):
 
         return Response(serializer.errors, status=400)
 
+
+class ProtectedMediaView(APIView):
+    """
+    Download file media dengan cek akses (kelas/tugas user) dan dukungan Range/If-Modified-Since.
+    Jika MEDIA_ACCEL_REDIRECT_PREFIX / MEDIA_X_SENDFILE di-set, pengiriman file diserahkan ke web server.
+    """
+    def get(self, request, path):
+        user = get_media_user(request.query_params.get("user_id"))
+        if not can_access_media(user, path):
+            return Response({"error": "Akses file ditolak"}, status=status.HTTP_403_FORBIDDEN)
+
+        response = serve_media(request, path, as_attachment=request.query_params.get("download") == "1")
+        if response is None:
+            return Response({"error": "File tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
+        return response
+
+
+def _upload_payload(upload):
+    return {
+        "upload_id": str(upload.id),
+        "purpose": upload.purpose,
+        "filename": upload.filename,
+        "size": upload.total_size,
+        "offset": upload.received,
+        "status": upload.status,
+        "chunk_size": UPLOAD_CHUNK_SIZE,
+    }
+
+
+def _upload_response(upload, status_code=200):
+    response = Response(_upload_payload(upload), status=status_code)
+    response["Upload-Offset"] = str(upload.received)
+    response["Upload-Length"] = str(upload.total_size)
+    response["Cache-Control"] = "no-store"
+    return response
+
+
+def _upload_error(error):
+    data = {"error": str(error)}
+    if error.code:
+        data["code"] = error.code
+    response = Response(data, status=error.status)
+    if error.offset is not None:
+        data["offset"] = error.offset
+        response["Upload-Offset"] = str(error.offset)
+    return response
+
+
+class UploadInitView(APIView):
+    """
+    Mulai upload bertahap. Body: user_id, purpose (material/assignment/submission), filename, size (byte),
+    checksum (opsional, sha256 hex seluruh file). Tipe & ukuran divalidasi sebelum file dikirim.
+    """
+    def post(self, request):
+        try:
+            upload = create_upload(
+                request.data.get("user_id"),
+                request.data.get("purpose"),
+                request.data.get("filename"),
+                request.data.get("size"),
+                request.data.get("checksum"),
+            )
+        except UploadError as e:
+            return _upload_error(e)
+        return _upload_response(upload, status.HTTP_201_CREATED)
+
+
+class UploadChunkView(APIView):
+    """
+    GET/HEAD: offset terakhir yang diterima (untuk melanjutkan upload yang terputus).
+    PATCH: kirim chunk mentah dengan header Upload-Offset dan (opsional) Upload-Checksum: sha256 <base64>.
+    Keduanya wajib ?user_id= pemilik upload; upload milik user lain dibalas 404.
+    """
+    # Offset harus yang terbaru, bukan dari replica yang tertinggal
+    db_read_primary = True
+
+    def get(self, request, upload_id):
+        try:
+            upload = get_upload(upload_id, request.query_params.get("user_id"))
+        except UploadError as e:
+            return _upload_error(e)
+        return _upload_response(upload)
+
+    def patch(self, request, upload_id):
+        try:
+            upload = write_chunk(
+                upload_id,
+                request.query_params.get("user_id"),
+                request.META.get("HTTP_UPLOAD_OFFSET"),
+                request.META.get("CONTENT_LENGTH"),
+                request.stream,
+                request.META.get("HTTP_UPLOAD_CHECKSUM"),
+            )
+        except UploadError as e:
+            return _upload_error(e)
+        return _upload_response(upload)
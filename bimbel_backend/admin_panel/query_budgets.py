@@ -0,0 +1,41 @@
+# admin_panel/query_budgets.py
+# Batas jumlah query per view untuk QueryBudgetMiddleware & `manage.py check_query_budgets`.
+# Nilai int = GET; pakai dict untuk method lain, mis. {"GET": 4, "POST": 6}.
+# Cakupan: semua view GET, ditambah view tulis yang memicu refresh rollup / signal cache & blob per
+# baris (MarkAttendanceView, SubmitAssignmentView). View POST/PATCH/DELETE lain belum punya budget;
+# check_query_budgets hanya memanggil GET, budget tulis dicek di test app masing-masing.
+# View bertanda "N+1" jumlah query-nya tumbuh mengikuti data: budget diukur dari data contoh kecil,
+# turunkan setelah query-nya diperbaiki.
+QUERY_BUDGETS = {
+    "AdminDashboardView": 4,
+    "AsyncAdminDashboardView": 4,
+    "SidebarUserInfoView": 1,
+    "AdminNotificationStatusView": 4,
+    "GlobalSearchView": 5,
+    "AdminProfileView": 1,
+    "FeedbackModerationSettingView": 1,
+    "LearningContentSettingsView": 3,
+    "NotificationSettingsView": 1,
+    "AdminStudentManagementView": 3,
+    "AdminStudentDetailView": 6,
+    "TutorListView": 6,
+    "TutorDetailView": 8,
+    "ClassListView": 1,
+    "ClassManagementListView": 1,
+    "ScheduleDetailView": 5,
+    "AvailableTutorsView": 1,
+    "LearningMaterialListView": 2,
+    "MaterialDetailView": 1,
+    "FeedbackListView": 1,
+    "FeedbackDetailView": 1,
+    "AdminTokenListView": 1,
+    "SubjectListView": 1,
+    "AdminRescheduleListView": 1,
+    "AdminAttendanceExportView": 1,
+    "AdminGradebookExportView": 3,
+    "AdminTutorRosterExportView": 2,
+    "ProfileListView": 1,
+    "ProfileDetailView": 1,
+    "ProfileCollapsedView": 1,
+    "DatabasePoolStatsView": 1,
+}
@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     # Dashboard & Sidebar
     AdminDashboardView,
+    AsyncAdminDashboardView,
     SidebarUserInfoView,
     AdminNotificationStatusView,
     GlobalSearchView,
@@ -59,11 +60,25 @@ from .views import (
     AdminRescheduleListView,
     AdminApproveReschedule,
     AdminRejectReschedule,
+
+    # Export
+    AdminAttendanceExportView,
+    AdminGradebookExportView,
+    AdminTutorRosterExportView,
+
+    # Profiling
+    ProfileListView,
+    ProfileDetailView,
+    ProfileCollapsedView,
+
+    # System
+    DatabasePoolStatsView,
 )
 
 urlpatterns = [
     # Dashboard & Sidebar
     path('dashboard/', AdminDashboardView.as_view(), name='admin-dashboard'),
+    path('dashboard/async/', AsyncAdminDashboardView.as_view(), name='admin-dashboard-async'),
     path('userinfo/', SidebarUserInfoView.as_view(), name='admin-userinfo'),
     path('notifications/', AdminNotificationStatusView.as_view(), name='admin-notification'),
     path('search/', GlobalSearchView.as_view(), name='global-search'),
@@ -121,4 +136,17 @@ urlpatterns = [
     path('reschedule-requests/', AdminRescheduleListView.as_view(), name='reschedule-list'),
     path('reschedule-requests/<int:reschedule_id>/approve/', AdminApproveReschedule.as_view(), name='approve-reschedule'),
     path('reschedule-requests/<int:reschedule_id>/reject/', AdminRejectReschedule.as_view(), name='reject-reschedule'),
+
+    # Export
+    path('exports/attendance/', AdminAttendanceExportView.as_view(), name='export-attendance'),
+    path('exports/gradebook/', AdminGradebookExportView.as_view(), name='export-gradebook'),
+    path('exports/tutors/', AdminTutorRosterExportView.as_view(), name='export-tutor-roster'),
+
+    # Profiling
+    path('profiles/', ProfileListView.as_view(), name='profile-list'),
+    path('profiles/<str:profile_id>/', ProfileDetailView.as_view(), name='profile-detail'),
+    path('profiles/<str:profile_id>/collapsed/', ProfileCollapsedView.as_view(), name='profile-collapsed'),
+
+    # System
+    path('system/db-pool/', DatabasePoolStatsView.as_view(), name='db-pool-stats'),
 ]
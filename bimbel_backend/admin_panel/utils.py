@@ -1,5 +1,9 @@
 from datetime import datetime
 
+from accounts.models import Classes, Schedules, Students, Tutors
+from accounts.photos import photo_url_for_size
+from accounts.reference import reference_data
+
 def get_schedule_status(schedule, reschedule_status=None):
     if schedule.status == "Canceled":
         return "canceled"
@@ -15,4 +19,80 @@ def get_schedule_status(schedule, reschedule_status=None):
     elif start <= now <= end:
         return "on_progress"
     else:
-        return "completed"
\ No newline at end of file
+        return "completed"
+
+def calculate_tutor_rating(
+    phone, address, has_expertise, feedback_count, feedback_avg,
+    total_schedule, attended, total_material, approved_material,
+):
+    # Nilai maksimum dari masing-masing komponen
+    PROFILE_MAX = 60
+    FEEDBACK_MAX = 40
+
+    attendance_score = (attended / total_schedule) * 100 if total_schedule > 0 else 0
+    subject_score = (approved_material / total_material) * 100 if total_material > 0 else 0
+
+    # Hitung kelengkapan profil (maks 3 field)
+    profile_fields = [bool(phone), bool(address), has_expertise]
+    profile_score = (sum(profile_fields) / 3) * PROFILE_MAX  # Skor proporsional
+
+    # Hitung feedback score (misalnya 4 feedback = 4 * 10, maksimal 40)
+    feedback_score = min(feedback_count * 10, FEEDBACK_MAX)
+
+    # Gabungan skor professionalism
+    professionalism_score = round(profile_score + feedback_score, 1)
+
+    # Admin rating kalkulasi otomatis
+    raw_admin_score = (attendance_score + subject_score + professionalism_score) / 3
+    admin_avg = round((raw_admin_score / 100) * 5, 1)
+
+    # Final rating gabungan 70:30
+    if admin_avg and feedback_avg:
+        return round(admin_avg * 0.7 + feedback_avg * 0.3, 1)
+    if admin_avg:
+        return admin_avg
+    return feedback_avg
+
+
+def admin_dashboard_schedule(today):
+    schedules = Schedules.objects.select_related("tutor", "tutor__user").filter(schedule_date=today).order_by("start_time")
+
+    reference = reference_data()
+    schedule_data = []
+    for sched in schedules:
+        photo_url = "/media/profile/default-avatar.png"
+        if sched.tutor and sched.tutor.user and sched.tutor.user.photo_url:
+            photo_url = sched.tutor.user.photo_url
+
+        schedule_data.append({
+            "id": sched.id,
+            "status": "OFFLINE" if sched.room else "ONLINE",
+            "subject": reference.tutor_subject_text(sched.tutor_id) if sched.tutor else "Unknown Subject",
+            "tutor": sched.tutor.full_name if sched.tutor else "Unknown",
+            "time": f"{sched.start_time.strftime('%H:%M')} – {sched.end_time.strftime('%H:%M')}",
+            "photo_url": photo_url,
+            "avatar_url": photo_url_for_size(photo_url, 48),
+        })
+    return schedule_data
+
+
+def admin_dashboard_groups(today):
+    """Grup query dashboard admin yang saling independen (dipakai view sync & async)."""
+    return {
+        "tutors": Tutors.objects.count,
+        "students": Students.objects.count,
+        "classes": Classes.objects.count,
+        "schedule": lambda: admin_dashboard_schedule(today),
+    }
+
+
+def admin_dashboard_payload(results):
+    stats = {
+        "Total Tutor": results["tutors"],
+        "Total Student": results["students"],
+        "Total Class": results["classes"],
+    }
+    return {
+        "stats": [{"label": k, "value": v} for k, v in stats.items()],
+        "schedule": results["schedule"],
+    }
@@ -1,11 +1,12 @@
 import os
-import uuid
 import calendar
 from datetime import date, datetime, timedelta
 from collections import defaultdict
 
-from django.db.models import Q, Avg
+from django.db.models import Q, Avg, Count, Exists, OuterRef
 from django.core.files.storage import default_storage
+from django.http import HttpResponse
+from django.views import View
 from django.utils import timezone
 from django.utils.timezone import localtime
 from django.shortcuts import get_object_or_404
@@ -39,10 +40,48 @@ from accounts.models import (
     ScheduleMaterials,
 )
 
-from .utils import get_schedule_status
+from accounts.exports import (
+    export_response,
+    parse_export_params,
+    attendance_rows,
+    gradebook_rows,
+    tutor_roster_rows,
+    ATTENDANCE_HEADER,
+    GRADEBOOK_HEADER,
+    TUTOR_ROSTER_HEADER,
+)
+
+from accounts.aio import gather_query_groups, json_response, run_query_groups
+from accounts.blobs import store_uploaded_file
+from accounts.enrollment import (
+    AlreadyEnrolled,
+    ClassFull,
+    ClassNotFound,
+    current_enrollments,
+    enroll_student,
+    with_current_class,
+)
+from accounts.media import media_url_builder
+from accounts.photos import photo_url_for_size, photo_variants, schedule_photo_variants
+from accounts.reference import reference_data
+from accounts.rollups import (
+    attendance_percent,
+    attendance_totals,
+    attendance_totals_by,
+    period_start,
+    refresh_attendance_rollups_on_commit,
+)
+from accounts.uploads import UploadError, take_completed_upload
+from bimbel_backend.db_pool import pool_stats
+from bimbel_backend.profiling import is_admin_user, load_collapsed, load_profile, slowest_profiles
+from .utils import (
+    get_schedule_status,
+    calculate_tutor_rating,
+    admin_dashboard_groups,
+    admin_dashboard_payload,
+)
 
 from .serializers import (
-    AdminStudentManagementSerializer,
     AdminStudentDetailSerializer,
     TutorListSerializer,
     AddClassSerializer,
@@ -54,45 +93,24 @@ from .serializers import (
 
 class AdminDashboardView(APIView):
     def get(self, request):
-        stats = {
-            "Total Tutor": Tutors.objects.count(),
-            "Total Student": Students.objects.count(),
-            "Total Class": Classes.objects.count(),
-        }
+        results = run_query_groups(admin_dashboard_groups(date.today()))
+        return Response(admin_dashboard_payload(results), status=status.HTTP_200_OK)
 
-        today = date.today()
-        schedules = Schedules.objects.select_related("tutor", "tutor__user").filter(schedule_date=today).order_by("start_time")
-
-        schedule_data = []
-        for sched in schedules:
-            photo_url = "/media/profile/default-avatar.png"
-            if sched.tutor and sched.tutor.user and sched.tutor.user.photo_url:
-                photo_url = sched.tutor.user.photo_url
-
-            schedule_data.append({
-                "id": sched.id,
-                "status": "OFFLINE" if sched.room else "ONLINE",
-                "subject": ", ".join([
-                    te.subject.name for te in TutorExpertise.objects.filter(tutor=sched.tutor)
-                ]) if sched.tutor else "Unknown Subject",
-                "tutor": sched.tutor.full_name if sched.tutor else "Unknown",
-                "time": f"{sched.start_time.strftime('%H:%M')} – {sched.end_time.strftime('%H:%M')}",
-                "photo_url": photo_url  
-            })
+    def calculate_average_attendance(self):
+        # Dari rollup (satu aggregate), rumus sama dengan persentase kehadiran di panel lain
+        return attendance_percent(attendance_totals())
 
 
-        return Response({
-            "stats": [{"label": k, "value": v} for k, v in stats.items()],
-            "schedule": schedule_data
-        }, status=status.HTTP_200_OK)
+class AsyncAdminDashboardView(View):
+    """
+    Varian async AdminDashboardView (payload sama): grup query jalan bersamaan.
+    Butuh server ASGI (uvicorn) supaya request lain tidak menunggu selama query berjalan.
+    """
+
+    async def get(self, request):
+        results = await gather_query_groups(admin_dashboard_groups(date.today()))
+        return json_response(admin_dashboard_payload(results))
 
-    def calculate_average_attendance(self):
-        total = Attendance.objects.count()
-        if total == 0:
-            return "0%"
-        present = Attendance.objects.filter(status="present").count()
-        return f"{(present / total) * 100:.0f}%"
-    
 class SidebarUserInfoView(APIView):
     def get(self, request):
         user_id = request.query_params.get('user_id')
@@ -110,6 +128,8 @@ class SidebarUserInfoView(APIView):
                 'email': user.email,
                 'role': user.role,
                 'photo_url': user.photo_url,
+                'avatar_url': photo_url_for_size(user.photo_url, 48),
+                'photo_variants': photo_variants(user.photo_url),
                 'phone': user.phone,
                 'address' : user.address,
                 'date_joined': user.date_joined.isoformat() if user.date_joined else None,
@@ -136,6 +156,7 @@ class GlobalSearchView(APIView):
             subject__name__icontains=query
         ).values_list("tutor_id", flat=True)
 
+        reference = reference_data()
         result = {
             'students': list(
                 Students.objects.filter(
@@ -147,9 +168,7 @@ class GlobalSearchView(APIView):
                 {
                     "id": tutor.id,
                     "full_name": tutor.full_name,
-                    "expertise": ", ".join([
-                        te.subject.name for te in TutorExpertise.objects.filter(tutor=tutor)
-                    ])
+                    "expertise": reference.tutor_subject_text(tutor.id)
                 }
                 for tutor in Tutors.objects.filter(
                     Q(full_name__icontains=query) |
@@ -204,6 +223,7 @@ class AdminProfileView(APIView):
             'email': user.email,
             'role': user.role,
             'photo_url': user.photo_url,
+            'photo_variants': photo_variants(user.photo_url),
             'phone': user.phone,
             'address': user.address,
             'bio': user.bio,
@@ -230,7 +250,8 @@ class AdminProfileView(APIView):
         if file:
             filename = f'profile/user_{user.id}_{file.name}'
             path = default_storage.save(filename, file)
-            user.photo_url = f'/media/{path}' 
+            user.photo_url = f'/media/{path}'
+            schedule_photo_variants(user.photo_url)
 
         # Validasi data profil lainnya
         serializer = ProfileUpdateSerializer(user, data=data, partial=True)
@@ -278,32 +299,27 @@ class AdminStudentManagementView(APIView):
         page = int(request.query_params.get('page', 1))
         per_page = 10
 
-        students_qs = Students.objects.select_related('user').all()
+        students_qs = with_current_class(Students.objects.select_related('user').order_by('id'))
 
         if search:
             students_qs = students_qs.filter(full_name__icontains=search)
 
         if filter_class:
-            students_qs = students_qs.filter(studentclasses__class_field__class_name=filter_class)
+            students_qs = students_qs.filter(current_class_name=filter_class)
 
         total_students = students_qs.count()
 
         start = (page - 1) * per_page
         end = page * per_page
-        students_paginated = students_qs[start:end]
+        students_paginated = list(students_qs[start:end])
 
-        serializer = AdminStudentManagementSerializer(students_paginated, many=True)
+        # Kehadiran semua siswa di halaman ini dari rollup, sekali query
+        attendance_map = attendance_totals_by("student_id", student_id__in=[s.id for s in students_paginated])
 
         # Olah data di sini
         student_data = []
-        for student in serializer.data:
-            student_instance = Students.objects.get(id=student['id'])
-            user = student_instance.user
-
-            student_class = "N/A"
-            student_class_instance = StudentClasses.objects.filter(student=student_instance).order_by('-id').first()
-            if student_class_instance:
-                student_class = student_class_instance.class_field.class_name
+        for student in students_paginated:
+            user = student.user
 
             # Get status
             status_text = "Inactive"
@@ -311,17 +327,13 @@ class AdminStudentManagementView(APIView):
                 status_text = "Active" if user.is_active else "Inactive"
 
             # Get attendance
-            attendances = Attendance.objects.filter(student=student_instance)
-            avg_attendance = "0%"
-            if attendances.exists():
-                present_count = attendances.filter(confirmed_by_student=True).count()
-                avg_attendance = f"{(present_count / attendances.count()) * 100:.0f}%"
+            avg_attendance = attendance_percent(attendance_map.get(student.id))
 
             student_data.append({
-                'id': student['id'],
-                'student_id': f"S{str(student['id']).zfill(3)}",
-                'full_name': student['full_name'],
-                'class_name': student_class,
+                'id': student.id,
+                'student_id': f"S{str(student.id).zfill(3)}",
+                'full_name': student.full_name,
+                'class_name': student.current_class_name or "N/A",
                 'status': status_text,
                 'attendance': avg_attendance,
             })
@@ -352,7 +364,7 @@ class AdminStudentDetailView(APIView):
             user = student.user
 
             # Kelas aktif saat ini
-            current_class = StudentClasses.objects.filter(student=student).order_by('-id').first()
+            current_class = current_enrollments().filter(student=student).select_related('class_field').first()
             current_class_name = current_class.class_field.class_name if current_class else "N/A"
             class_level = current_class.class_field.level if current_class else "N/A"
 
@@ -368,9 +380,9 @@ class AdminStudentDetailView(APIView):
 
             # Attendance
             attendance_qs = Attendance.objects.filter(student=student)
-            present_count = attendance_qs.filter(confirmed_by_student=True).count()
-            total_meetings = attendance_qs.count()
-            attendance_percent = f"{(present_count / total_meetings) * 100:.0f}%" if total_meetings else "0%"
+            attendance = attendance_totals(student=student)
+            present_count = attendance["present"]
+            total_meetings = attendance["scheduled"]
 
             attendance_history = [
                 {
@@ -403,7 +415,7 @@ class AdminStudentDetailView(APIView):
                 "class_name": current_class_name,
                 "class_level": class_level,
                 "status": "Active" if user.is_active else "Inactive" if user else "Unknown",
-                "attendance": attendance_percent,
+                "attendance": attendance_percent(attendance),
                 "total_meetings": total_meetings,
                 "present_count": present_count,
                 "assignments": assignments,
@@ -426,7 +438,7 @@ class AdminTokenListView(APIView):
                 "phone": token.phone,
                 "address": token.address,
                 "gender": token.gender or "-",
-                "birthdate": token.birthdate.strftime('%Y-%m-%d') if token.birthdate else "-",
+                "birthdate": token.birthdate or "-",
                 "class_name": token.class_field.class_name if token.class_field else "-",
                 "is_used": token.is_used,
             }
@@ -462,24 +474,13 @@ class AdminUpdateStudentView(APIView):
         new_class_id = data.get("class_id")
         if new_class_id:
             try:
-                new_class = Classes.objects.get(id=new_class_id)
-            except Classes.DoesNotExist:
+                enroll_student(student.id, new_class_id)
+            except ClassNotFound:
                 return Response({"error": "Class not found"}, status=status.HTTP_404_NOT_FOUND)
-
-            existing = StudentClasses.objects.filter(student=student, class_field=new_class).exists()
-            if not existing:
-                last_class_rel = StudentClasses.objects.filter(student=student).order_by("-id").first()
-                if last_class_rel:
-                    last_class = last_class_rel.class_field
-                    last_class.current_student_count = max(0, last_class.current_student_count - 1)
-                    last_class.save()
-
-                if new_class.current_student_count < new_class.capacity:
-                    StudentClasses.objects.create(student=student, class_field=new_class)
-                    new_class.current_student_count += 1
-                    new_class.save()
-                else:
-                    return Response({"error": "Class is already full"}, status=400)
+            except ClassFull:
+                return Response({"error": "Class is already full"}, status=400)
+            except AlreadyEnrolled:
+                pass
 
         return Response({"message": "Student updated successfully."}, status=200)
     
@@ -491,32 +492,20 @@ class ChangeStudentClassView(APIView):
         if not class_id:
             return Response({"error": "class_id dibutuhkan"}, status=400)
 
-        try:
-            student = Students.objects.get(id=student_id)
-            new_class = Classes.objects.get(id=class_id)
-
-            if StudentClasses.objects.filter(student=student, class_field=new_class).exists():
-                return Response({"error": "Siswa sudah berada di kelas tersebut"}, status=400)
-
-            last_class_rel = StudentClasses.objects.filter(student=student).order_by("-id").first()
-            if last_class_rel:
-                last_class = last_class_rel.class_field
-                last_class.current_student_count = max(0, last_class.current_student_count - 1)
-                last_class.save()
+        if not Students.objects.filter(id=student_id).exists():
+            return Response({"error": "Siswa tidak ditemukan"}, status=404)
 
-            if new_class.current_student_count >= new_class.capacity:
-                return Response({"error": "Kelas penuh"}, status=400)
+        try:
+            enroll_student(student_id, class_id)
+        except ClassNotFound:
+            return Response({"error": "Kelas tidak ditemukan"}, status=404)
+        except AlreadyEnrolled:
+            return Response({"error": "Siswa sudah berada di kelas tersebut"}, status=400)
+        except ClassFull:
+            return Response({"error": "Kelas penuh"}, status=400)
 
-            StudentClasses.objects.create(student=student, class_field=new_class)
-            new_class.current_student_count += 1
-            new_class.save()
+        return Response({"message": "Kelas siswa berhasil diganti"}, status=200)
 
-            return Response({"message": "Kelas siswa berhasil diganti"}, status=200)
-        except Students.DoesNotExist:
-            return Response({"error": "Siswa tidak ditemukan"}, status=404)
-        except Classes.DoesNotExist:
-            return Response({"error": "Kelas tidak ditemukan"}, status=404)
-        
 class DeactivateStudentAccountView(APIView):
     def post(self, request, student_id):
         try:
@@ -543,11 +532,9 @@ class TutorListView(APIView):
 
         if search:
             queryset = queryset.filter(full_name__icontains=search)
+        reference = reference_data()
         if subject:
-            tutor_ids = TutorExpertise.objects.filter(
-                subject__name__iexact=subject
-            ).values_list("tutor_id", flat=True)
-            queryset = queryset.filter(id__in=tutor_ids)
+            queryset = queryset.filter(id__in=reference.tutor_ids_for_subject(subject))
 
         # Availability mapping
         availability_qs = TutorAvailability.objects.select_related('tutor').all()
@@ -556,66 +543,53 @@ class TutorListView(APIView):
             waktu = f"{a.day_of_week} ({a.start_time.strftime('%H:%M')}–{a.end_time.strftime('%H:%M')})"
             availability_map[a.tutor_id].append(waktu)
 
+        attendance_map = attendance_totals_by("tutor_id")
+
+        # Feedback, jadwal & materi dihitung sekali per tabel (GROUP BY tutor_id), bukan per tutor
+        feedback_map = {
+            row["tutor_id"]: row
+            for row in Feedbacks.objects.values("tutor_id").annotate(total=Count("id"), avg=Avg("rating")).order_by()
+        }
+        schedule_map = dict(
+            Schedules.objects.values("tutor_id").annotate(total=Count("id")).order_by().values_list("tutor_id", "total")
+        )
+        material_map = {
+            row["tutor_id"]: row
+            for row in Materials.objects.values("tutor_id").annotate(
+                total=Count("id"), approved=Count("id", filter=Q(is_approved=True))
+            ).order_by()
+        }
+
         response_data = []
         for tutor in queryset:
             tutor_id = f"G{tutor.id:03d}"
 
             # Feedback rating dari siswa
-            feedbacks = Feedbacks.objects.filter(tutor=tutor).values_list('rating', flat=True)
-            feedback_avg = round(sum(feedbacks) / len(feedbacks), 1) if feedbacks else None
+            feedbacks = feedback_map.get(tutor.id, {})
+            feedback_count = feedbacks.get("total", 0)
+            feedback_avg = round(feedbacks["avg"], 1) if feedbacks.get("avg") is not None else None
 
             # Attendance Score
-            total_schedule = Schedules.objects.filter(tutor=tutor).count()
-            attended = Attendance.objects.filter(schedule__tutor=tutor, marked_by_tutor=True).count()
-            attendance_score = (attended / total_schedule) * 100 if total_schedule > 0 else 0
+            total_schedule = schedule_map.get(tutor.id, 0)
+            attended = attendance_map.get(tutor.id, {}).get("marked", 0)
 
             # Subject Mastery Score
-            materials = Materials.objects.filter(tutor=tutor)
-            total_material = materials.count()
-            approved_material = materials.filter(is_approved=True).count()
-            subject_score = (approved_material / total_material) * 100 if total_material > 0 else 0
-
-            # Nilai maksimum dari masing-masing komponen
-            PROFILE_MAX = 60
-            FEEDBACK_MAX = 40
-
-            # Hitung kelengkapan profil (maks 3 field)
-            has_expertise = TutorExpertise.objects.filter(tutor=tutor).exists()
-            profile_fields = [
-                bool(tutor.phone),
-                bool(tutor.address),
-                has_expertise,
-            ]
-
-            profile_score = (sum(profile_fields) / 3) * PROFILE_MAX  # Skor proporsional
-
-            # Hitung feedback score (misalnya 4 feedback = 4 * 10, maksimal 40)
-            feedback_score = min(len(feedbacks) * 10, FEEDBACK_MAX)
+            materials = material_map.get(tutor.id, {})
+            total_material = materials.get("total", 0)
+            approved_material = materials.get("approved", 0)
 
-            # Gabungan skor professionalism
-            professionalism_score = round(profile_score + feedback_score, 1)
+            has_expertise = tutor.id in reference.tutor_subjects
 
-
-            # Admin rating kalkulasi otomatis
-            raw_admin_score = (attendance_score + subject_score + professionalism_score) / 3
-            admin_avg = round((raw_admin_score / 100) * 5, 1)
-
-            # Final rating gabungan 70:30
-            final_rating = None
-            if admin_avg and feedback_avg:
-                final_rating = round(admin_avg * 0.7 + feedback_avg * 0.3, 1)
-            elif admin_avg:
-                final_rating = admin_avg
-            elif feedback_avg:
-                final_rating = feedback_avg
+            final_rating = calculate_tutor_rating(
+                tutor.phone, tutor.address, has_expertise, feedback_count, feedback_avg,
+                total_schedule, attended, total_material, approved_material,
+            )
 
             response_data.append({
                 "id": tutor.id,
                 "full_name": tutor.full_name,
                 "tutor_id": tutor_id,
-                "subject": ", ".join([
-                    te.subject.name for te in TutorExpertise.objects.filter(tutor=tutor)
-                ]) or "-",
+                "subject": reference.tutor_subject_text(tutor.id, empty="-"),
                 "rating": final_rating,
                 "status": "Active" if tutor.user and tutor.user.is_active else "Inactive",
                 "availability": ", ".join(availability_map.get(tutor.id, ["-"]))
@@ -656,29 +630,27 @@ class TutorDetailView(APIView):
         assignment_qs = Assignments.objects.filter(tutor=tutor)
         assignments = assignment_qs.values("title", "due_date")
 
-        # Materi
-        material_qs = Materials.objects.filter(tutor=tutor)
-        materials = material_qs.values("title", "type", "uploaded_at", "is_approved")
+        # Materi (sekali query; total & yang disetujui dihitung dari list ini)
+        materials = list(Materials.objects.filter(tutor=tutor).values("title", "type", "uploaded_at", "is_approved"))
 
-        # Feedback siswa
-        feedback_qs = Feedbacks.objects.filter(tutor=tutor,is_approved=True)
-        feedbacks = feedback_qs.values("rating", "comment")
-        student_avg = feedback_qs.aggregate(avg=Avg("rating"))["avg"] or 0
+        # Feedback siswa (rata-rata dari baris yang sama, bukan aggregate terpisah)
+        feedbacks = list(Feedbacks.objects.filter(tutor=tutor, is_approved=True).values("rating", "comment"))
+        ratings = [f["rating"] for f in feedbacks if f["rating"] is not None]
+        student_avg = sum(ratings) / len(ratings) if ratings else 0
 
         # Availability
-        availability_qs = TutorAvailability.objects.filter(tutor=tutor)
         availability_str = ", ".join([
             f"{a.day_of_week} ({a.start_time.strftime('%H:%M')}–{a.end_time.strftime('%H:%M')})"
-            for a in availability_qs
-        ]) if availability_qs.exists() else "-"
+            for a in TutorAvailability.objects.filter(tutor=tutor)
+        ]) or "-"
 
         # Rating admin berbasis sistem
         total_schedule = Schedules.objects.filter(tutor=tutor).count()
-        attended = Attendance.objects.filter(schedule__tutor=tutor, marked_by_tutor=True).count()
+        attended = attendance_totals(tutor=tutor)["marked"]
         attendance_score = (attended / total_schedule) * 100 if total_schedule > 0 else 0
 
-        total_material = material_qs.count()
-        approved_material = material_qs.filter(is_approved=True).count()
+        total_material = len(materials)
+        approved_material = sum(1 for m in materials if m["is_approved"])
         subject_score = (approved_material / total_material) * 100 if total_material > 0 else 0
 
         # Nilai maksimum dari masing-masing komponen
@@ -686,7 +658,8 @@ class TutorDetailView(APIView):
         FEEDBACK_MAX = 40
 
         # Hitung kelengkapan profil (maks 3 field)
-        has_expertise = TutorExpertise.objects.filter(tutor=tutor).exists()
+        expertise = reference_data().tutor_subject_names(tutor.id)
+        has_expertise = bool(expertise)
         profile_fields = [
             bool(tutor.phone),
             bool(tutor.address),
@@ -712,16 +685,14 @@ class TutorDetailView(APIView):
             "email": user.email,
             "phone": tutor.phone,
             "address": tutor.address,
-            "expertise": [
-                te.subject.name for te in TutorExpertise.objects.filter(tutor=tutor)
-            ],
+            "expertise": expertise,
             "status": "Active" if user.is_active else "Inactive",
             "joined_at": user.date_joined.isoformat(),
             "availability": availability_str,
             "classes": list(class_data),
             "assignments": list(assignments),
-            "materials": list(materials),
-            "feedbacks": list(feedbacks),
+            "materials": materials,
+            "feedbacks": feedbacks,
             "rating": final_rating,
             "rating_breakdown": {
                 "admin": admin_avg,
@@ -758,14 +729,14 @@ class UpdateTutorView(APIView):
             tutor.user.full_name = full_name
             tutor.user.save()
 
-        # ✅ Update TutorExpertise
+        # ✅ Update TutorExpertise (signal menaikkan tag "tutor_expertise" -> registry dimuat ulang)
+        reference = reference_data()
         TutorExpertise.objects.filter(tutor=tutor).delete()
         for subject_name in expertise_list:
-            try:
-                subject = Subjects.objects.get(name__iexact=subject_name)
-                TutorExpertise.objects.create(tutor=tutor, subject=subject)
-            except Subjects.DoesNotExist:
+            subject_id = reference.subject_id(subject_name)
+            if subject_id is None:
                 continue
+            TutorExpertise.objects.create(tutor=tutor, subject_id=subject_id)
 
         return Response({"message": "Tutor updated successfully"}, status=200)
     
@@ -793,7 +764,7 @@ class ToggleTutorAccountView(APIView):
         
 class ClassManagementListView(APIView):
     def get(self, request):
-        schedules = Schedules.objects.select_related("class_field", "tutor").all()
+        schedules = Schedules.objects.select_related("class_field", "tutor", "subject").all()
 
         result = []
         for schedule in schedules:
@@ -863,25 +834,20 @@ class AddScheduleView(APIView):
         except ValueError:
             return Response({"error": "Format tanggal tidak valid (gunakan YYYY-MM-DD)."}, status=400)
 
-        # Ambil kelas
-        try:
-            class_obj = Classes.objects.get(class_name=data["class_name"])
-        except Classes.DoesNotExist:
+        # Ambil kelas & subject dari registry referensi
+        reference = reference_data()
+        class_id = reference.class_id(data["class_name"])
+        if class_id is None:
             return Response({"error": "Kelas tidak ditemukan."}, status=404)
-        
-        try:
-            subject_obj = Subjects.objects.get(name__iexact=data["subject"])
-        except Subjects.DoesNotExist:
+
+        subject_id = reference.subject_id(data["subject"])
+        if subject_id is None:
             return Response({"error": "Subject tidak ditemukan."}, status=404)
 
         # Ambil tutor
         try:
-            tutor_ids = TutorExpertise.objects.filter(
-                subject__name__iexact=data["subject"]
-            ).values_list("tutor_id", flat=True)
-
             tutor_obj = Tutors.objects.filter(
-                id__in=tutor_ids, full_name=data["tutor"]
+                id__in=reference.tutor_ids_for_subject(data["subject"]), full_name=data["tutor"]
             ).first()
 
             if not tutor_obj:
@@ -912,9 +878,9 @@ class AddScheduleView(APIView):
 
         try:
             new_schedule = Schedules.objects.create(
-                class_field=class_obj,
+                class_field_id=class_id,
                 tutor=tutor_obj,
-                subject=subject_obj,
+                subject_id=subject_id,
                 schedule_date=schedule_date,
                 start_time=start_time,
                 end_time=end_time,
@@ -922,8 +888,8 @@ class AddScheduleView(APIView):
                 room=data.get("room") if data["mode"] == "Offline" else None
             )
 
-            if not TutorClasses.objects.filter(tutor=tutor_obj, class_field=class_obj).exists():
-                TutorClasses.objects.create(tutor=tutor_obj, class_field=class_obj)
+            if not TutorClasses.objects.filter(tutor=tutor_obj, class_field_id=class_id).exists():
+                TutorClasses.objects.create(tutor=tutor_obj, class_field_id=class_id)
 
             return Response({"message": "Jadwal berhasil ditambahkan", "id": new_schedule.id}, status=201)
 
@@ -959,9 +925,15 @@ class AvailableTutorsView(APIView):
         day_of_week = day_map[schedule_date.strftime('%A')]
 
         # Ambil semua tutor yang memiliki subject tersebut
-        subject_tutor_ids = TutorExpertise.objects.filter(
-            subject__name__iexact=subject
-        ).values_list("tutor_id", flat=True)
+        subject_tutor_ids = reference_data().tutor_ids_for_subject(subject)
+
+        # Jadwal yang bentrok di hari & jam tersebut; dicek di query yang sama (NOT EXISTS), bukan per tutor
+        conflicts = Schedules.objects.filter(
+            tutor_id=OuterRef("tutor_id"),
+            schedule_date=schedule_date,
+            start_time__lt=end_time,
+            end_time__gt=start_time
+        )
 
         # Filter tutor yang punya availability sesuai hari dan jam serta subject
         available_tutors = TutorAvailability.objects.filter(
@@ -969,25 +941,15 @@ class AvailableTutorsView(APIView):
             start_time__lte=start_time,
             end_time__gte=end_time,
             tutor_id__in=subject_tutor_ids
-        ).select_related('tutor')
+        ).exclude(Exists(conflicts)).select_related('tutor')
 
         response = []
         for avail in available_tutors:
             tutor = avail.tutor
-
-            # Pastikan tidak bentrok dengan jadwal yang sudah ada
-            conflict = Schedules.objects.filter(
-                tutor=tutor,
-                schedule_date=schedule_date,
-                start_time__lt=end_time,
-                end_time__gt=start_time
-            ).exists()
-
-            if not conflict:
-                response.append({
-                    "id": tutor.id,
-                    "full_name": tutor.full_name,
-                })
+            response.append({
+                "id": tutor.id,
+                "full_name": tutor.full_name,
+            })
 
         return Response({"tutors": response}, status=200)
     
@@ -1006,7 +968,7 @@ class ScheduleDetailView(APIView):
         tutor_name = schedule.tutor.full_name if schedule.tutor else "-"
         subject = schedule.subject.name if schedule.subject else "-"
 
-        student_qs = StudentClasses.objects.filter(class_field=class_data).select_related('student')
+        student_qs = current_enrollments().filter(class_field=class_data).select_related('student')
         student_names = [sc.student.full_name for sc in student_qs if sc.student]
         
         reschedule_qs = RescheduleRequests.objects.filter(schedule=schedule, status="Approved").order_by('-requested_at').first()
@@ -1076,21 +1038,19 @@ class EditScheduleView(APIView):
             return Response({"error": "Jam mulai harus lebih awal dari jam selesai."}, status=400)
 
         # Ambil relasi
-        try:
-            class_obj = Classes.objects.get(class_name=data["class_name"])
-            subject_obj = Subjects.objects.get(id=data["subject"]) 
-            tutor_ids = TutorExpertise.objects.filter(subject=subject_obj).values_list("tutor_id", flat=True)
-
-            tutor_obj = Tutors.objects.filter(
-                id__in=tutor_ids, full_name=data["tutor"]
-            ).first()
-
-            if not tutor_obj:
-                return Response({"error": "Tutor dengan nama dan subject tersebut tidak ditemukan."}, status=404)
-
-        except (Classes.DoesNotExist, Tutors.DoesNotExist, Subjects.DoesNotExist):
+        reference = reference_data()
+        class_id = reference.class_id(data["class_name"])
+        subject_id = int(data["subject"]) if str(data["subject"]).isdigit() else None
+        if class_id is None or subject_id not in reference.subject_names:
             return Response({"error": "Kelas, subject, atau tutor tidak valid."}, status=404)
 
+        tutor_obj = Tutors.objects.filter(
+            id__in=reference.tutor_ids_for_subject(reference.subject_names[subject_id]),
+            full_name=data["tutor"],
+        ).first()
+        if not tutor_obj:
+            return Response({"error": "Tutor dengan nama dan subject tersebut tidak ditemukan."}, status=404)
+
         # Cek bentrok
         conflict = Schedules.objects.exclude(id=schedule_id).filter(
             tutor=tutor_obj,
@@ -1101,17 +1061,35 @@ class EditScheduleView(APIView):
         if conflict:
             return Response({"error": "Jadwal tutor bentrok dengan jadwal lain."}, status=400)
 
+        # Kunci rollup lama (kelas, tutor, bulan) sebelum diubah: absensi jadwal ini pindah ke kunci baru
+        old_key = Schedules(
+            class_field_id=schedule.class_field_id,
+            tutor_id=schedule.tutor_id,
+            schedule_date=schedule.schedule_date,
+        )
+
         # Update semua field
-        schedule.class_field = class_obj
+        schedule.class_field_id = class_id
         schedule.tutor = tutor_obj
         schedule.schedule_date = schedule_date
         schedule.start_time = start_time
         schedule.end_time = end_time
         schedule.room = data.get("room") if data["mode"] == "Offline" else None
         schedule.status = data["status"]
-        schedule.subject = subject_obj  
+        schedule.subject_id = subject_id
         schedule.save()
 
+        key_changed = (old_key.class_field_id, old_key.tutor_id, period_start(old_key.schedule_date)) != (
+            schedule.class_field_id, schedule.tutor_id, period_start(schedule.schedule_date)
+        )
+        if key_changed:
+            student_ids = list(
+                Attendance.objects.filter(schedule=schedule, student__isnull=False).values_list("student_id", flat=True)
+            )
+            if student_ids:
+                refresh_attendance_rollups_on_commit(old_key, student_ids)
+                refresh_attendance_rollups_on_commit(schedule, student_ids)
+
         return Response({"message": "Jadwal berhasil diperbarui."}, status=200)
 
     
@@ -1191,37 +1169,47 @@ class AddMaterialView(APIView):
         material_type = request.data.get("type", "").strip()
         is_approved = request.data.get("is_approved") == "true"
         uploaded_file = request.FILES.get("file")
+        upload_id = request.data.get("upload_id")  # hasil upload bertahap (/api/uploads/)
+        user_id = request.data.get("user_id")  # admin yang memulai upload bertahap
         subject = request.data.get("subject", "").strip()
 
-        if not title or not class_id or not material_type or not uploaded_file:
+        if not title or not class_id or not material_type or not (uploaded_file or upload_id):
             return Response({"error": "Semua field wajib diisi."}, status=400)
         if not subject:
             return Response({"error": "Subject wajib diisi."}, status=400)
+        if upload_id and not user_id:
+            return Response({"error": "user_id wajib diisi jika memakai upload_id."}, status=400)
 
         try:
             class_obj = Classes.objects.get(id=class_id)
         except Classes.DoesNotExist:
             return Response({"error": "Kelas tidak ditemukan."}, status=404)
 
-        # Ambil setting dari app_settings
-        size_setting = AppSettings.objects.filter(key="max_material_file_size_mb").first()
-        types_setting = AppSettings.objects.filter(key="allowed_material_types").first()
+        if upload_id:
+            # Tipe & ukuran sudah divalidasi saat upload dimulai
+            try:
+                saved_path = take_completed_upload(upload_id, "material", user_id=user_id)
+            except UploadError as e:
+                return Response({"error": str(e)}, status=e.status)
+        else:
+            # Ambil setting dari app_settings
+            size_setting = AppSettings.objects.filter(key="max_material_file_size_mb").first()
+            types_setting = AppSettings.objects.filter(key="allowed_material_types").first()
 
-        max_mb = int(size_setting.value) if size_setting else 50
-        allowed_types = types_setting.value.split(",") if types_setting else ["pdf", "mp4", "docx"]
+            max_mb = int(size_setting.value) if size_setting else 50
+            allowed_types = types_setting.value.split(",") if types_setting else ["pdf", "mp4", "docx"]
 
-        ext = os.path.splitext(uploaded_file.name)[1][1:].lower()
-        size_mb = uploaded_file.size / (1024 * 1024)
+            ext = os.path.splitext(uploaded_file.name)[1][1:].lower()
+            size_mb = uploaded_file.size / (1024 * 1024)
 
-        if ext not in allowed_types:
-            return Response({"error": f"Tipe file .{ext} tidak diizinkan. Diizinkan: {', '.join(allowed_types)}"}, status=400)
+            if ext not in allowed_types:
+                return Response({"error": f"Tipe file .{ext} tidak diizinkan. Diizinkan: {', '.join(allowed_types)}"}, status=400)
 
-        if size_mb > max_mb:
-            return Response({"error": f"Ukuran file melebihi batas {max_mb} MB"}, status=400)
+            if size_mb > max_mb:
+                return Response({"error": f"Ukuran file melebihi batas {max_mb} MB"}, status=400)
 
-        # Simpan file
-        unique_name = f"{uuid.uuid4().hex}.{ext}"
-        saved_path = default_storage.save(f"material/{unique_name}", uploaded_file)
+            # Simpan file (content-addressed: file yang sama hanya disimpan sekali)
+            saved_path = store_uploaded_file(uploaded_file)
 
         Materials.objects.create(
             title=title,
@@ -1250,18 +1238,14 @@ class MaterialDetailView(APIView):
             "class_id": material.class_field.id if material.class_field else None,"class_id": material.class_field.id if material.class_field else None,
             "uploaded_at": material.uploaded_at.isoformat() if material.uploaded_at else "",
             "uploaded_by": material.tutor.full_name if material.tutor else "Admin",
-            "file_url": material.file_url,
+            "file_url": media_url_builder(request, request.query_params.get("user_id"))(material.file_url),
         }, status=status.HTTP_200_OK)
         
 class DeleteMaterialView(APIView):
     def delete(self, request, material_id):
         material = get_object_or_404(Materials, id=material_id)
-        file_path = material.file_url
-
-        # Hapus file dari storage
-        if file_path and default_storage.exists(file_path):
-            default_storage.delete(file_path)
 
+        # File ikut dilepas lewat signal delete (blob yang dipakai materi lain tetap aman)
         material.delete()
         return Response({"message": "Materi berhasil dihapus."}, status=200)
     
@@ -1309,9 +1293,8 @@ class EditMaterialView(APIView):
             if size_mb > max_mb:
                 return Response({"error": f"Ukuran file melebihi batas {max_mb} MB"}, status=400)
 
-            unique_name = f"{uuid.uuid4().hex}.{ext}"
-            saved_path = default_storage.save(f"material/{unique_name}", uploaded_file)
-            material.file_url = saved_path
+            # File lama dilepas otomatis saat save (lihat accounts/signals.py)
+            material.file_url = store_uploaded_file(uploaded_file)
 
         material.save()
         return Response({"message": "Materi berhasil diperbarui."})
@@ -1361,7 +1344,7 @@ class FeedbackListView(APIView):
                 "target": target,
                 "rating": fb.rating,
                 "summary": fb.comment[:50] + "..." if fb.comment else "-",
-                "created_at": fb.created_at.isoformat() if fb.created_at else "",
+                "created_at": fb.created_at or "",
                 "is_approved": fb.is_approved,
                 "date": fb.created_at.strftime("%d/%m/%Y") if fb.created_at else "-"
             })
@@ -1523,9 +1506,10 @@ class AddSubjectView(APIView):
         if not name:
             return Response({"error": "Subject name is required"}, status=400)
 
-        if Subjects.objects.filter(name__iexact=name).exists():
+        if reference_data().subject_id(name) is not None:
             return Response({"error": "Subject already exists"}, status=400)
 
+        # Signal menaikkan tag "subjects": registry referensi dimuat ulang di request berikutnya
         Subjects.objects.create(name=name)
         return Response({"message": "Subject created successfully"}, status=201)
 
@@ -1605,3 +1589,98 @@ class AdminRejectReschedule(APIView):
         except RescheduleRequests.DoesNotExist:
             return Response({"error": "Permintaan reschedule tidak ditemukan."}, status=404)
 
+
+class AdminAttendanceExportView(APIView):
+    def get(self, request):
+        try:
+            file_type, start_date, end_date = parse_export_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        class_id = request.query_params.get("class_id")
+        class_ids = [class_id] if class_id else None
+
+        try:
+            return export_response(
+                file_type, "attendance", ATTENDANCE_HEADER,
+                attendance_rows(class_ids=class_ids, start_date=start_date, end_date=end_date),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+
+class AdminGradebookExportView(APIView):
+    def get(self, request):
+        try:
+            file_type, _, _ = parse_export_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        class_id = request.query_params.get("class_id")
+        assignment_id = request.query_params.get("assignment_id")
+        if not class_id and not assignment_id:
+            return Response({"error": "class_id atau assignment_id diperlukan"}, status=400)
+
+        try:
+            return export_response(
+                file_type, "gradebook", GRADEBOOK_HEADER,
+                gradebook_rows(class_ids=[class_id] if class_id else None, assignment_id=assignment_id),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+
+class AdminTutorRosterExportView(APIView):
+    def get(self, request):
+        try:
+            file_type, _, _ = parse_export_params(request.query_params)
+            return export_response(file_type, "tutor_roster", TUTOR_ROSTER_HEADER, tutor_roster_rows())
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+
+class ProfileListView(APIView):
+    def get(self, request):
+        if not is_admin_user(request.query_params.get("user_id")):
+            return Response({"error": "Akses ditolak"}, status=403)
+
+        try:
+            limit = max(1, min(int(request.query_params.get("limit", 5)), 50))
+        except ValueError:
+            return Response({"error": "limit harus angka"}, status=400)
+
+        return Response({"views": slowest_profiles(view=request.query_params.get("view"), limit=limit)})
+
+
+class ProfileDetailView(APIView):
+    def get(self, request, profile_id):
+        if not is_admin_user(request.query_params.get("user_id")):
+            return Response({"error": "Akses ditolak"}, status=403)
+
+        record = load_profile(profile_id)
+        if record is None:
+            return Response({"error": "Profil tidak ditemukan"}, status=404)
+        return Response(record)
+
+
+class ProfileCollapsedView(APIView):
+    def get(self, request, profile_id):
+        if not is_admin_user(request.query_params.get("user_id")):
+            return Response({"error": "Akses ditolak"}, status=403)
+
+        collapsed = load_collapsed(profile_id)
+        if collapsed is None:
+            return Response({"error": "Profil tidak ditemukan"}, status=404)
+        # Format collapsed stack: langsung bisa dipakai flamegraph.pl / speedscope
+        response = HttpResponse(collapsed, content_type="text/plain; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{profile_id}.collapsed"'
+        return response
+
+
+class DatabasePoolStatsView(APIView):
+    def get(self, request):
+        if not is_admin_user(request.query_params.get("user_id")):
+            return Response({"error": "Akses ditolak"}, status=403)
+
+        # Angka per proses worker yang kebetulan melayani request ini; reset=1 mengosongkan counter
+        return Response(pool_stats(reset=request.query_params.get("reset") == "1"))
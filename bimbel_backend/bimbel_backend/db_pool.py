@@ -0,0 +1,83 @@
+# bimbel_backend/db_pool.py
+import os
+
+from django.db import connections
+from django.http import JsonResponse
+
+try:
+    from psycopg_pool import PoolTimeout, TooManyRequests
+except ImportError:  # pragma: no cover - pool opsional
+    PoolTimeout = TooManyRequests = None
+
+POOL_RETRY_AFTER = 1  # detik, header Retry-After saat pool penuh
+
+
+def _pool(alias):
+    # Hanya backend postgresql (psycopg3) dengan OPTIONS["pool"] yang punya pool
+    return getattr(connections[alias], "pool", None)
+
+
+def pool_stats(reset=False):
+    """
+    Statistik pool per alias database untuk proses worker ini (setiap worker gunicorn punya pool sendiri).
+    `reset` memakai pop_stats(): counter (requests_*, connections_*) dihitung ulang dari nol.
+    """
+    result = {}
+    for alias in connections:
+        pool = _pool(alias)
+        if pool is None:
+            result[alias] = {"pooled": False, "vendor": connections[alias].vendor}
+            continue
+
+        stats = pool.pop_stats() if reset else pool.get_stats()
+        size = stats.get("pool_size", 0)
+        available = stats.get("pool_available", 0)
+        waits = stats.get("requests_queued", 0)
+        result[alias] = {
+            "pooled": True,
+            "min_size": pool.min_size,
+            "max_size": pool.max_size,
+            "timeout_s": pool.timeout,
+            "size": size,
+            "in_use": size - available,
+            "available": available,
+            "waiting": stats.get("requests_waiting", 0),
+            "requests": stats.get("requests_num", 0),
+            "requests_queued": waits,
+            "wait_ms_total": stats.get("requests_wait_ms", 0),
+            "wait_ms_avg": round(stats.get("requests_wait_ms", 0) / waits, 1) if waits else 0,
+            "timeouts": stats.get("requests_errors", 0),
+            "connections_opened": stats.get("connections_num", 0),
+            "connections_lost": stats.get("connections_lost", 0),
+            "returns_bad": stats.get("returns_bad", 0),
+            "usage_ms_total": stats.get("usage_ms", 0),
+        }
+    return {"pid": os.getpid(), "databases": result}
+
+
+def _is_pool_exhausted(exception):
+    if PoolTimeout is None:
+        return False
+    # Django membungkus error psycopg menjadi django.db.utils.OperationalError (aslinya di __cause__)
+    while exception is not None:
+        if isinstance(exception, (PoolTimeout, TooManyRequests)):
+            return True
+        exception = exception.__cause__ or exception.__context__
+    return False
+
+
+class PoolTimeoutMiddleware:
+    """Pool penuh / antrian terlalu panjang dibalas 503 + Retry-After, bukan 500."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not _is_pool_exhausted(exception):
+            return None
+        response = JsonResponse({"error": "Server sedang sibuk, silakan coba lagi"}, status=503)
+        response["Retry-After"] = str(POOL_RETRY_AFTER)
+        return response
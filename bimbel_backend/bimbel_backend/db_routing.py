@@ -0,0 +1,160 @@
+# bimbel_backend/db_routing.py
+import json
+import time
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+STICKY_PREFIX = "db:primary:"
+
+# Alias untuk query baca pada request/blok saat ini; None = primary
+_read_alias = ContextVar("bimbel_read_alias", default=None)
+
+
+def replica_alias():
+    alias = getattr(settings, "DATABASE_REPLICA_ALIAS", None)
+    return alias if alias and alias in settings.DATABASES else None
+
+
+def sticky_seconds():
+    return getattr(settings, "DATABASE_REPLICA_STICKY_SECONDS", 5)
+
+
+@contextmanager
+def use_database(alias):
+    """Arahkan semua query baca di dalam blok ke `alias`."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def use_primary():
+    return use_database(None)
+
+
+def primary_if_recent(versions):
+    """
+    Versi tag cache berupa time_ns saat data berubah. Jika ada yang lebih baru dari jeda replikasi,
+    replica mungkin belum menerima perubahan itu: bangun ulang cache dari primary.
+    """
+    if _read_alias.get() is None:
+        return nullcontext()
+    cutoff = time.time_ns() - sticky_seconds() * 1_000_000_000
+    if any(version and version > cutoff for version in versions.values()):
+        return use_primary()
+    return nullcontext()
+
+
+class ReplicaRouter:
+    """Baca dari replica hanya jika diminta (middleware / use_database); tulis & migrate selalu ke primary."""
+
+    def db_for_read(self, model, **hints):
+        alias = _read_alias.get()
+        # Di dalam transaksi primary (select_for_update, get_or_create) baca harus dari koneksi yang sama
+        if alias is None or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return alias
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+def _cache():
+    # Cache yang sama dengan accounts.cache: di production (REDIS_URL) dibagi semua worker
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def stick_to_primary(user_id):
+    _cache().set(f"{STICKY_PREFIX}{user_id}", True, sticky_seconds())
+
+
+def is_stuck_to_primary(user_id):
+    return bool(user_id) and bool(_cache().get(f"{STICKY_PREFIX}{user_id}"))
+
+
+def _json_user_id(request):
+    if request.content_type != "application/json":
+        return None
+    try:
+        # request.body di-cache Django, parser DRF tetap bisa membacanya
+        data = json.loads(request.body or b"{}")
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return data.get("user_id") if isinstance(data, dict) else None
+
+
+def _form_user_id(request):
+    # Form/multipart sudah di-parse oleh DRF saat view jalan; jangan baca stream sendiri
+    post = request.__dict__.get("_post")
+    return post.get("user_id") if post is not None else None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Request GET/HEAD/OPTIONS membaca dari DATABASE_REPLICA_ALIAS, kecuali:
+    - user (user_id) melakukan write dalam DATABASE_REPLICA_STICKY_SECONDS terakhir (read-your-writes),
+    - view menandai `db_read_primary = True` (mis. GET yang juga menulis).
+    Tidak aktif jika alias replica tidak ada di DATABASES.
+    """
+
+    def __init__(self, get_response):
+        self.replica = replica_alias()
+        if self.replica is None:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method in SAFE_METHODS:
+            try:
+                response = self.get_response(request)
+            finally:
+                _read_alias.set(None)
+            if getattr(request, "_db_read_alias", None) and response.streaming:
+                response.streaming_content = self._stream_from(request._db_read_alias, response.streaming_content)
+            return response
+
+        user_id = request.GET.get("user_id") or _json_user_id(request)
+        response = self.get_response(request)
+        user_id = user_id or _form_user_id(request)
+        if user_id:
+            stick_to_primary(user_id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method not in SAFE_METHODS:
+            return None
+        view_class = getattr(view_func, "view_class", None)
+        if getattr(view_class, "db_read_primary", False) or getattr(view_func, "db_read_primary", False):
+            return None
+        if is_stuck_to_primary(request.GET.get("user_id")):
+            return None
+        request._db_read_alias = self.replica
+        _read_alias.set(self.replica)
+        return None
+
+    @staticmethod
+    def _stream_from(alias, content):
+        # Export CSV/ZIP membaca database sambil response dikirim, setelah middleware selesai
+        iterator = iter(content)
+        while True:
+            _read_alias.set(alias)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                _read_alias.set(None)
+            yield chunk
@@ -0,0 +1,331 @@
+# bimbel_backend/profiling.py
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+from accounts.models import Users
+
+from .query_budget import QueryRecorder, view_key
+
+PROFILE_MODES = ("sample", "cprofile")
+PROFILE_HEADER = "HTTP_X_PROFILE_TOKEN"
+PROFILE_QUERY_PARAM = "_profile"
+PROFILE_SIGNING_SALT = "bimbel.profiling"
+PROFILE_ID_RE = re.compile(r"^\d+-[\w.]+$")
+
+SAMPLE_INTERVAL = 0.005  # detik antar sampel stack
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 20
+TOP_FUNCTIONS = 30
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def profiles_dir():
+    return _setting("PROFILING_DIR", os.path.join(settings.BASE_DIR, "profiles"))
+
+
+def make_profile_token(mode="sample"):
+    """Token untuk header X-Profile-Token; berlaku PROFILING_TOKEN_MAX_AGE detik."""
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"mode harus salah satu dari {', '.join(PROFILE_MODES)}")
+    return signing.TimestampSigner(salt=PROFILE_SIGNING_SALT).sign(mode)
+
+
+def read_profile_token(token):
+    try:
+        mode = signing.TimestampSigner(salt=PROFILE_SIGNING_SALT).unsign(
+            token, max_age=_setting("PROFILING_TOKEN_MAX_AGE", 3600)
+        )
+    except signing.BadSignature:
+        return None
+    return mode if mode in PROFILE_MODES else None
+
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class StackSampler:
+    """
+    Sampling profiler: thread terpisah membaca stack thread request setiap `interval` detik.
+    Hasilnya stack lengkap (root;...;leaf) -> jumlah sampel, format collapsed untuk flamegraph.
+    """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self):
+        return [f"{stack} {count}" for stack, count in self.stacks.most_common()]
+
+
+def cprofile_collapsed(stats):
+    """
+    cProfile tidak menyimpan stack penuh: yang bisa dibuat hanya pasangan caller;callee
+    dengan bobot waktu sendiri (mikrodetik). Cukup untuk melihat fungsi mana yang dominan.
+    """
+    lines = []
+    for func, (_, _, tottime, _, callers) in stats.stats.items():
+        label = f"{func[2]} ({os.path.basename(func[0])}:{func[1]})"
+        if not callers:
+            lines.append((label, tottime))
+        for caller, (_, _, caller_tottime, _) in callers.items():
+            caller_label = f"{caller[2]} ({os.path.basename(caller[0])}:{caller[1]})"
+            lines.append((f"{caller_label};{label}", caller_tottime))
+    return [f"{stack} {int(weight * 1_000_000)}" for stack, weight in sorted(lines, key=lambda x: -x[1]) if weight > 0]
+
+
+def cprofile_top(stats, limit=TOP_FUNCTIONS):
+    rows = []
+    for func, (primitive, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append({
+            "function": f"{func[2]} ({func[0]}:{func[1]})",
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        })
+    return sorted(rows, key=lambda row: -row["cumtime_ms"])[:limit]
+
+
+def _allocation_top(before, after, limit=TOP_ALLOCATIONS):
+    ignore = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+    diff = after.filter_traces(ignore).compare_to(before.filter_traces(ignore), "lineno")
+    return [
+        {
+            "location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+            "size_kb": round(stat.size_diff / 1024, 1),
+            "count": stat.count_diff,
+        }
+        for stat in diff[:limit]
+        if stat.size_diff > 0
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Ring buffer di disk: <id>.json (ringkasan), <id>.collapsed (stack), <id>.prof (pstats, mode cprofile)
+# ---------------------------------------------------------------------------
+
+def _profile_path(profile_id, ext):
+    return os.path.join(profiles_dir(), f"{profile_id}.{ext}")
+
+
+def save_profile(record, collapsed, stats=None):
+    directory = profiles_dir()
+    os.makedirs(directory, exist_ok=True)
+    view_name = re.sub(r"[^\w.]", "_", record["view"] or "unknown")
+    profile_id = f"{time.time_ns()}-{view_name}"
+    record["id"] = profile_id
+
+    with open(_profile_path(profile_id, "collapsed"), "w") as f:
+        f.write("\n".join(collapsed) + "\n")
+    if stats is not None:
+        stats.dump_stats(_profile_path(profile_id, "prof"))
+    # .json ditulis terakhir: profil baru terlihat di daftar setelah semua filenya lengkap
+    tmp = _profile_path(profile_id, "json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(record, f)
+    os.replace(tmp, _profile_path(profile_id, "json"))
+
+    prune_profiles()
+    return profile_id
+
+
+def _profile_ids():
+    try:
+        names = os.listdir(profiles_dir())
+    except FileNotFoundError:
+        return []
+    # id diawali time_ns: urutan nama = urutan waktu
+    return sorted(name[:-len(".json")] for name in names if name.endswith(".json"))
+
+
+def prune_profiles(max_files=None):
+    max_files = max_files or _setting("PROFILING_MAX_FILES", 200)
+    ids = _profile_ids()
+    for profile_id in ids[:max(0, len(ids) - max_files)]:
+        for ext in ("json", "collapsed", "prof"):
+            try:
+                os.remove(_profile_path(profile_id, ext))
+            except FileNotFoundError:
+                pass
+
+
+def load_profile(profile_id):
+    if not PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    try:
+        with open(_profile_path(profile_id, "json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def load_collapsed(profile_id):
+    if not PROFILE_ID_RE.match(profile_id or ""):
+        return None
+    try:
+        with open(_profile_path(profile_id, "collapsed")) as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def slowest_profiles(view=None, limit=5):
+    """Profil di ring buffer dikelompokkan per view, `limit` request paling lambat per view."""
+    by_view = defaultdict(list)
+    for profile_id in _profile_ids():
+        record = load_profile(profile_id)
+        if record is None or (view and view.lower() not in (record["view"] or "").lower()):
+            continue
+        record.pop("allocations", None)
+        record.pop("functions", None)
+        by_view[record["view"]].append(record)
+
+    result = []
+    for view_name, records in by_view.items():
+        records.sort(key=lambda r: -r["duration_ms"])
+        result.append({
+            "view": view_name,
+            "count": len(records),
+            "max_ms": records[0]["duration_ms"],
+            "slowest": records[:limit],
+        })
+    return sorted(result, key=lambda r: -r["max_ms"])
+
+
+# ---------------------------------------------------------------------------
+# Middleware
+# ---------------------------------------------------------------------------
+
+def is_admin_user(user_id):
+    if not user_id or not str(user_id).isdigit():
+        return False
+    return Users.objects.filter(id=user_id, role="admin", is_active=True).exists()
+
+
+class ProfilingMiddleware:
+    """
+    Profiling satu request atas permintaan (aktif jika PROFILING_ENABLED):
+    - header X-Profile-Token berisi token bertanda tangan (`manage.py profiling_token`), atau
+    - query ?_profile=sample|cprofile&user_id=<id admin>.
+    Mode "sample" mengambil sampel stack, "cprofile" memakai cProfile; keduanya plus snapshot tracemalloc.
+    Hasil ditulis ke ring buffer PROFILING_DIR; id-nya dikirim di header X-Profile-Id.
+    """
+
+    def __init__(self, get_response):
+        if not _setting("PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self._lock = threading.Lock()  # tracemalloc global per proses: satu profil dalam satu waktu
+
+    def _requested_mode(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        if token:
+            return read_profile_token(token)
+        mode = request.GET.get(PROFILE_QUERY_PARAM)
+        if mode:
+            mode = "sample" if mode == "1" else mode
+            if mode in PROFILE_MODES and is_admin_user(request.GET.get("user_id")):
+                return mode
+        return None
+
+    def __call__(self, request):
+        mode = self._requested_mode(request)
+        if mode is None or not self._lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self._profile(request, mode)
+        finally:
+            self._lock.release()
+
+    def _profile(self, request, mode):
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile() if mode == "cprofile" else None
+        sampler = StackSampler(threading.get_ident()) if mode == "sample" else None
+
+        started = time.perf_counter()
+        with recorder.capture():
+            if profiler:
+                profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profiler.disable()
+            else:
+                with sampler:
+                    response = self.get_response(request)
+        duration = time.perf_counter() - started
+
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        if started_tracing:
+            tracemalloc.stop()
+
+        match = getattr(request, "resolver_match", None)
+        view_class = getattr(match.func, "view_class", None) if match else None
+        record = {
+            "view": view_key(view_class) if view_class else (match.view_name if match else None),
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "mode": mode,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duration_ms": round(duration * 1000, 2),
+            "queries": recorder.count,
+            "db_ms": round(recorder.duration * 1000, 2),
+            "peak_memory_kb": round(peak / 1024, 1),
+            "allocations": _allocation_top(before, after),
+        }
+
+        stats = None
+        if profiler:
+            stats = pstats.Stats(profiler)
+            record["functions"] = cprofile_top(stats)
+            collapsed = cprofile_collapsed(stats)
+        else:
+            record["samples"] = sum(sampler.stacks.values())
+            collapsed = sampler.collapsed()
+
+        response["X-Profile-Id"] = save_profile(record, collapsed, stats)
+        return response
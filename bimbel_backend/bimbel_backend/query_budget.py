@@ -0,0 +1,181 @@
+# bimbel_backend/query_budget.py
+import importlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger("bimbel.queries")
+
+# App yang boleh punya modul <app>/query_budgets.py berisi QUERY_BUDGETS
+QUERY_BUDGET_APPS = ("admin_panel", "tutor_panel", "student_panel")
+REPEAT_THRESHOLD = 5  # shape SQL yang sama lebih dari ini per request = kandidat N+1
+
+_FINGERPRINT_RULES = (
+    (re.compile(r"'(?:[^']|'')*'"), "?"),
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),
+    (re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)"), "(...)"),
+    (re.compile(r"%s"), "?"),
+    (re.compile(r"\s+"), " "),
+)
+
+# Recorder yang sedang aktif; ikut terbawa ke thread sync_to_async lewat contextvars
+_active_recorders = ContextVar("bimbel_query_recorders", default=())
+
+
+def fingerprint(sql):
+    """Bentuk SQL tanpa nilai: query yang sama dengan parameter berbeda punya fingerprint sama."""
+    for pattern, replacement in _FINGERPRINT_RULES:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryRecorder:
+    """Catat setiap query (semua koneksi) lewat connection.execute_wrapper; tidak butuh DEBUG=True."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self.duration += elapsed
+                self.count += 1
+                self.shapes[fingerprint(sql)] += 1
+
+    @contextmanager
+    def capture(self):
+        token = _active_recorders.set(_active_recorders.get() + (self,))
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self))
+                yield self
+        finally:
+            _active_recorders.reset(token)
+
+    def repeated(self, threshold=REPEAT_THRESHOLD):
+        return [(sql, n) for sql, n in self.shapes.most_common() if n > threshold]
+
+
+@contextmanager
+def capture_thread_queries():
+    """
+    Koneksi DB per thread: query di thread worker (view async, sync_to_async) tidak terlihat
+    oleh execute_wrapper yang dipasang di thread request. Pasang ulang recorder aktif di thread ini.
+    """
+    with ExitStack() as stack:
+        for recorder in _active_recorders.get():
+            for connection in connections.all():
+                if recorder not in connection.execute_wrappers:
+                    stack.enter_context(connection.execute_wrapper(recorder))
+        yield
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+@contextmanager
+def assert_max_queries(budget, label="", threshold=REPEAT_THRESHOLD):
+    """
+    Helper untuk test/command: gagal jika blok ini menjalankan lebih dari `budget` query.
+
+        with assert_max_queries(8, "TutorListView"):
+            client.get("/api/admin/tutors/")
+    """
+    recorder = QueryRecorder()
+    with recorder.capture():
+        yield recorder
+    if recorder.count > budget:
+        lines = [f"{label or 'blok'}: {recorder.count} query melebihi budget {budget}"]
+        lines += [f"  {n}x {sql[:200]}" for sql, n in recorder.repeated(threshold)]
+        raise QueryBudgetExceeded("\n".join(lines))
+
+
+@lru_cache(maxsize=None)
+def load_query_budgets():
+    """{"<app>.<NamaView>": budget} dari QUERY_BUDGETS di setiap <app>/query_budgets.py."""
+    budgets = {}
+    for app in QUERY_BUDGET_APPS:
+        try:
+            module = importlib.import_module(f"{app}.query_budgets")
+        except ModuleNotFoundError:
+            continue
+        for view_name, budget in getattr(module, "QUERY_BUDGETS", {}).items():
+            budgets[f"{app}.{view_name}"] = budget
+    return budgets
+
+
+def view_key(view_class):
+    return f"{view_class.__module__.split('.')[0]}.{view_class.__name__}"
+
+
+def get_query_budget(view_class, method):
+    """Budget boleh int (untuk GET) atau dict per method, mis. {"GET": 6, "POST": 4}."""
+    budget = load_query_budgets().get(view_key(view_class))
+    if isinstance(budget, dict):
+        return budget.get(method.upper())
+    return budget if method.upper() in ("GET", "HEAD") else None
+
+
+class QueryBudgetMiddleware:
+    """
+    Per request: jumlah query, total waktu DB dan shape SQL berulang, dikirim sebagai header
+    X-DB-* dan satu baris log JSON (logger "bimbel.queries"). Aktif jika QUERY_BUDGET_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "QUERY_BUDGET_ENABLED", settings.DEBUG):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, "QUERY_BUDGET_REPEAT_THRESHOLD", REPEAT_THRESHOLD)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with recorder.capture():
+            response = self.get_response(request)
+
+        match = getattr(request, "resolver_match", None)
+        view_class = getattr(match.func, "view_class", None) if match else None
+        budget = get_query_budget(view_class, request.method) if view_class else None
+        repeated = recorder.repeated(self.threshold)
+        over_budget = budget is not None and recorder.count > budget
+
+        response["X-DB-Queries"] = str(recorder.count)
+        response["X-DB-Time"] = f"{recorder.duration * 1000:.1f}ms"
+        if repeated:
+            response["X-DB-Repeated"] = ", ".join(str(n) for _, n in repeated)
+        if budget is not None:
+            response["X-Query-Budget"] = f"{recorder.count}/{budget}" + (" exceeded" if over_budget else "")
+
+        record = {
+            "view": view_key(view_class) if view_class else (match.view_name if match else None),
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": recorder.count,
+            "db_ms": round(recorder.duration * 1000, 1),
+            "budget": budget,
+            "over_budget": over_budget,
+            "repeated": [{"count": n, "sql": sql[:300]} for sql, n in repeated],
+        }
+        level = logging.WARNING if over_budget or repeated else logging.INFO
+        logger.log(level, json.dumps(record))
+        return response
@@ -0,0 +1,68 @@
+# bimbel_backend/renderers.py
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson opsional, fallback ke json bawaan DRF
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+_fallback_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    # Tipe yang tidak dikenal orjson/msgpack (Decimal, lazy string, QuerySet, timedelta, ...)
+    # diserahkan ke encoder DRF supaya hasilnya sama dengan JSONRenderer lama.
+    return _fallback_encoder.default(obj)
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer berbasis orjson; view boleh mengembalikan objek datetime/date/time apa adanya.
+    Format datetime/date/time diserahkan ke JSONEncoder DRF (OPT_PASSTHROUGH_DATETIME), jadi sama
+    persis dengan JSONRenderer lama: `.isoformat()` dengan UTC ditulis `Z`, mis.
+    `2025-01-02T03:04:05.123456Z`, offset lain apa adanya (`+07:00`). String yang sudah
+    diformat view (`.isoformat()`, `+00:00`) tidak disentuh.
+    """
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        options = self.options
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            options |= orjson.OPT_INDENT_2
+
+        return orjson.dumps(data, default=encode_default, option=options)
+
+
+def _msgpack_default(obj):
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return encode_default(obj)
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if msgpack is None:
+            raise RuntimeError("Paket msgpack belum terpasang (pip install msgpack).")
+
+        if data is None:
+            return b''
+
+        return msgpack.packb(data, default=_msgpack_default, use_bin_type=True, datetime=False)
@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 import os
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -49,6 +51,10 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    'bimbel_backend.profiling.ProfilingMiddleware',
+    'bimbel_backend.query_budget.QueryBudgetMiddleware',
+    'bimbel_backend.db_routing.ReplicaRoutingMiddleware',
+    'bimbel_backend.db_pool.PoolTimeoutMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -94,8 +100,111 @@ DATABASES = {
     }
 }
 
+# Connection pool psycopg3 (butuh `psycopg[pool]`): satu pool per proses worker, koneksi dipakai ulang
+# antar request tanpa connect + auth baru. Total koneksi ke PostgreSQL ≈ WEB_CONCURRENCY × DB_POOL_MAX_SIZE
+# per alias (primary, dan replica jika aktif): jaga di bawah max_connections lewat DB_CONNECTION_BUDGET.
+try:
+    import psycopg  # noqa: F401
+    import psycopg_pool  # noqa: F401
+except ImportError:
+    psycopg_pool = None
+
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '4'))  # jumlah worker gunicorn
+DB_CONNECTION_BUDGET = int(os.environ.get('DB_CONNECTION_BUDGET', '80'))
+DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE', max(2, DB_CONNECTION_BUDGET // WEB_CONCURRENCY)))
+DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE', min(2, DB_POOL_MAX_SIZE)))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))  # detik menunggu koneksi bebas
+
+if psycopg_pool is not None and os.environ.get('DB_POOL_ENABLED', '1') == '1':
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True  # koneksi dicek (check_connection) saat diambil dari pool
+    DATABASES['default']['OPTIONS'] = {
+        'pool': {
+            'min_size': DB_POOL_MIN_SIZE,
+            'max_size': DB_POOL_MAX_SIZE,
+            'timeout': DB_POOL_TIMEOUT,
+            'max_waiting': DB_POOL_MAX_SIZE * 4,  # antrian lebih dari ini langsung ditolak (503)
+            'max_lifetime': 1800,
+            'max_idle': 300,
+        },
+    }
+
+# Read replica (opsional): request GET/HEAD diarahkan ke alias 'replica' oleh ReplicaRoutingMiddleware.
+# User yang baru menulis tetap di primary selama DATABASE_REPLICA_STICKY_SECONDS (read-your-writes).
+if os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['bimbel_backend.db_routing.ReplicaRouter']
+DATABASE_REPLICA_ALIAS = 'replica'
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', '5'))
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Locmem cukup untuk development & test. Di production set REDIS_URL supaya
+# semua worker berbagi cache (dan invalidasi tag berlaku ke semua worker).
+
+REDIS_URL = os.environ.get('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'bimbel-cache',
+        }
+    }
+
+# Snapshot accounts.reference dimuat ulang paling lambat setiap N detik. Perlu untuk LocMemCache:
+# versi tag tidak dibagi antar worker, jadi subject/kelas baru di worker lain baru terlihat di sini.
+REFERENCE_DATA_MAX_AGE = 60
+
+RESPONSE_CACHE_ENABLED = True
+RESPONSE_CACHE_TIMEOUT = 60  # detik; status jadwal (upcoming/on_progress) bergantung jam
+
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Header protokol upload bertahap (/api/uploads/) & download Range (/api/media/)
+CORS_ALLOW_HEADERS = (
+    *default_headers, 'upload-offset', 'upload-checksum', 'range', 'if-modified-since', 'x-profile-token',
+)
+CORS_EXPOSE_HEADERS = [
+    'Upload-Offset', 'Upload-Length', 'Content-Range', 'Accept-Ranges',
+    'X-DB-Queries', 'X-DB-Time', 'X-DB-Repeated', 'X-Query-Budget', 'X-Profile-Id', 'X-Next-Cursor',
+]
+
+# Instrumentasi query per request (header X-DB-* + log "bimbel.queries"), default ikut DEBUG.
+# Budget per view ada di <app>/query_budgets.py, dicek dengan `manage.py check_query_budgets`.
+QUERY_BUDGET_ENABLED = os.environ.get('QUERY_BUDGET_ENABLED', '1' if DEBUG else '0') == '1'
+QUERY_BUDGET_REPEAT_THRESHOLD = 5
+
+# Profiling per request atas permintaan (header X-Profile-Token / ?_profile=1 oleh admin).
+# Hasil disimpan di ring buffer PROFILING_DIR, maksimal PROFILING_MAX_FILES profil.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', '0') == '1'
+PROFILING_DIR = os.environ.get('PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+PROFILING_MAX_FILES = 200
+PROFILING_TOKEN_MAX_AGE = 3600  # detik
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'bimbel.queries': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.TokenAuthentication',
@@ -103,6 +212,12 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # orjson sebagai default; client mobile bisa minta Accept: application/msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'bimbel_backend.renderers.ORJSONRenderer',
+        'bimbel_backend.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 
@@ -157,3 +272,9 @@ DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Download media terproteksi: serahkan pengiriman file ke web server jika tersedia
+# nginx: MEDIA_ACCEL_REDIRECT_PREFIX=/protected-media/ (location internal yang alias ke MEDIA_ROOT)
+# Apache/lighttpd: MEDIA_X_SENDFILE=1
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_X_SENDFILE = os.environ.get('MEDIA_X_SENDFILE', '') == '1'
@@ -0,0 +1,159 @@
+import datetime
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import StreamingHttpResponse
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.urls import path
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from accounts.cache import get_cache
+from accounts.models import Users
+from accounts.synthetic import create_missing_tables
+
+from .renderers import ORJSONRenderer, orjson
+
+REPLICA = "test_replica"
+
+
+def _username(user_id):
+    return Users.objects.filter(id=user_id).values_list("username", flat=True).first()
+
+
+class UsernameView(APIView):
+    def get(self, request):
+        return Response({"username": _username(request.query_params.get("user_id"))})
+
+
+class PrimaryUsernameView(UsernameView):
+    db_read_primary = True
+
+
+class StreamUsernameView(APIView):
+    def get(self, request):
+        user_id = request.query_params.get("user_id")
+        # Query baru jalan saat response dikirim, setelah middleware selesai (seperti export CSV/ZIP)
+        return StreamingHttpResponse(f"{_username(user_id)}\n" for _ in range(2))
+
+
+class RenameUserView(APIView):
+    def post(self, request):
+        Users.objects.filter(id=request.data["user_id"]).update(full_name="Sudah diubah")
+        return Response({"message": "ok"})
+
+
+urlpatterns = [
+    path("username/", UsernameView.as_view()),
+    path("username/primary/", PrimaryUsernameView.as_view()),
+    path("username/stream/", StreamUsernameView.as_view()),
+    path("rename/", RenameUserView.as_view()),
+]
+
+
+@override_settings(ROOT_URLCONF=__name__, DATABASE_REPLICA_ALIAS=REPLICA, QUERY_BUDGET_ENABLED=False)
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Alias replica menunjuk ke database lokal kedua (file SQLite sementara) dengan isi berbeda dari
+    primary: username yang dikembalikan view menunjukkan database mana yang dibaca.
+    TransactionTestCase, bukan TestCase: di dalam transaksi primary router selalu memilih primary.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Alias dibuat saat test jalan (bukan di settings): database test runner tidak mengenalnya
+        cls.databases = cls.databases | {REPLICA}
+        cls.replica_dir = tempfile.mkdtemp()
+        connections.settings[REPLICA] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            REPLICA: {"ENGINE": "django.db.backends.sqlite3", "NAME": os.path.join(cls.replica_dir, "replica.sqlite3")},
+        })[REPLICA]
+        create_missing_tables()
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Users)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA].close()
+        del connections[REPLICA]
+        del connections.settings[REPLICA]
+        shutil.rmtree(cls.replica_dir, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        get_cache().clear()
+        for alias in (DEFAULT_DB_ALIAS, REPLICA):
+            Users.objects.using(alias).bulk_create([
+                Users(id=user_id, username=f"{alias}-{user_id}", email=f"{alias}-{user_id}@example.com",
+                      password="x", role="student")
+                for user_id in (1, 2)
+            ])
+
+    def tearDown(self):
+        # Tabel accounts managed=False tidak ikut di-flush TransactionTestCase
+        for alias in (DEFAULT_DB_ALIAS, REPLICA):
+            Users.objects.using(alias).all().delete()
+        super().tearDown()
+
+    def username(self, url, user_id=1):
+        response = self.client.get(url, {"user_id": user_id})
+        self.assertEqual(response.status_code, 200)
+        if response.streaming:
+            return set(b"".join(response.streaming_content).decode().splitlines())
+        return response.json()["username"]
+
+    def test_get_reads_from_replica(self):
+        self.assertEqual(self.username("/username/"), f"{REPLICA}-1")
+
+    def test_reads_stick_to_primary_after_write(self):
+        response = self.client.post("/rename/", {"user_id": 1}, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Users.objects.using(DEFAULT_DB_ALIAS).get(id=1).full_name, "Sudah diubah")
+
+        self.assertEqual(self.username("/username/"), f"{DEFAULT_DB_ALIAS}-1")
+        # User lain tidak terpengaruh
+        self.assertEqual(self.username("/username/", user_id=2), f"{REPLICA}-2")
+
+        with override_settings(DATABASE_REPLICA_STICKY_SECONDS=0):
+            self.client.post("/rename/", {"user_id": 2}, content_type="application/json")
+        self.assertEqual(self.username("/username/", user_id=2), f"{REPLICA}-2")
+
+    def test_db_read_primary_view_reads_from_primary(self):
+        self.assertEqual(self.username("/username/primary/"), f"{DEFAULT_DB_ALIAS}-1")
+
+    def test_streaming_response_keeps_replica(self):
+        self.assertEqual(self.username("/username/stream/"), {f"{REPLICA}-1"})
+        # Alias dilepas lagi setelah response selesai
+        self.assertEqual(_username(1), f"{DEFAULT_DB_ALIAS}-1")
+
+
+@unittest.skipUnless(orjson, "orjson belum terpasang")
+class ORJSONRendererTests(SimpleTestCase):
+    def test_output_matches_drf_json_renderer(self):
+        utc = datetime.datetime(2025, 1, 2, 3, 4, 5, 123456, tzinfo=datetime.timezone.utc)
+        data = {
+            "utc": utc,
+            "utc_whole_second": utc.replace(microsecond=0),
+            "wib": utc.astimezone(datetime.timezone(datetime.timedelta(hours=7))),
+            "naive": utc.replace(tzinfo=None),
+            "date": utc.date(),
+            "time": datetime.time(8, 30, 0, 250000),
+            "formatted_by_view": utc.isoformat(),
+            "duration": datetime.timedelta(minutes=90),
+            "score": Decimal("87.50"),
+            "id": uuid.UUID(int=1),
+            "items": [{"name": "Matematika ✓", "value": 1.5, "empty": None}],
+        }
+
+        rendered = ORJSONRenderer().render(data)
+        self.assertEqual(rendered, JSONRenderer().render(data))
+        self.assertIn(b'"utc":"2025-01-02T03:04:05.123456Z"', rendered)
+        self.assertIn(b'"formatted_by_view":"2025-01-02T03:04:05.123456+00:00"', rendered)
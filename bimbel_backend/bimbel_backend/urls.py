@@ -1,7 +1,7 @@
 from django.contrib import admin
-from django.urls import path, include
-from django.conf import settings
-from django.conf.urls.static import static
+from django.urls import path, include, re_path
+
+from accounts.views import ProtectedMediaView, UploadInitView, UploadChunkView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,8 +9,9 @@ urlpatterns = [
     path('api/admin/', include('admin_panel.urls')),
     path('api/tutor/', include('tutor_panel.urls')),
     path("api/student/", include("student_panel.urls")),
-
+    path("api/media/<path:path>", ProtectedMediaView.as_view(), name="protected-media"),
+    path("api/uploads/", UploadInitView.as_view(), name="upload-init"),
+    path("api/uploads/<str:upload_id>/", UploadChunkView.as_view(), name="upload-chunk"),
+    # URL lama /media/<path> (mis. photo_url "/media/profile/...") juga lewat cek akses, bukan static()
+    re_path(r"^media/(?P<path>.*)$", ProtectedMediaView.as_view()),
 ]
-
-# Tambahkan ini untuk serve file media (upload)
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
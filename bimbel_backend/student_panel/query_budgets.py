@@ -0,0 +1,24 @@
+# student_panel/query_budgets.py
+# Lihat admin_panel/query_budgets.py untuk format.
+QUERY_BUDGETS = {
+    "StudentHomeView": 6,
+    "AsyncStudentHomeView": 6,
+    "StudentUserInfoView": 3,
+    "StudentGlobalSearchView": 4,
+    "StudentNotificationView": 3,
+    "StudentTutorListView": 1,
+    "StudentLearningDashboardView": 7,
+    "StudentMaterialFeedView": 4,
+    "StudentAssignmentFeedView": 5,
+    "StudentMaterialDetailView": 2,
+    "StudentAssignmentDetailView": 3,
+    "StudentScheduleListView": 3,
+    "StudentScheduleDetailView": 6,
+    "StudentAttendanceListView": 3,
+    "StudentAttendanceDetailView": 6,
+    "AllFeedbacksForStudentView": 2,
+    "StudentFeedbackDetailView": 4,
+    "StudentProfileView": 2,
+    "StudentNotificationSettingsView": 2,
+    "SubmitAssignmentView": {"POST": 15},  # submit ulang (+pelepasan blob lama), diukur di dalam transaksi test
+}
@@ -1,3 +1,67 @@
-from django.test import TestCase
+from base64 import urlsafe_b64encode
+from datetime import datetime, timezone as dt_timezone
 
-# Create your tests here.
+from accounts.models import Assignments, AssignmentSubmissions, Feedbacks, Students, Tutors
+from accounts.testing import AccountsTestCase
+
+from .utils import decode_timeline_cursor, encode_timeline_cursor, feedback_timeline
+
+
+class FeedbackTimelineTests(AccountsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.student = Students.objects.create(full_name="Siswa Satu")
+        tutor = Tutors.objects.create(full_name="Tutor Satu")
+        assignment = Assignments.objects.create(title="Tugas 1", tutor=tutor)
+
+        # Banyak baris dengan tanggal yang sama (feedback & submission), plus submission tanpa tanggal
+        same_time = datetime(2025, 3, 1, 8, 0, tzinfo=dt_timezone.utc)
+        feedbacks = [Feedbacks.objects.create(student=self.student, tutor=tutor, rating=5, comment=f"fb {i}") for i in range(4)]
+        Feedbacks.objects.filter(id__in=[f.id for f in feedbacks[:3]]).update(created_at=same_time)
+        Feedbacks.objects.filter(id=feedbacks[3].id).update(created_at=datetime(2025, 4, 1, tzinfo=dt_timezone.utc))
+        for submitted_at in (same_time, same_time, None):
+            AssignmentSubmissions.objects.create(
+                assignment=assignment, student=self.student, feedback="bagus", grade=90, submitted_at=submitted_at,
+            )
+
+    def walk(self, page_size):
+        rows, after = [], None
+        while True:
+            page, cursor = feedback_timeline(self.student.id, after, page_size)
+            rows += page
+            if cursor is None:
+                return rows
+            after = decode_timeline_cursor(cursor)
+
+    def test_pages_cover_every_row_once_in_order(self):
+        expected = [(row["kind"], row["item_id"]) for row in feedback_timeline(self.student.id, page_size=100)[0]]
+        self.assertEqual(len(expected), 7)
+
+        for page_size in (1, 2, 3):
+            with self.subTest(page_size=page_size):
+                self.assertEqual([(row["kind"], row["item_id"]) for row in self.walk(page_size)], expected)
+
+    def test_ties_ordered_by_kind_then_id(self):
+        rows = feedback_timeline(self.student.id, page_size=100)[0]
+        keys = [(row["sort_date"], row["kind"], row["item_id"]) for row in rows]
+        self.assertEqual(keys, sorted(keys, reverse=True))
+        # Submission tanpa tanggal paling akhir
+        self.assertEqual(rows[-1]["kind"], "sub")
+
+    def test_cursor_round_trip(self):
+        for row in feedback_timeline(self.student.id, page_size=100)[0]:
+            with self.subTest(kind=row["kind"], item_id=row["item_id"]):
+                self.assertEqual(
+                    decode_timeline_cursor(encode_timeline_cursor(row)),
+                    (row["sort_date"], row["kind"], row["item_id"]),
+                )
+
+    def test_invalid_cursor_rejected(self):
+        def encode(raw):
+            return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+        for cursor in ("bukan-cursor", encode("2025-03-01T08:00:00|fb|1"), encode("2025-03-01T08:00:00+00:00|x|1"),
+                       encode("2025-03-01T08:00:00+00:00|fb|abc")):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(ValueError):
+                    decode_timeline_cursor(cursor)
@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     # Dashboard & Info
     StudentHomeView,
+    AsyncStudentHomeView,
     StudentUserInfoView,
     StudentGlobalSearchView,
     StudentNotificationView,
@@ -9,6 +10,8 @@ from .views import (
 
     # Learning
     StudentLearningDashboardView,
+    StudentMaterialFeedView,
+    StudentAssignmentFeedView,
     StudentMaterialDetailView,
     StudentAssignmentDetailView,
     SubmitAssignmentView,
@@ -37,6 +40,7 @@ from .views import (
 urlpatterns = [
     # Dashboard & Info
     path("dashboard/", StudentHomeView.as_view(), name="student-dashboard"),
+    path("dashboard/async/", AsyncStudentHomeView.as_view(), name="student-dashboard-async"),
     path("userinfo/", StudentUserInfoView.as_view(), name="student-userinfo"),
     path("search/", StudentGlobalSearchView.as_view(), name="student-global-search"),
     path("notifications/", StudentNotificationView.as_view(), name="student-notifications"),
@@ -44,6 +48,8 @@ urlpatterns = [
 
     # Learning
     path("my-learning/", StudentLearningDashboardView.as_view(), name="student-my-learning"),
+    path("my-learning/materials/", StudentMaterialFeedView.as_view(), name="student-material-feed"),
+    path("my-learning/assignments/", StudentAssignmentFeedView.as_view(), name="student-assignment-feed"),
     path("my-learning/material/<int:material_id>/", StudentMaterialDetailView.as_view(), name="student-material-detail"),
     path("my-learning/assignment/<int:assignment_id>/", StudentAssignmentDetailView.as_view(), name="student-assignment-detail"),
     path("my-learning/assignment/<int:assignment_id>/submit/", SubmitAssignmentView.as_view(), name="submit-assignment"),
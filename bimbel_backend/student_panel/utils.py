@@ -1,4 +1,14 @@
-from accounts.models import Students, Users
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db.models import Avg, CharField, Count, DateTimeField, Exists, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce
+
+from accounts.aio import run_query_groups
+from accounts.cache import cached_value
+from accounts.enrollment import with_current_class
+from accounts.models import Assignments, AssignmentSubmissions, Feedbacks, Materials, Schedules, Students, Users
+from accounts.rollups import attendance_percent, attendance_totals
 
 def get_student_by_user(user):
     return Students.objects.get(user=user)
@@ -11,3 +21,271 @@ def get_student_by_user_my_schedule(user_id):
         return Students.objects.get(user=user)
     except:
         raise Exception("Student tidak valid")
+
+
+def student_home_lookup(user_id):
+    """Validasi user & siswa sekaligus ambil kelas aktifnya (satu query): .values("id", "class_id")."""
+    return (
+        with_current_class(Students.objects.filter(user_id=user_id, user__role="student"))
+        .values("id", class_id=F("current_class_id"))
+    )
+
+
+def get_student_home_summary(student_id, class_id, run_groups=run_query_groups):
+    """
+    Ringkasan beranda siswa, di-cache per siswa/kelas/hari dan di-invalidate lewat tag model.
+    `run_groups` menentukan cara grup query dijalankan saat cache kosong (berurutan / bersamaan).
+    """
+    today = date.today()
+    tags = [f"student:{student_id}", f"class:{class_id}", "subjects", "tutors", "attendance_rollups"]
+    return cached_value(
+        f"student-home:{student_id}:{class_id}:{today.isoformat()}",
+        tags,
+        lambda: build_student_home_summary(student_id, class_id, today, run_groups),
+    )
+
+
+def student_home_assignments(student_id, class_id, today):
+    # Tugas terbaru + status submission + nama subject/tutor dalam satu query
+    recent_assignments = (
+        Assignments.objects.filter(class_field_id=class_id)
+        .annotate(submitted=Exists(
+            AssignmentSubmissions.objects.filter(student_id=student_id, assignment=OuterRef("pk"))
+        ))
+        .order_by("-created_at")
+        .values("id", "title", "due_date", "subject__name", "tutor__full_name", "submitted")[:3]
+    )
+
+    assignment_data = []
+    for a in recent_assignments:
+        if a["submitted"]:
+            status_text = "Completed"
+        else:
+            status_text = "In Progress" if a["due_date"] and a["due_date"].date() < today else "Not Started"
+
+        assignment_data.append({
+            "id": a["id"],
+            "title": a["title"],
+            "subject": a["subject__name"] or "-",
+            "tutor_name": a["tutor__full_name"] or "-",
+            "status": status_text,
+        })
+    return assignment_data
+
+
+def student_home_upcoming(class_id, today):
+    upcoming = (
+        Schedules.objects
+        .filter(class_field_id=class_id, schedule_date__gte=today)
+        .order_by("schedule_date", "start_time")
+        .values("id", "subject__name", "room", "schedule_date", "start_time", "end_time", "status")[:3]
+    )
+
+    return [
+        {
+            "id": s["id"],
+            "subject": s["subject__name"] or "-",
+            "room": s["room"] or "-",
+            "date": s["schedule_date"].strftime("%B %d"),
+            "time": f"{s['start_time'].strftime('%H:%M')} - {s['end_time'].strftime('%H:%M')}",
+            "mode": s["status"].upper(),
+        }
+        for s in upcoming
+    ]
+
+
+def student_home_groups(student_id, class_id, today):
+    """Grup query beranda siswa yang saling independen (dipakai view sync & async)."""
+    return {
+        "submissions": lambda: AssignmentSubmissions.objects.filter(student_id=student_id).aggregate(
+            done=Count("id"),
+            avg=Avg("grade"),
+        ),
+        "assigned_total": Assignments.objects.filter(class_field_id=class_id).count,
+        "recent_assignments": lambda: student_home_assignments(student_id, class_id, today),
+        "upcoming_classes": lambda: student_home_upcoming(class_id, today),
+        "attendance": lambda: attendance_totals(student_id=student_id, class_field_id=class_id),
+    }
+
+
+def build_student_home_summary(student_id, class_id, today, run_groups=run_query_groups):
+    results = run_groups(student_home_groups(student_id, class_id, today))
+    assigned_done = results["submissions"]["done"]
+    average_score = results["submissions"]["avg"] or 0
+
+    return {
+        "summary": {
+            "assigned_tasks": f"{assigned_done}/{results['assigned_total']}",
+            "average_score": f"{round(average_score)}%" if assigned_done else "0%",
+            "attendance_rate": attendance_percent(results["attendance"]),
+        },
+        "recent_assignments": results["recent_assignments"],
+        "upcoming_classes": results["upcoming_classes"],
+    }
+
+
+LEARNING_PAGE_SIZE = 20
+LEARNING_MAX_PAGE_SIZE = 100
+ASSIGNMENT_STATUSES = ("submitted", "pending")
+
+
+def parse_page_params(query_params):
+    """page & page_size (default 20, maks 100). Raise ValueError jika bukan angka."""
+    try:
+        page = max(1, int(query_params.get("page", 1)))
+        page_size = int(query_params.get("page_size", LEARNING_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValueError("page/page_size harus berupa angka")
+    return page, min(max(1, page_size), LEARNING_MAX_PAGE_SIZE)
+
+
+def _page(qs, page, page_size):
+    return qs.count(), qs[(page - 1) * page_size:page * page_size]
+
+
+def material_feed(class_field, media_url, page=1, page_size=LEARNING_PAGE_SIZE, material_type=None, subject=None):
+    qs = Materials.objects.filter(class_field=class_field, is_approved=True)
+    if material_type:
+        qs = qs.filter(type__iexact=material_type)
+    if subject:
+        qs = qs.filter(subject__iexact=subject)
+
+    total, rows = _page(
+        qs.order_by("-uploaded_at", "-id").values("id", "title", "subject", "type", "uploaded_at", "file_url"),
+        page, page_size,
+    )
+
+    results = [
+        {
+            "id": m["id"],
+            "title": m["title"],
+            "subject": m["subject"] or "-",
+            "classRange": class_field.class_name,
+            "type": m["type"],
+            "uploadDate": m["uploaded_at"].strftime("%Y-%m-%d") if m["uploaded_at"] else "-",
+            "fileUrl": media_url(m["file_url"]),
+        }
+        for m in rows
+    ]
+    return {"results": results, "total": total, "page": page, "page_size": page_size}
+
+
+def assignment_feed(student_id, class_field, media_url, page=1, page_size=LEARNING_PAGE_SIZE, subject=None, status=None):
+    qs = Assignments.objects.filter(class_field=class_field)
+    if subject:
+        qs = qs.filter(subject__name__iexact=subject)
+    if status:
+        submitted = AssignmentSubmissions.objects.filter(student_id=student_id, assignment=OuterRef("pk"))
+        qs = qs.filter(Exists(submitted)) if status == "submitted" else qs.exclude(Exists(submitted))
+
+    total, rows = _page(
+        qs.order_by("-due_date", "-id").values("id", "title", "subject__name", "due_date", "file_url"),
+        page, page_size,
+    )
+    rows = list(rows)
+
+    # Submission siswa untuk tugas di halaman ini, sekali query, di-key by assignment_id
+    grades = dict(
+        AssignmentSubmissions.objects
+        .filter(student_id=student_id, assignment_id__in=[a["id"] for a in rows])
+        .order_by("-id")
+        .values_list("assignment_id", "grade")
+    )
+
+    results = [
+        {
+            "id": a["id"],
+            "title": a["title"],
+            "subject": a["subject__name"] or "-",
+            "classRange": class_field.class_name,
+            "dueDate": a["due_date"].strftime("%Y-%m-%d") if a["due_date"] else "-",
+            "fileUrl": media_url(a["file_url"]),
+            "submitted": a["id"] in grades,
+            "grade": grades.get(a["id"]),
+        }
+        for a in rows
+    ]
+    return {"results": results, "total": total, "page": page, "page_size": page_size}
+
+
+TIMELINE_COLUMNS = ("sort_date", "kind", "item_id", "title", "tutor_pk", "tutor_name", "subject", "class_name", "text", "score")
+# Pengganti tanggal kosong: baris tanpa tanggal tetap punya posisi tetap (paling akhir) di urutan keyset
+TIMELINE_NO_DATE = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_timeline_cursor(row):
+    raw = f"{row['sort_date'].isoformat()}|{row['kind']}|{row['item_id']}"
+    return urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_timeline_cursor(cursor):
+    """(tanggal, kind, id) dari cursor X-Next-Cursor. Raise ValueError jika cursor tidak valid."""
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        sort_date, kind, item_id = raw.split("|")
+        sort_date = datetime.fromisoformat(sort_date)
+        item_id = int(item_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError("cursor tidak valid")
+    if kind not in ("fb", "sub") or sort_date.tzinfo is None:
+        raise ValueError("cursor tidak valid")
+    return sort_date, kind, item_id
+
+
+def _timeline_branch(qs, kind, date_field, after, **columns):
+    qs = qs.annotate(
+        sort_date=Coalesce(date_field, Value(TIMELINE_NO_DATE), output_field=DateTimeField()),
+        kind=Value(kind, output_field=CharField()),
+        item_id=F("id"),
+        **columns,
+    )
+    if after:
+        # Urutan (tanggal, kind, id) menurun; kind konstan per cabang, jadi cukup bandingkan tanggal & id
+        sort_date, after_kind, item_id = after
+        if kind < after_kind:
+            qs = qs.filter(sort_date__lte=sort_date)
+        elif kind > after_kind:
+            qs = qs.filter(sort_date__lt=sort_date)
+        else:
+            qs = qs.filter(Q(sort_date__lt=sort_date) | Q(sort_date=sort_date, item_id__lt=item_id))
+    return qs.values_list(*TIMELINE_COLUMNS).order_by()
+
+
+def feedback_timeline(student_id, after=None, page_size=LEARNING_PAGE_SIZE):
+    """
+    Feedback umum + feedback tugas siswa dalam satu query UNION ALL, terbaru dulu.
+    `after` = hasil decode_timeline_cursor. Return (list dict baris, cursor halaman berikutnya atau None).
+    """
+    feedbacks = _timeline_branch(
+        with_current_class(
+            Feedbacks.objects.filter(student_id=student_id, is_approved=True), student_path="student",
+        ),
+        "fb", "created_at", after,
+        title=Value(None, output_field=CharField()),
+        tutor_pk=F("tutor_id"),
+        tutor_name=F("tutor__full_name"),
+        subject=F("tutor__expertise"),
+        class_name=F("current_class_name"),
+        text=F("comment"),
+        score=F("rating"),
+    )
+    submissions = _timeline_branch(
+        AssignmentSubmissions.objects.filter(student_id=student_id, feedback__isnull=False, assignment__isnull=False),
+        "sub", "submitted_at", after,
+        title=F("assignment__title"),
+        tutor_pk=F("assignment__tutor_id"),
+        tutor_name=F("assignment__tutor__full_name"),
+        subject=F("assignment__tutor__expertise"),
+        class_name=F("assignment__class_field__class_name"),
+        text=F("feedback"),
+        score=F("grade"),
+    )
+
+    # Satu baris lebih untuk tahu ada halaman berikutnya
+    rows = list(
+        feedbacks.union(submissions, all=True)
+        .order_by("-sort_date", "-kind", "-item_id")[:page_size + 1]
+    )
+    rows = [dict(zip(TIMELINE_COLUMNS, row)) for row in rows]
+    next_cursor = encode_timeline_cursor(rows[page_size - 1]) if len(rows) > page_size else None
+    return rows[:page_size], next_cursor
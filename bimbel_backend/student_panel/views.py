@@ -4,10 +4,12 @@ from datetime import date, datetime, timedelta
 from urllib.parse import urljoin
 
 # 🔌 Django
+from asgiref.sync import async_to_sync, sync_to_async
 from django.conf import settings
 from django.core.files.storage import default_storage
 from django.contrib.auth.hashers import check_password, make_password
 from django.shortcuts import get_object_or_404
+from django.views import View
 from django.utils.timezone import localtime, now
 from django.db.models import Avg, Q
 
@@ -25,10 +27,8 @@ from accounts.models import (
     Assignments,
     AssignmentSubmissions,
     Attendance,
-    StudentClasses,
     AppSettings,
     Feedbacks,
-    TutorExpertise,
     Tutors,
     Materials,
     ScheduleMaterials,
@@ -37,7 +37,27 @@ from accounts.models import (
 )
 
 # ⚙️ Utilities
-from .utils import get_student_by_user, get_student_by_user_my_schedule
+from accounts.aio import gather_query_groups, json_response
+from accounts.blobs import store_uploaded_file
+from accounts.enrollment import current_enrollments
+from accounts.media import media_url_builder
+from accounts.photos import photo_url_for_size, photo_variants, schedule_photo_variants
+from accounts.reference import reference_data
+from accounts.rollups import refresh_attendance_rollups_on_commit
+from accounts.uploads import UploadError, take_completed_upload
+from .utils import (
+    get_student_by_user,
+    get_student_by_user_my_schedule,
+    get_student_home_summary,
+    student_home_lookup,
+    parse_page_params,
+    decode_timeline_cursor,
+    feedback_timeline,
+    TIMELINE_NO_DATE,
+    material_feed,
+    assignment_feed,
+    ASSIGNMENT_STATUSES,
+)
 
 
 class StudentHomeView(APIView):
@@ -46,99 +66,47 @@ class StudentHomeView(APIView):
         if not user_id:
             return Response({"error": "user_id diperlukan"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # ✅ Validasi user dan student
-        try:
-            user = Users.objects.get(id=user_id, role="student")
-            student = Students.objects.get(user=user)
-        except Users.DoesNotExist:
-            return Response({"error": "User tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
-        except Students.DoesNotExist:
+        # ✅ Validasi user dan student, sekaligus ambil kelas siswa (satu query)
+        student = student_home_lookup(user_id).first()
+        if not student:
+            if not Users.objects.filter(id=user_id, role="student").exists():
+                return Response({"error": "User tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
             return Response({"error": "Profil siswa tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        # ✅ Ambil kelas siswa
-        student_class = Classes.objects.filter(studentclasses__student=student).first()
-        if not student_class:
+        if not student["class_id"]:
             return Response({"error": "Siswa belum memiliki kelas"}, status=status.HTTP_404_NOT_FOUND)
 
-        # 📊 Summary
-        assigned_total = Assignments.objects.filter(class_field=student_class).count()
-        assigned_done = AssignmentSubmissions.objects.filter(student=student).count()
-        average_score = AssignmentSubmissions.objects.filter(student=student, grade__isnull=False).aggregate(avg=Avg('grade'))['avg'] or 0
-
-        today = date.today()
-        now = datetime.now().time()
-
-        past_schedule_ids = Schedules.objects.filter(
-            class_field=student_class
-        ).filter(
-            Q(schedule_date__lt=today) |
-            Q(schedule_date=today, end_time__lt=now)
-        ).values_list("id", flat=True)
-
-        # Step 2: Ambil hanya absensi dari jadwal tersebut
-        attendance_total = Attendance.objects.filter(
-            student=student,
-            schedule_id__in=past_schedule_ids
-        ).count()
-
-        attendance_present = Attendance.objects.filter(
-            student=student,
-            schedule_id__in=past_schedule_ids,
-            confirmed_by_student=True,
-            marked_by_tutor=True
-        ).count()
-
-
-        summary = {
-            "assigned_tasks": f"{assigned_done}/{assigned_total}",
-            "average_score": f"{round(average_score)}%" if assigned_done else "0%",
-            "attendance_rate": f"{round((attendance_present / attendance_total) * 100)}%" if attendance_total else "0%",
-        }
-
+        # 📊 Summary, tugas terbaru & jadwal terdekat dari cache ringkasan per siswa
+        return Response(
+            get_student_home_summary(student["id"], student["class_id"]),
+            status=status.HTTP_200_OK,
+        )
 
-        # 📌 Recent Assignments
-        recent_assignments_qs = Assignments.objects.filter(class_field=student_class).order_by("-created_at")[:3]
-        assignment_data = []
-        for a in recent_assignments_qs:
-            submission = AssignmentSubmissions.objects.filter(student=student, assignment=a).first()
+class AsyncStudentHomeView(View):
+    """
+    Varian async StudentHomeView (payload & cache ringkasan sama): saat cache kosong
+    grup query ringkasan jalan bersamaan. Butuh server ASGI (uvicorn).
+    """
 
-            # ⛏️ Fix: datetime vs date comparison
-            if submission:
-                status_text = "Completed"
-            else:
-                status_text = "In Progress" if a.due_date and a.due_date.date() < date.today() else "Not Started"
+    async def get(self, request):
+        user_id = request.GET.get("user_id")
+        if not user_id:
+            return json_response({"error": "user_id diperlukan"}, status=status.HTTP_400_BAD_REQUEST)
 
-            assignment_data.append({
-                "id": a.id,
-                "title": a.title,
-                "subject": a.subject.name if a.subject else "-",
-                "tutor_name": a.tutor.full_name if a.tutor else "-",
-                "status": status_text
-            })
+        student = await student_home_lookup(user_id).afirst() if user_id.isdigit() else None
+        if not student:
+            if not user_id.isdigit() or not await Users.objects.filter(id=user_id, role="student").aexists():
+                return json_response({"error": "User tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
+            return json_response({"error": "Profil siswa tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        # 🕑 Upcoming Classes
-        today = date.today()
-        upcoming_qs = Schedules.objects.filter(
-            class_field=student_class,
-            schedule_date__gte=today
-        ).select_related("subject").order_by("schedule_date", "start_time")[:3]
-
-        upcoming_data = []
-        for s in upcoming_qs:
-            upcoming_data.append({
-                "id": s.id,
-                "subject": s.subject.name if s.subject else "-",
-                "room": s.room or "-",
-                "date": s.schedule_date.strftime("%B %d"), 
-                "time": f"{s.start_time.strftime('%H:%M')} - {s.end_time.strftime('%H:%M')}",
-                "mode": s.status.upper() 
-            })
+        if not student["class_id"]:
+            return json_response({"error": "Siswa belum memiliki kelas"}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({
-            "summary": summary,
-            "recent_assignments": assignment_data,
-            "upcoming_classes": upcoming_data
-        }, status=status.HTTP_200_OK)
+        # cached_value (cache sync) di thread; builder-nya kembali ke event loop untuk gather
+        summary = await sync_to_async(get_student_home_summary)(
+            student["id"], student["class_id"], run_groups=async_to_sync(gather_query_groups),
+        )
+        return json_response(summary)
 
 class StudentUserInfoView(APIView):
     def get(self, request):
@@ -156,9 +124,9 @@ class StudentUserInfoView(APIView):
         except Students.DoesNotExist:
             return Response({"error": "Data siswa tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Ambil kelas dari StudentClasses
+        # Kelas aktif dari StudentClasses
         student_class = (
-            StudentClasses.objects
+            current_enrollments()
             .filter(student=student)
             .select_related("class_field")
             .first()
@@ -172,6 +140,8 @@ class StudentUserInfoView(APIView):
             "email": user.email,
             "role": user.role,
             "photo_url": user.photo_url or "/media/profile/default-avatar.png",
+            "avatar_url": photo_url_for_size(user.photo_url, 48),
+            "photo_variants": photo_variants(user.photo_url),
             "date_joined": user.date_joined.isoformat() if user.date_joined else None,
             "phone": user.phone,
             "address": user.address,
@@ -209,6 +179,7 @@ class StudentProfileView(APIView):
             "address": user.address,
             "bio": user.bio,
             "photo_url": user.photo_url or "/media/profile/default-avatar.png",
+            "photo_variants": photo_variants(user.photo_url),
             "birthdate": student.birthdate.strftime("%Y-%m-%d") if student.birthdate else "",
             "parent_contact": student.parent_contact,
         })
@@ -245,6 +216,7 @@ class StudentProfileView(APIView):
                 for chunk in file.chunks():
                     destination.write(chunk)
             user.photo_url = f"/media/{file_name}"
+            schedule_photo_variants(user.photo_url)
 
         user.save()
 
@@ -334,79 +306,51 @@ class AllFeedbacksForStudentView(APIView):
         except:
             return Response({"error": "Siswa tidak ditemukan"}, status=404)
 
-        combined_data = []
+        try:
+            _, page_size = parse_page_params(request.query_params)
+            cursor = request.query_params.get("cursor")
+            after = decode_timeline_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        # === FEEDBACK DUA ARAH (student → tutor atau tutor → student) ===
-        all_feedbacks = Feedbacks.objects.filter(
-            student=student,
-            is_approved=True
-        ).select_related("tutor").order_by("-created_at")
-
-        for fb in all_feedbacks:
-            tutor = fb.tutor
-            tutor_name = tutor.full_name if tutor else "-"
-            subject = tutor.expertise if tutor and tutor.expertise else "-"
-            student_class = StudentClasses.objects.filter(student=student).select_related("class_field").first()
-            class_name = student_class.class_field.class_name if student_class and student_class.class_field else "-"
-
-            # 🧠 Deteksi siapa pengirimnya
-            if tutor and student: 
-                # Misalnya default: tutor kirim ke student
-                sender_role = "tutor"
-                receiver_role = "student"
-
-                # Tapi jika tutor hanya penerima (karena student yang mengirim), ganti
-                feedback_from_student = Feedbacks.objects.filter(id=fb.id, student=student, tutor=tutor)
-                if feedback_from_student.exists() and fb.comment and fb.rating:
-                    # Asumsi: feedback dari student ke tutor
-                    sender_role = "student"
-                    receiver_role = "tutor"
-
-            elif tutor and not student:
-                sender_role = "tutor"
-                receiver_role = "unknown"
+        # Feedback umum & feedback tugas dalam satu UNION ALL, urut tanggal terbaru (keyset)
+        rows, next_cursor = feedback_timeline(student.id, after, page_size)
+
+        combined_data = []
+        for row in rows:
+            date_str = row["sort_date"].strftime("%d/%m/%Y") if row["sort_date"] != TIMELINE_NO_DATE else "-"
+            if row["kind"] == "fb":
+                # Feedback bertutor dengan komentar & rating = kiriman siswa ke tutor; tanpa tutor = ke admin
+                if row["tutor_pk"] is None:
+                    sender_role, receiver_role = "student", "admin"
+                elif row["text"] and row["score"]:
+                    sender_role, receiver_role = "student", "tutor"
+                else:
+                    sender_role, receiver_role = "tutor", "student"
+                source = "Umum"
+                score = f"{row['score']}/5" if row["score"] else "-"
             else:
-                sender_role = "student"
-                receiver_role = "admin"
+                sender_role, receiver_role = "tutor", "student"
+                source = f"Tugas: {row['title']}"
+                score = str(row["score"]) if row["score"] is not None else "-"
 
             combined_data.append({
-                "id": f"fb-{fb.id}",
-                "source": "Umum",
-                "tutor_name": tutor_name,
-                "subject": subject,
-                "class_name": class_name,
-                "feedback": fb.comment[:100] if fb.comment else "-",
-                "rating_or_grade": f"{fb.rating}/5" if fb.rating else "-",
-                "date": fb.created_at.strftime("%d/%m/%Y") if fb.created_at else "-",
+                "id": f"{row['kind']}-{row['item_id']}",
+                "source": source,
+                "tutor_name": row["tutor_name"] or "-",
+                "subject": row["subject"] or "-",
+                "class_name": row["class_name"] or "-",
+                "feedback": row["text"][:100] if row["text"] else "-",
+                "rating_or_grade": score,
+                "date": date_str,
                 "sender_role": sender_role,
                 "receiver_role": receiver_role
             })
 
-        # === FEEDBACK TUGAS DARI TUTOR KE STUDENT ===
-        submissions = AssignmentSubmissions.objects.filter(
-            student=student,
-            feedback__isnull=False
-        ).select_related("assignment__tutor", "assignment__class_field").order_by("-submitted_at")
-
-        for sub in submissions:
-            assignment = sub.assignment
-            if not assignment:
-                continue
-
-            combined_data.append({
-                "id": f"sub-{sub.id}",
-                "source": f"Tugas: {assignment.title}",
-                "tutor_name": assignment.tutor.full_name if assignment.tutor else "-",
-                "subject": assignment.tutor.expertise if assignment.tutor and assignment.tutor.expertise else "-",
-                "class_name": assignment.class_field.class_name if assignment.class_field else "-",
-                "feedback": sub.feedback[:100] if sub.feedback else "-",
-                "rating_or_grade": str(sub.grade) if sub.grade is not None else "-",
-                "date": sub.submitted_at.strftime("%d/%m/%Y") if sub.submitted_at else "-",
-                "sender_role": "tutor",
-                "receiver_role": "student"
-            })
-
-        return Response(combined_data, status=200)
+        response = Response(combined_data, status=200)
+        if next_cursor:
+            response["X-Next-Cursor"] = next_cursor
+        return response
 
 class StudentFeedbackDetailView(APIView):
     def get(self, request, id):
@@ -429,10 +373,8 @@ class StudentFeedbackDetailView(APIView):
             fb = Feedbacks.objects.filter(id=real_id, student_id=student.id).first()
             if fb:
                 tutor = fb.tutor
-                subject = ", ".join([
-                    te.subject.name for te in TutorExpertise.objects.filter(tutor=tutor)
-                ]) if tutor else "-"
-                student_class = StudentClasses.objects.filter(
+                subject = reference_data().tutor_subject_text(fb.tutor_id) if tutor else "-"
+                student_class = current_enrollments().filter(
                     student=student).select_related("class_field").first()
 
                 return Response({
@@ -537,77 +479,104 @@ class StudentTutorListView(APIView):
 
         return Response(data, status=200)
     
+def _learning_scope(request):
+    """(student, class_field, error_response) untuk feed belajar siswa."""
+    user_id = request.query_params.get("user_id")
+    if not user_id:
+        return None, None, Response({"error": "user_id diperlukan"}, status=400)
+
+    try:
+        student = Students.objects.get(user__id=user_id)
+    except (Students.DoesNotExist, ValueError):
+        return None, None, Response({"error": "Siswa tidak ditemukan"}, status=404)
+
+    student_class = current_enrollments().filter(student=student).select_related("class_field").first()
+    return student, student_class.class_field if student_class else None, None
+
+
+def _media_url(request):
+    # URL file lewat /api/media/ (cek akses) untuk siswa yang meminta
+    return media_url_builder(request, request.query_params.get("user_id"))
+
+
 class StudentLearningDashboardView(APIView):
     def get(self, request):
-        user_id = request.query_params.get("user_id")
+        student, class_field, error = _learning_scope(request)
+        if error:
+            return error
 
-        if not user_id:
-            return Response({"error": "user_id diperlukan"}, status=400)
+        if not class_field:
+            return Response({"materials": [], "assignments": []})
 
         try:
-            student = Students.objects.get(user__id=user_id)
-        except Students.DoesNotExist:
-            return Response({"error": "Siswa tidak ditemukan"}, status=404)
+            page, page_size = parse_page_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        # Ambil class siswa
-        student_class = StudentClasses.objects.filter(student=student).select_related("class_field").first()
-        if not student_class:
-            return Response({"materials": [], "assignments": []})
+        # Hanya halaman pertama tiap feed; sisanya lewat my-learning/materials/ & my-learning/assignments/
+        media_url = _media_url(request)
+        materials = material_feed(class_field, media_url, page, page_size)
+        assignments = assignment_feed(student.id, class_field, media_url, page, page_size)
 
-        class_field = student_class.class_field
+        return Response({
+            "materials": materials["results"],
+            "assignments": assignments["results"],
+            "materials_total": materials["total"],
+            "assignments_total": assignments["total"],
+        }, status=200)
 
-        # === Materi ===
-        materials_qs = Materials.objects.filter(
-            class_field=class_field,
-            is_approved=True
-        ).order_by("-uploaded_at")
 
-        material_data = []
-        for m in materials_qs:
-            file_url = None
-            if m.file_url:
-                file_url = request.build_absolute_uri(settings.MEDIA_URL + m.file_url)
-
-            material_data.append({
-                "id": m.id,
-                "title": m.title,
-                "subject": m.subject or "-",
-                "classRange": class_field.class_name,
-                "type": m.type,
-                "uploadDate": m.uploaded_at.strftime("%Y-%m-%d") if m.uploaded_at else "-",
-                "fileUrl": file_url
-            })
+class StudentMaterialFeedView(APIView):
+    def get(self, request):
+        student, class_field, error = _learning_scope(request)
+        if error:
+            return error
 
-        # === Tugas ===
-        assignments_qs = Assignments.objects.filter(
-            class_field=class_field
-        ).order_by("-due_date")
+        try:
+            page, page_size = parse_page_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
 
-        assignment_data = []
-        for a in assignments_qs:
-            submission = AssignmentSubmissions.objects.filter(
-                assignment=a,
-                student=student
-            ).first()
+        if not class_field:
+            return Response({"results": [], "total": 0, "page": page, "page_size": page_size}, status=200)
 
-            file_url = None
-            if a.file_url:
-                file_url = request.build_absolute_uri(settings.MEDIA_URL + a.file_url)
+        return Response(material_feed(
+            class_field,
+            _media_url(request),
+            page,
+            page_size,
+            material_type=request.query_params.get("type"),
+            subject=request.query_params.get("subject"),
+        ), status=200)
 
-            assignment_data.append({
-                "id": a.id,
-                "title": a.title,
-                "classRange": class_field.class_name,
-                "dueDate": a.due_date.strftime("%Y-%m-%d") if a.due_date else "-",
-                "fileUrl": file_url,
-                "submitted": submission is not None,
-                "grade": submission.grade if submission else None
-            })
 
-        return Response({
-            "materials": material_data,
-            "assignments": assignment_data
-        }, status=200)
+class StudentAssignmentFeedView(APIView):
+    def get(self, request):
+        student, class_field, error = _learning_scope(request)
+        if error:
+            return error
+
+        try:
+            page, page_size = parse_page_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        status_filter = request.query_params.get("status")
+        if status_filter and status_filter not in ASSIGNMENT_STATUSES:
+            return Response({"error": f"status harus salah satu dari: {', '.join(ASSIGNMENT_STATUSES)}"}, status=400)
+
+        if not class_field:
+            return Response({"results": [], "total": 0, "page": page, "page_size": page_size}, status=200)
+
+        return Response(assignment_feed(
+            student.id,
+            class_field,
+            _media_url(request),
+            page,
+            page_size,
+            subject=request.query_params.get("subject"),
+            status=status_filter,
+        ), status=200)
         
 class StudentMaterialDetailView(APIView):
     def get(self, request, material_id):
@@ -640,7 +609,7 @@ class StudentMaterialDetailView(APIView):
             "status": "Published" if material.is_approved else "Draft",
             "uploaded_by": material.tutor.full_name if material.tutor else "Admin",
             "uploaded_at": material.uploaded_at.strftime("%Y-%m-%d %H:%M:%S") if material.uploaded_at else "-",
-            "file_url": request.build_absolute_uri(settings.MEDIA_URL + material.file_url) if material.file_url else None,
+            "file_url": _media_url(request)(material.file_url),
             "used_in_schedules": used_in
         }, status=200)
         
@@ -665,12 +634,7 @@ class StudentAssignmentDetailView(APIView):
 
         submission = AssignmentSubmissions.objects.filter(assignment=assignment, student=student).first()
 
-        def get_full_url(file_path):
-            if not file_path:
-                return None
-            if str(file_path).startswith("/media/"):
-                return request.build_absolute_uri(file_path)
-            return request.build_absolute_uri(settings.MEDIA_URL + str(file_path))
+        get_full_url = media_url_builder(request, user_id)
 
         return Response({
             "id": assignment.id,
@@ -696,11 +660,12 @@ class SubmitAssignmentView(APIView):
     def post(self, request, assignment_id):
         user_id = request.data.get("user_id")
         uploaded_file = request.FILES.get("file")
+        upload_id = request.data.get("upload_id")  # hasil upload bertahap (/api/uploads/)
 
         if not user_id:
             return Response({"error": "user_id wajib diisi"}, status=400)
 
-        if not uploaded_file:
+        if not uploaded_file and not upload_id:
             return Response({"error": "File tugas wajib diunggah"}, status=400)
 
         try:
@@ -713,21 +678,20 @@ class SubmitAssignmentView(APIView):
         except Assignments.DoesNotExist:
             return Response({"error": "Tugas tidak ditemukan"}, status=404)
 
-        # Buat nama file unik
-        ext = os.path.splitext(uploaded_file.name)[1]
-        timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-        filename = f"{student.full_name.replace(' ', '_')}_{timestamp}{ext}"
-        path = f"jawaban_tugas/{filename}"
-
-        # Simpan file
-        saved_path = default_storage.save(path, uploaded_file)
+        if upload_id:
+            try:
+                saved_path = take_completed_upload(upload_id, "submission", user_id=user_id)
+            except UploadError as e:
+                return Response({"error": str(e)}, status=e.status)
+        else:
+            saved_path = store_uploaded_file(uploaded_file)
 
         # Simpan atau update submission
         submission, _ = AssignmentSubmissions.objects.update_or_create(
             assignment=assignment,
             student=student,
             defaults={
-                "file_url": f"/media/{saved_path}",
+                "file_url": saved_path,
                 "submitted_at": datetime.now(),
             }
         )
@@ -750,8 +714,8 @@ class StudentScheduleListView(APIView):
         today = date.today()
         now = datetime.now().time()
 
-        # Ambil semua kelas siswa
-        student_classes = student.studentclasses_set.values_list("class_field", flat=True)
+        # Kelas aktif siswa
+        student_classes = current_enrollments().filter(student=student).values_list("class_field", flat=True)
 
         # Filter awal: ambil jadwal dari kelas siswa
         queryset = Schedules.objects.filter(class_field__in=student_classes).select_related("tutor", "subject")
@@ -822,15 +786,14 @@ class StudentScheduleDetailView(APIView):
 
         # Materials
         materials_qs = ScheduleMaterials.objects.filter(schedule=schedule).select_related("material")
+        media_url = media_url_builder(request, user_id)
         materials = []
         for m in materials_qs:
-            file_name = m.material.file_url.split('/')[-1] if m.material.file_url else ''
-            file_url = request.build_absolute_uri(f"/media/material/{file_name}") if file_name else None
             materials.append({
                 "title": m.material.title,
                 "type": m.material.type,
                 "status": "Published" if m.material.is_approved else "Draft",
-                "file_url": file_url,
+                "file_url": media_url(m.material.file_url),
             })
 
 
@@ -919,6 +882,7 @@ class ConfirmStudentAttendanceView(APIView):
         # Simpan konfirmasi
         attendance.confirmed_by_student = True
         attendance.save()
+        refresh_attendance_rollups_on_commit(schedule, [student.id])
 
         return Response({"message": "Kehadiran berhasil dikonfirmasi."}, status=status.HTTP_200_OK)
     
@@ -1039,8 +1003,8 @@ class StudentGlobalSearchView(APIView):
         except Students.DoesNotExist:
             return Response({"error": "Siswa tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Ambil semua class yang diikuti oleh student
-        student_class_ids = StudentClasses.objects.filter(
+        # Kelas aktif student
+        student_class_ids = current_enrollments().filter(
             student=student
         ).values_list("class_field_id", flat=True)
 
@@ -1109,8 +1073,8 @@ class StudentNotificationView(APIView):
         notif = {}
         has_notification = False
 
-        # Ambil daftar class dari StudentClasses
-        student_classes = StudentClasses.objects.filter(student=student).values_list("class_field", flat=True)
+        # Kelas aktif dari StudentClasses
+        student_classes = current_enrollments().filter(student=student).values_list("class_field", flat=True)
 
         # === Jadwal Mendatang ===
         if get_pref("schedule_reminder"):
@@ -0,0 +1,97 @@
+# tutor_panel/analytics.py
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy opsional
+    np = None
+
+PERCENTILES = (10, 25, 50, 75, 90)
+HISTOGRAM_EDGES = tuple(range(0, 101, 10))  # 0-9, 10-19, ..., 90-100
+MAX_CURVE_DAYS = 60
+
+
+def grade_statistics(grades):
+    """Statistik ringkas dari array nilai (NaN = belum dinilai)."""
+    graded = grades[~np.isnan(grades)]
+    hist, _ = np.histogram(np.clip(graded, 0, 100), bins=HISTOGRAM_EDGES)
+
+    buckets = [
+        {
+            "range": f"{lo}-{hi if hi == 100 else hi - 1}",
+            "count": int(count),
+        }
+        for lo, hi, count in zip(HISTOGRAM_EDGES[:-1], HISTOGRAM_EDGES[1:], hist)
+    ]
+
+    if graded.size == 0:
+        return {
+            "graded_count": 0,
+            "mean": None,
+            "median": None,
+            "std": None,
+            "min": None,
+            "max": None,
+            "percentiles": {f"p{p}": None for p in PERCENTILES},
+            "histogram": buckets,
+        }
+
+    percentile_values = np.percentile(graded, PERCENTILES)
+    return {
+        "graded_count": int(graded.size),
+        "mean": round(float(graded.mean()), 2),
+        "median": round(float(np.median(graded)), 2),
+        "std": round(float(graded.std()), 2),
+        "min": float(graded.min()),
+        "max": float(graded.max()),
+        "percentiles": {f"p{p}": round(float(v), 2) for p, v in zip(PERCENTILES, percentile_values)},
+        "histogram": buckets,
+    }
+
+
+def submission_curve(submitted_at, due_date, roster_size):
+    """
+    Kurva kumulatif submission per hari relatif terhadap deadline (hari 0 = deadline).
+    `submitted_at` berupa array datetime64; NaT diabaikan.
+    """
+    times = submitted_at[~np.isnat(submitted_at)]
+    if times.size == 0 or due_date is None:
+        return []
+
+    due = np.datetime64(due_date.replace(tzinfo=None), "s")
+    offsets = np.sort(np.floor((times - due) / np.timedelta64(1, "D")).astype(int))
+
+    first_day = max(int(offsets[0]), -MAX_CURVE_DAYS)
+    last_day = min(max(int(offsets[-1]), 0), first_day + MAX_CURVE_DAYS)
+    days = np.arange(first_day, last_day + 1)
+
+    cumulative = np.searchsorted(offsets, days, side="right")
+    rates = cumulative / roster_size * 100 if roster_size else np.zeros(days.size)
+
+    return [
+        {"day": int(day), "submitted": int(count), "rate": round(float(rate), 1)}
+        for day, count, rate in zip(days, cumulative, rates)
+    ]
+
+
+def per_assignment_summary(assignment_index, grades, assignments, roster_size):
+    """Jumlah submission, submission rate dan rata-rata nilai per tugas, dengan bincount."""
+    n = len(assignments)
+    submitted = np.bincount(assignment_index, minlength=n)
+
+    graded_mask = ~np.isnan(grades)
+    graded_count = np.bincount(assignment_index[graded_mask], minlength=n)
+    grade_sum = np.bincount(assignment_index[graded_mask], weights=grades[graded_mask], minlength=n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = np.where(graded_count > 0, grade_sum / graded_count, np.nan)
+
+    result = []
+    for i, (assignment_id, title, due_date) in enumerate(assignments):
+        result.append({
+            "id": assignment_id,
+            "title": title,
+            "due_date": due_date,
+            "submitted": int(submitted[i]),
+            "submission_rate": round(float(submitted[i]) / roster_size * 100, 1) if roster_size else 0.0,
+            "mean_grade": None if np.isnan(means[i]) else round(float(means[i]), 2),
+        })
+    return result
@@ -0,0 +1,26 @@
+# tutor_panel/query_budgets.py
+# Lihat admin_panel/query_budgets.py untuk format.
+QUERY_BUDGETS = {
+    "TutorHomeView": 8,
+    "AsyncTutorHomeView": 8,
+    "TutorUserInfoView": 2,
+    "TutorGlobalSearchView": 5,
+    "TutorNotificationStatusView": 4,
+    "TutorScheduleListView": 4,
+    "TutorScheduleDetailView": 15,  # 10 jika absensi sudah ada; +insert & refresh rollup saat baris baru dibuat
+    "TutorTeachingDashboardView": 4,
+    "TutorMaterialDetailView": 2,
+    "TutorAssignmentDetailView": 2,
+    "TutorAssignmentSubmissionsDownloadView": 5,
+    "StudentPerformanceView": 4,
+    "StudentPerformanceDetailView": 8,
+    "TutorGradebookAnalyticsView": 6,
+    "TutorAttendanceExportView": 3,
+    "TutorGradebookExportView": 5,
+    "TutorFeedbackListView": 2,
+    "TutorFeedbackDetailView": 3,
+    "TutorProfileView": 1,
+    "TutorNotificationSettingsView": 3,
+    "TutorAvailabilityListView": 2,
+    "MarkAttendanceView": {"POST": 7},  # tetap berapa pun jumlah siswa; termasuk refresh rollup
+}
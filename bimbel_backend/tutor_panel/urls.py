@@ -2,6 +2,7 @@ from django.urls import path
 from .views import (
     # Home & Profil
     TutorHomeView,
+    AsyncTutorHomeView,
     TutorUserInfoView,
     TutorProfileView,
     TutorChangePasswordView,
@@ -18,6 +19,7 @@ from .views import (
     TutorEditAssignmentView,
     TutorMaterialDetailView,
     TutorAssignmentDetailView,
+    TutorAssignmentSubmissionsDownloadView,
     TutorMaterialDeleteView,
     TutorAssignmentDeleteView,
     GradeAssignmentSubmissionView,
@@ -42,11 +44,17 @@ from .views import (
     # Student Performance
     StudentPerformanceView,
     StudentPerformanceDetailView,
+    TutorGradebookAnalyticsView,
+
+    # Export
+    TutorAttendanceExportView,
+    TutorGradebookExportView,
 )
 
 urlpatterns = [
     # Home & User Info
     path("home/", TutorHomeView.as_view(), name="tutor-home"),
+    path("home/async/", AsyncTutorHomeView.as_view(), name="tutor-home-async"),
     path("userinfo/", TutorUserInfoView.as_view(), name="tutor-user-info"),
     path("search/", TutorGlobalSearchView.as_view(), name="tutor-global-search"),
     path("notifications/", TutorNotificationStatusView.as_view(), name="tutor-notifications"),
@@ -70,10 +78,16 @@ urlpatterns = [
     path("teaching-dashboard/assignments/<int:assignment_id>/edit/", TutorEditAssignmentView.as_view(), name="edit-tutor-assignment"),
     path("teaching-dashboard/assignments/<int:assignment_id>/delete/", TutorAssignmentDeleteView.as_view(), name="delete-tutor-assignment"),
     path("teaching-dashboard/assignments/<int:assignment_id>/grade/", GradeAssignmentSubmissionView.as_view(), name="grade-assignment"),
+    path("teaching-dashboard/assignments/<int:assignment_id>/submissions/download/", TutorAssignmentSubmissionsDownloadView.as_view(), name="tutor-assignment-submissions-download"),
 
     # Student Performance
     path("student-performance/", StudentPerformanceView.as_view(), name="student-performance"),
     path("student-performance/<int:student_id>/", StudentPerformanceDetailView.as_view(), name="student-performance-detail"),
+    path("student-performance/analytics/", TutorGradebookAnalyticsView.as_view(), name="tutor-gradebook-analytics"),
+
+    # Export
+    path("exports/attendance/", TutorAttendanceExportView.as_view(), name="tutor-export-attendance"),
+    path("exports/gradebook/", TutorGradebookExportView.as_view(), name="tutor-export-gradebook"),
 
     # Feedback
     path("feedbacks/", TutorFeedbackListView.as_view(), name="tutor-feedback-list"),
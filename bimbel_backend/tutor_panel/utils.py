@@ -1,9 +1,32 @@
-from accounts.models import Tutors
+from accounts.models import Assignments, AssignmentSubmissions, Materials, RescheduleRequests, Schedules, Tutors
+from collections import Counter
 from datetime import datetime, time
+import os
+import re
+
+from django.db.models import Count, Q
+
+from accounts.blobs import relative_media_path
+from accounts.media import resolve_media_file
+from django.db.models.functions import TruncMonth, TruncWeek
+
+TIMELINE_TRUNC = {"week": TruncWeek, "month": TruncMonth}
+MAX_TIMELINE_BUCKETS = 104
 
 def get_tutor_by_user(user):
     return Tutors.objects.get(user=user)
 
+def tutor_cache_tags(request, *args, **kwargs):
+    user_id = request.query_params.get("user_id")
+    if not user_id or not str(user_id).isdigit():
+        return None
+
+    tutor_id = Tutors.objects.filter(user_id=user_id).values_list("id", flat=True).first()
+    if not tutor_id:
+        return None
+
+    return [f"user:{user_id}", f"tutor:{tutor_id}", "classes", "subjects"]
+
 def get_schedule_status(schedule, reschedule_status=None):
     now = datetime.now()
 
@@ -22,3 +45,143 @@ def get_schedule_status(schedule, reschedule_status=None):
         return "on_progress"
     else:
         return "completed"
+
+def tutor_home_schedule(tutor, today):
+    """Jadwal hari ini + hitungan status dinamis."""
+    schedules = Schedules.objects.filter(tutor=tutor, schedule_date=today).select_related("class_field", "subject")
+    # Urut -id: yang tersisa di dict = request pertama per jadwal, sama seperti .first()
+    reschedule_statuses = dict(
+        RescheduleRequests.objects.filter(schedule__tutor=tutor, schedule__schedule_date=today)
+        .order_by("-id")
+        .values_list("schedule_id", "status")
+    )
+    schedule_data = []
+    status_counter = Counter()
+
+    for s in schedules:
+        subject_name = s.subject.name if s.subject else "-"
+        class_name = s.class_field.class_name if s.class_field else "-"
+        dynamic_status = get_schedule_status(s, reschedule_statuses.get(s.id))
+
+        schedule_data.append({
+            "id": s.id,
+            "status": dynamic_status,
+            "subject": f"{subject_name} - {class_name}",
+            "time": f"{s.start_time.strftime('%H:%M')} - {s.end_time.strftime('%H:%M')}" if s.start_time and s.end_time else "-",
+            "room": s.room or "-",
+        })
+
+        status_counter[dynamic_status] += 1
+
+    return schedule_data, dict(status_counter)
+
+
+def tutor_home_materials(tutor):
+    materials = Materials.objects.filter(tutor=tutor).order_by("-uploaded_at")[:5]
+    return [
+        {
+            "id": m.id,
+            "title": m.title,
+            "status": "Published" if m.is_approved else "Draft",
+            "subject": m.subject or "-"
+        }
+        for m in materials
+    ]
+
+
+def tutor_home_assignments(tutor):
+    assignments = (
+        Assignments.objects.filter(tutor=tutor)
+        .select_related("class_field")
+        .annotate(submit_count=Count("assignmentsubmissions"))
+        .order_by("-created_at")
+    )
+    assignment_data = []
+    for a in assignments:
+        assignment_data.append({
+            "id": a.id,
+            "title": a.title,
+            "class": a.class_field.class_name if a.class_field else "-",
+            "submits": a.submit_count,
+            "date": a.due_date.strftime("%d %B %Y") if a.due_date else "-"
+        })
+    return assignment_data
+
+
+def tutor_home_groups(tutor, today):
+    """Grup query beranda tutor yang saling independen (dipakai view sync & async)."""
+    return {
+        "schedule": lambda: tutor_home_schedule(tutor, today),
+        "materials": lambda: tutor_home_materials(tutor),
+        "assignments": lambda: tutor_home_assignments(tutor),
+        "materials_uploaded": Materials.objects.filter(tutor=tutor).count,
+        "assignments_review": AssignmentSubmissions.objects.filter(assignment__tutor=tutor).count,
+    }
+
+
+def tutor_home_payload(results):
+    schedule_data, status_summary = results["schedule"]
+    return {
+        "schedule": schedule_data,
+        "materials": results["materials"],
+        "assignments": results["assignments"],
+        "summary": {
+            "classes_today": len(schedule_data),
+            "materials_uploaded": results["materials_uploaded"],
+            "assignments_review": results["assignments_review"],
+        },
+        "status_summary_today": status_summary,
+    }
+
+def attendance_timeline(attendance_qs, group_by="week", limit=MAX_TIMELINE_BUCKETS):
+    """Kehadiran dijumlahkan per minggu/bulan (maks `limit` periode terakhir), bukan per baris."""
+    buckets = (
+        attendance_qs
+        .filter(timestamp__isnull=False)
+        .annotate(period=TIMELINE_TRUNC[group_by]("timestamp"))
+        .values("period")
+        .annotate(total=Count("id"), confirmed=Count("id", filter=Q(confirmed_by_student=True)))
+        .order_by("-period")[:limit]
+    )
+
+    return [
+        {
+            "period": b["period"].strftime("%Y-%m-%d"),
+            "total": b["total"],
+            "confirmed": b["confirmed"],
+            "percent": int((b["confirmed"] / b["total"]) * 100) if b["total"] else 0,
+        }
+        for b in reversed(list(buckets))
+    ]
+
+
+def archive_name(text):
+    return re.sub(r"[^\w.-]+", "_", text or "").strip("_") or "file"
+
+
+def submission_archive_entries(assignment_id):
+    """
+    (nama di ZIP, path absolut) untuk setiap jawaban tugas, dinamai <nama_siswa>_<id>.<ext>.
+    Dibaca dengan iterator supaya memori tidak bertambah seiring jumlah siswa.
+    File yang hilang dari storage dicatat di FILE_TIDAK_DITEMUKAN.txt di akhir arsip.
+    """
+    rows = (
+        AssignmentSubmissions.objects
+        .filter(assignment_id=assignment_id)
+        .exclude(file_url__isnull=True).exclude(file_url="")
+        .order_by("student__full_name", "student_id")
+        .values_list("student_id", "student__full_name", "file_url")
+    )
+
+    missing = []
+    for student_id, full_name, file_url in rows.iterator(chunk_size=200):
+        name = f"{archive_name(full_name)}_{student_id}"
+        full_path = resolve_media_file(relative_media_path(file_url))
+        if full_path is None:
+            missing.append(name)
+            continue
+        yield name + os.path.splitext(full_path)[1].lower(), full_path
+
+    if missing:
+        yield "FILE_TIDAK_DITEMUKAN.txt", "\n".join(missing).encode()
+
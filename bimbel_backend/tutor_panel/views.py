@@ -1,14 +1,14 @@
 # 🔧 Python built-in
 import os
-import uuid
 from datetime import date, datetime, timedelta
 from collections import Counter
-from urllib.parse import urljoin
 
 # 🔌 Django & DRF
 from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.views import View
 from django.db import transaction
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, Q, FilteredRelation, F
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
 from django.core.files.storage import default_storage
@@ -35,17 +35,39 @@ from accounts.models import (
     TutorExpertise,
     TutorAvailability,
     AppSettings,
-    StudentClasses,
     RescheduleRequests,
     TutorClasses,
-    Subjects,
     ScheduleAssignments,
 )
 
 # ⚙️ Utilities
-from .utils import get_tutor_by_user, get_schedule_status
+from accounts.aio import gather_query_groups, json_response, run_query_groups
+from accounts.blobs import store_uploaded_file
+from accounts.enrollment import current_enrollments, with_current_class
+from accounts.cache import cache_response, invalidate_tags_on_commit
+from accounts.media import get_media_user, media_url_builder, stream_zip
+from accounts.photos import photo_url_for_size, photo_variants, schedule_photo_variants
+from accounts.reference import reference_data
+from accounts.rollups import (
+    attendance_percent,
+    attendance_totals,
+    attendance_totals_by,
+    refresh_attendance_rollups_on_commit,
+)
+from accounts.uploads import UploadError, take_completed_upload
+from accounts.exports import (
+    export_response,
+    parse_export_params,
+    attendance_rows,
+    gradebook_rows,
+    ATTENDANCE_HEADER,
+    GRADEBOOK_HEADER,
+)
+from .utils import get_tutor_by_user, get_schedule_status, tutor_cache_tags, attendance_timeline, TIMELINE_TRUNC, archive_name, submission_archive_entries, tutor_home_groups, tutor_home_payload
+from .analytics import np, grade_statistics, submission_curve, per_assignment_summary
 
 class TutorHomeView(APIView):
+    @cache_response(tags=tutor_cache_tags)
     def get(self, request):
         user_id = request.query_params.get("user_id")
 
@@ -65,69 +87,34 @@ class TutorHomeView(APIView):
         except:
             return Response({"error": "Profil tutor tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        today = date.today()
+        results = run_query_groups(tutor_home_groups(tutor, date.today()))
+        return Response(tutor_home_payload(results), status=status.HTTP_200_OK)
 
-        # Jadwal hari ini
-        schedules = Schedules.objects.filter(tutor=tutor, schedule_date=today).select_related("class_field", "subject")
-        schedule_data = []
-        status_counter = Counter()
 
-        for s in schedules:
-            subject_name = s.subject.name if s.subject else "-"
-            class_name = s.class_field.class_name if s.class_field else "-"
-            reschedule_obj = RescheduleRequests.objects.filter(schedule=s).first()
-            reschedule_status = reschedule_obj.status if reschedule_obj else None
-            dynamic_status = get_schedule_status(s, reschedule_status)
+class AsyncTutorHomeView(View):
+    """
+    Varian async TutorHomeView (payload sama, tanpa cache response): grup query jalan bersamaan.
+    Butuh server ASGI (uvicorn) supaya request lain tidak menunggu selama query berjalan.
+    """
 
-            schedule_data.append({
-                "id": s.id,
-                "status": dynamic_status,
-                "subject": f"{subject_name} - {class_name}",
-                "time": f"{s.start_time.strftime('%H:%M')} - {s.end_time.strftime('%H:%M')}" if s.start_time and s.end_time else "-",
-                "room": s.room or "-",
-            })
-
-            status_counter[dynamic_status] += 1
+    async def get(self, request):
+        user_id = request.GET.get("user_id")
+        if not user_id:
+            return json_response({"error": "user_id diperlukan"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Materi terbaru
-        materials = Materials.objects.filter(tutor=tutor).order_by("-uploaded_at")[:5]
-        material_data = [
-            {
-                "id": m.id,
-                "title": m.title,
-                "status": "Published" if m.is_approved else "Draft",
-                "subject": m.subject or "-"
-            }
-            for m in materials
-        ]
+        user = await Users.objects.filter(id=user_id).afirst() if user_id.isdigit() else None
+        if user is None:
+            return json_response({"error": "User tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Tugas terbaru dan jumlah submit
-        assignments = Assignments.objects.filter(tutor=tutor).order_by("-created_at")
-        assignment_data = []
-        for a in assignments:
-            submit_count = AssignmentSubmissions.objects.filter(assignment=a).count()
-            assignment_data.append({
-                "id": a.id,
-                "title": a.title,
-                "class": a.class_field.class_name if a.class_field else "-",
-                "submits": submit_count,
-                "date": a.due_date.strftime("%d %B %Y") if a.due_date else "-"
-            })
+        if user.role != 'tutor':
+            return json_response({"error": "Akses ditolak, bukan tutor"}, status=status.HTTP_403_FORBIDDEN)
 
-        # Ringkasan
-        summary = {
-            "classes_today": schedules.count(),
-            "materials_uploaded": Materials.objects.filter(tutor=tutor).count(),
-            "assignments_review": AssignmentSubmissions.objects.filter(assignment__tutor=tutor).count()
-        }
+        tutor = await Tutors.objects.filter(user=user).afirst()
+        if tutor is None:
+            return json_response({"error": "Profil tutor tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        return Response({
-            "schedule": schedule_data,
-            "materials": material_data,
-            "assignments": assignment_data,
-            "summary": summary,
-            "status_summary_today": dict(status_counter) 
-        }, status=status.HTTP_200_OK)
+        results = await gather_query_groups(tutor_home_groups(tutor, date.today()))
+        return json_response(tutor_home_payload(results))
 
 class TutorUserInfoView(APIView):
     def get(self, request):
@@ -149,9 +136,8 @@ class TutorUserInfoView(APIView):
         except Tutors.DoesNotExist:
             return Response({"error": "Data tutor tidak ditemukan"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Ambil daftar subject dari relasi many-to-many via TutorExpertise
-        subjects = TutorExpertise.objects.filter(tutor=tutor).select_related("subject")
-        subject_names = [s.subject.name for s in subjects]
+        # Daftar subject dari TutorExpertise (registry referensi)
+        subject_names = reference_data().tutor_subject_names(tutor.id)
 
         return Response({
             "user_id": user.id,
@@ -160,6 +146,8 @@ class TutorUserInfoView(APIView):
             "email": user.email,
             "role": user.role,
             "photo_url": user.photo_url,
+            "avatar_url": photo_url_for_size(user.photo_url, 48),
+            "photo_variants": photo_variants(user.photo_url),
             "phone": user.phone,
             "address": user.address,
             "bio": user.bio,
@@ -187,7 +175,8 @@ class TutorProfileView(APIView):
             "phone": user.phone,
             "address": user.address,
             "bio": user.bio,
-            "photo_url": user.photo_url or "/media/profile/default-avatar.png"
+            "photo_url": user.photo_url or "/media/profile/default-avatar.png",
+            "photo_variants": photo_variants(user.photo_url),
         })
 
     def put(self, request):
@@ -218,6 +207,7 @@ class TutorProfileView(APIView):
                     destination.write(chunk)
 
             user.photo_url = f"/media/{file_name}"
+            schedule_photo_variants(user.photo_url)
 
         user.save()
 
@@ -365,22 +355,20 @@ class TutorFeedbackListView(APIView):
         except Tutors.DoesNotExist:
             return Response({"error": "Tutor tidak ditemukan"}, status=404)
 
-        feedbacks = Feedbacks.objects.filter(
+        # Kelas aktif siswa ikut di-join, bukan query per feedback
+        feedbacks = with_current_class(Feedbacks.objects.filter(
             tutor=tutor,
             is_approved=True,
             student__isnull=False
-        ).select_related("student").order_by("-created_at")
+        ), student_path="student").select_related("student").order_by("-created_at")
+
+        # Keahlian tutor sama untuk semua feedback
+        subject = reference_data().tutor_subject_text(tutor.id, empty="-")
 
         data = []
         for fb in feedbacks:
             sender = fb.student.full_name if fb.student else "Unknown"
-            subject = ", ".join([
-                te.subject.name for te in TutorExpertise.objects.filter(tutor=tutor)
-            ]) or "-"
-
-            # Ambil nama kelas dari StudentClasses
-            student_class = StudentClasses.objects.filter(student=fb.student).select_related("class_field").first()
-            class_name = student_class.class_field.class_name if student_class and student_class.class_field else "-"
+            class_name = fb.current_class_name or "-"
 
             summary = fb.comment[:50] + "..." if fb.comment else "-"
 
@@ -415,15 +403,12 @@ class TutorFeedbackDetailView(APIView):
         except Feedbacks.DoesNotExist:
             return Response({"error": "Feedback tidak ditemukan"}, status=404)
 
-        # Ambil class siswa (jika ada)
-        student_class = StudentClasses.objects.filter(student=feedback.student).select_related("class_field").first()
+        # Kelas aktif siswa (jika ada)
+        student_class = current_enrollments().filter(student=feedback.student).select_related("class_field").first()
         class_name = student_class.class_field.class_name if student_class and student_class.class_field else "-"
 
         # Ambil subject dari TutorExpertise
-        subject_list = [
-            te.subject.name for te in TutorExpertise.objects.filter(tutor=tutor).select_related("subject")
-        ]
-        subject_str = ", ".join(subject_list) if subject_list else "-"
+        subject_str = reference_data().tutor_subject_text(tutor.id, empty="-")
 
         data = {
             "id": feedback.id,
@@ -459,6 +444,11 @@ class TutorScheduleListView(APIView):
 
         schedules = Schedules.objects.filter(tutor=tutor).select_related("class_field", "subject").order_by("-schedule_date")
 
+        # Status reschedule per jadwal sekali query; urut -id supaya yang tersisa = request pertama (seperti .first())
+        reschedule_statuses = dict(
+            RescheduleRequests.objects.filter(schedule__tutor=tutor).order_by("-id").values_list("schedule_id", "status")
+        )
+
         data = []
         status_counter = Counter()
 
@@ -468,9 +458,7 @@ class TutorScheduleListView(APIView):
             time_str = f"{s.start_time.strftime('%H:%M')}–{s.end_time.strftime('%H:%M')}" if s.start_time and s.end_time else "-"
             subject_name = s.subject.name if s.subject else "-"
 
-            reschedule_obj = RescheduleRequests.objects.filter(schedule=s).first()
-            reschedule_status = reschedule_obj.status if reschedule_obj else None
-            dynamic_status = get_schedule_status(s, reschedule_status)
+            dynamic_status = get_schedule_status(s, reschedule_statuses.get(s.id))
 
             status_counter[dynamic_status] += 1
 
@@ -491,6 +479,9 @@ class TutorScheduleListView(APIView):
         }, status=200)
 
 class TutorScheduleDetailView(APIView):
+    # GET ini membuat baris attendance yang belum ada: baca & tulis di primary
+    db_read_primary = True
+
     def get(self, request, schedule_id):
         user_id = request.query_params.get("user_id")
         if not user_id:
@@ -502,6 +493,8 @@ class TutorScheduleDetailView(APIView):
         except (Tutors.DoesNotExist, Schedules.DoesNotExist):
             return Response({"error": "Jadwal tidak ditemukan"}, status=404)
 
+        media_url = media_url_builder(request, user_id)
+
         # Semua materi berdasarkan subject & class (untuk opsi pemilihan materi)
         materials = Materials.objects.filter(
             subject=schedule.subject.name,
@@ -514,7 +507,7 @@ class TutorScheduleDetailView(APIView):
                 "title": m.title,
                 "type": m.type,
                 "status": "Published" if m.is_approved else "Draft",
-                "file_url": request.build_absolute_uri(settings.MEDIA_URL + m.file_url) if m.file_url else ""
+                "file_url": media_url(m.file_url) or ""
             } for m in materials
         ]
 
@@ -529,28 +522,40 @@ class TutorScheduleDetailView(APIView):
                 "title": m.title,
                 "type": m.type,
                 "status": "Published" if m.is_approved else "Draft",
-                "file_url": request.build_absolute_uri(settings.MEDIA_URL + m.file_url) if m.file_url else ""
+                "file_url": media_url(m.file_url) or ""
             } for m in selected_materials
         ]
 
         assignment_ids = ScheduleAssignments.objects.filter(schedule=schedule).values_list("assignment_id", flat=True)
-        assignments = Assignments.objects.filter(id__in=assignment_ids)
+        assignments = Assignments.objects.filter(id__in=assignment_ids).annotate(submit_count=Count("assignmentsubmissions"))
 
         assignment_data = []
         for a in assignments:
-            count = AssignmentSubmissions.objects.filter(assignment=a).count()
             assignment_data.append({
                 "title": a.title,
                 "due_date": a.due_date.strftime('%Y-%m-%d') if a.due_date else "-",
-                "submits": count,
+                "submits": a.submit_count,
             })
 
 
-        # Tambahkan ini
-        student_ids = StudentClasses.objects.filter(class_field=schedule.class_field).values_list('student_id', flat=True)
-        with transaction.atomic():
-            for student_id in student_ids:
-                Attendance.objects.get_or_create(schedule=schedule, student_id=student_id)
+        # Baris absensi yang belum ada dibuat sekaligus, bukan get_or_create per siswa
+        student_ids = dict.fromkeys(
+            current_enrollments().filter(class_field=schedule.class_field).values_list('student_id', flat=True)
+        )
+        existing_ids = set(
+            Attendance.objects.filter(schedule=schedule, student_id__in=student_ids).values_list("student_id", flat=True)
+        )
+        created_ids = [student_id for student_id in student_ids if student_id not in existing_ids]
+        if created_ids:
+            with transaction.atomic():
+                Attendance.objects.bulk_create([
+                    Attendance(schedule=schedule, student_id=student_id) for student_id in created_ids
+                ])
+                # bulk_create tidak memicu signal cache
+                invalidate_tags_on_commit(
+                    "attendance", f"schedule:{schedule.id}", *(f"student:{student_id}" for student_id in created_ids)
+                )
+                refresh_attendance_rollups_on_commit(schedule, created_ids)
 
         # Kemudian baru ini jalan
         attendance_qs = Attendance.objects.filter(schedule=schedule).select_related("student")
@@ -574,7 +579,7 @@ class TutorScheduleDetailView(APIView):
         } if reschedule else None
 
         # Rangkuman
-        student_count = StudentClasses.objects.filter(class_field=schedule.class_field).count()
+        student_count = current_enrollments().filter(class_field=schedule.class_field).count()
 
         return Response({
             "schedule": {
@@ -636,6 +641,7 @@ class AddAssignmentView(APIView):
         due_date = request.data.get("due_date", "")
         user_id = request.data.get("user_id")
         uploaded_file = request.FILES.get("file")
+        upload_id = request.data.get("upload_id")  # hasil upload bertahap (/api/uploads/)
 
         if not (title and description and due_date and user_id):
             return Response({"error": "Semua field wajib diisi"}, status=400)
@@ -648,14 +654,13 @@ class AddAssignmentView(APIView):
             return Response({"error": "Data tidak valid"}, status=404)
 
         file_url = None
-        if uploaded_file:
-            filename = f"tugas/{datetime.now().strftime('%Y%m%d%H%M%S')}_{uploaded_file.name}"
-            file_path = os.path.join(settings.MEDIA_ROOT, filename)
-            os.makedirs(os.path.dirname(file_path), exist_ok=True)
-            with open(file_path, 'wb+') as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
-            file_url = f"/media/{filename}"
+        if upload_id:
+            try:
+                file_url = take_completed_upload(upload_id, 'assignment', user_id=user_id)
+            except UploadError as e:
+                return Response({"error": str(e)}, status=e.status)
+        elif uploaded_file:
+            file_url = store_uploaded_file(uploaded_file)
 
         # ✅ Simpan tugas terlebih dahulu
         new_assignment = Assignments.objects.create(
@@ -681,18 +686,39 @@ class MarkAttendanceView(APIView):
     def post(self, request, schedule_id):
         attendance_data = request.data.get("attendance", [])
 
-        for item in attendance_data:
-            student_id = item.get("student_id")
-            marked = item.get("marked_by_tutor", False)
-
-            Attendance.objects.update_or_create(
-                schedule_id=schedule_id,
-                student_id=student_id,
-                defaults={
-                    "marked_by_tutor": marked,
-                    "timestamp": datetime.now()
-                }
+        schedule = Schedules.objects.filter(id=schedule_id).first()
+        if not schedule:
+            return Response({"error": "Jadwal tidak ditemukan"}, status=404)
+
+        try:
+            marks = {
+                int(item["student_id"]): item.get("marked_by_tutor", False)
+                for item in attendance_data if item.get("student_id")
+            }
+        except (TypeError, ValueError):
+            return Response({"error": "student_id tidak valid"}, status=400)
+
+        # Semua siswa sekaligus (bukan update_or_create per siswa): jumlah query tetap berapa pun isi kelasnya
+        now = datetime.now()
+        with transaction.atomic():
+            existing = {
+                a.student_id: a
+                for a in Attendance.objects.select_for_update().filter(schedule=schedule, student_id__in=marks)
+            }
+            for student_id, attendance in existing.items():
+                attendance.marked_by_tutor = marks[student_id]
+                attendance.timestamp = now
+            Attendance.objects.bulk_update(existing.values(), ["marked_by_tutor", "timestamp"])
+            Attendance.objects.bulk_create([
+                Attendance(schedule=schedule, student_id=student_id, marked_by_tutor=marked, timestamp=now)
+                for student_id, marked in marks.items() if student_id not in existing
+            ])
+
+            # bulk_update/bulk_create tidak memicu signal cache
+            invalidate_tags_on_commit(
+                "attendance", f"schedule:{schedule.id}", *(f"student:{student_id}" for student_id in marks)
             )
+            refresh_attendance_rollups_on_commit(schedule, marks)
 
         return Response({"message": "Absensi berhasil diperbarui"}, status=200)
 
@@ -726,6 +752,7 @@ class RequestRescheduleView(APIView):
         return Response({"message": "Permintaan reschedule berhasil dikirim"}, status=201)
 
 class TutorTeachingDashboardView(APIView):
+    @cache_response(tags=tutor_cache_tags)
     def get(self, request):
         user_id = request.query_params.get("user_id")
 
@@ -755,22 +782,27 @@ class TutorTeachingDashboardView(APIView):
                 "subject": m.subject or "-",
                 "classRange": m.class_field.class_name if m.class_field else "-",
                 "type": m.type,
-                "uploadDate": m.uploaded_at.strftime("%Y-%m-%d") if m.uploaded_at else "-"
+                "uploadDate": m.uploaded_at.date() if m.uploaded_at else "-"
             })
 
         # Assignments
-        assignment_qs = Assignments.objects.filter(tutor=tutor).select_related("class_field").order_by("-created_at")
+        assignment_qs = (
+            Assignments.objects.filter(tutor=tutor)
+            .select_related("class_field")
+            .annotate(submit_count=Count("assignmentsubmissions"))
+            .order_by("-created_at")
+        )
+        media_url = media_url_builder(request, user_id)
         assignments = []
         for a in assignment_qs:
-            submit_count = AssignmentSubmissions.objects.filter(assignment=a).count()
             assignments.append({
                 "id": a.id,
                 "title": a.title,
                 "classRange": a.class_field.class_name if a.class_field else "-",
-                "dueDate": a.due_date.strftime("%Y-%m-%d") if a.due_date else "-",
-                "fileUrl": a.file_url,
-                "submissions": submit_count,
-                "createdAt": a.created_at.strftime("%Y-%m-%d") if a.created_at else "-"
+                "dueDate": a.due_date.date() if a.due_date else "-",
+                "fileUrl": media_url(a.file_url),
+                "submissions": a.submit_count,
+                "createdAt": a.created_at.date() if a.created_at else "-"
             })
 
         return Response({
@@ -787,10 +819,11 @@ class TutorAddMaterialView(APIView):
             material_type = request.data.get("type", "").strip()
             subject = request.data.get("subject", "").strip()
             uploaded_file = request.FILES.get("file")
+            upload_id = request.data.get("upload_id")  # hasil upload bertahap (/api/uploads/)
             user_id = request.data.get("user_id")
             class_id = request.data.get("class_id")
 
-            if not all([title, material_type, subject, uploaded_file, user_id, class_id]):
+            if not all([title, material_type, subject, uploaded_file or upload_id, user_id, class_id]):
                 return Response({"error": "Semua field wajib diisi."}, status=400)
 
             try:
@@ -808,22 +841,28 @@ class TutorAddMaterialView(APIView):
             allowed_types = types_setting.value.split(",") if types_setting else ["pdf", "mp4", "docx"]
             auto_approve = auto_approve_setting.value.lower() == "true" if auto_approve_setting else False
 
-            ext = os.path.splitext(uploaded_file.name)[1][1:].lower()
-            size_mb = uploaded_file.size / (1024 * 1024)
-
-            if ext not in allowed_types:
-                return Response({
-                    "error": f"Tipe file .{ext} tidak diizinkan. Diizinkan: {', '.join(allowed_types)}"
-                }, status=400)
-
-            if size_mb > max_mb:
-                return Response({
-                    "error": f"Ukuran file melebihi batas {max_mb} MB"
-                }, status=400)
-
-            # Simpan file
-            unique_name = f"{uuid.uuid4().hex}.{ext}"
-            saved_path = default_storage.save(f"material/{unique_name}", uploaded_file)
+            if upload_id:
+                # Tipe & ukuran sudah divalidasi saat upload dimulai
+                try:
+                    saved_path = take_completed_upload(upload_id, "material", user_id=user_id)
+                except UploadError as e:
+                    return Response({"error": str(e)}, status=e.status)
+            else:
+                ext = os.path.splitext(uploaded_file.name)[1][1:].lower()
+                size_mb = uploaded_file.size / (1024 * 1024)
+
+                if ext not in allowed_types:
+                    return Response({
+                        "error": f"Tipe file .{ext} tidak diizinkan. Diizinkan: {', '.join(allowed_types)}"
+                    }, status=400)
+
+                if size_mb > max_mb:
+                    return Response({
+                        "error": f"Ukuran file melebihi batas {max_mb} MB"
+                    }, status=400)
+
+                # Simpan file (content-addressed: file yang sama hanya disimpan sekali)
+                saved_path = store_uploaded_file(uploaded_file)
 
             # Simpan ke database
             Materials.objects.create(
@@ -855,31 +894,34 @@ class TutorAddAssignmentView(APIView):
             subject_name = request.data.get("subject", "").strip()
             user_id = request.data.get("user_id")
             uploaded_file = request.FILES.get("file")
+            upload_id = request.data.get("upload_id")  # hasil upload bertahap (/api/uploads/)
 
             if not all([title, due_date, class_id, subject_name, user_id]):
                 return Response({"error": "Semua field wajib diisi."}, status=400)
 
-            try:
-                tutor = Tutors.objects.get(user__id=user_id)
-                class_obj = Classes.objects.get(id=class_id)
-                subject_obj = Subjects.objects.get(name=subject_name)
-            except (Tutors.DoesNotExist, Classes.DoesNotExist, Subjects.DoesNotExist):
+            reference = reference_data()
+            subject_id = reference.subject_id(subject_name, exact=True)
+            class_id = reference.active_class_id(class_id)
+            tutor = Tutors.objects.filter(user__id=user_id).first()
+            if not tutor or class_id is None or subject_id is None:
                 return Response({"error": "Tutor, kelas, atau subject tidak valid."}, status=404)
 
             file_url = None
-            if uploaded_file:
-                ext = os.path.splitext(uploaded_file.name)[1]
-                unique_name = f"{uuid.uuid4().hex}{ext}"
-                saved_path = default_storage.save(f"tugas/{unique_name}", uploaded_file)
-                file_url = f"/media/{saved_path}"
+            if upload_id:
+                try:
+                    file_url = take_completed_upload(upload_id, 'assignment', user_id=user_id)
+                except UploadError as e:
+                    return Response({"error": str(e)}, status=e.status)
+            elif uploaded_file:
+                file_url = store_uploaded_file(uploaded_file)
 
             Assignments.objects.create(
                 title=title,
                 description=description,
                 due_date=due_date,
                 file_url=file_url,
-                class_field=class_obj,
-                subject=subject_obj,
+                class_field_id=class_id,
+                subject_id=subject_id,
                 tutor=tutor,
                 created_at=timezone.now()
             )
@@ -923,12 +965,9 @@ class TutorEditMaterialView(APIView):
         material.class_field = class_obj
         material.tutor = tutor
 
-        # Jika ada file baru diunggah, simpan dan ganti file lama
+        # Jika ada file baru diunggah, simpan dan ganti file lama (file lama dilepas lewat signal saat save)
         if uploaded_file:
-            ext = os.path.splitext(uploaded_file.name)[1]
-            unique_name = f"{uuid.uuid4().hex}{ext}"
-            saved_path = default_storage.save(f"material/{unique_name}", uploaded_file)
-            material.file_url = saved_path
+            material.file_url = store_uploaded_file(uploaded_file)
 
         material.uploaded_at = timezone.now()
         material.is_approved = False 
@@ -965,7 +1004,7 @@ class TutorMaterialDetailView(APIView):
             "status": "Published" if material.is_approved else "Draft",
             "uploaded_by": material.tutor.full_name if material.tutor else "Admin",
             "uploaded_at": material.uploaded_at,
-            "file_url": request.build_absolute_uri(settings.MEDIA_URL + material.file_url) if material.file_url else None,
+            "file_url": media_url_builder(request, request.query_params.get("user_id"))(material.file_url),
             "used_in_schedules": used_in
         })
         
@@ -979,12 +1018,11 @@ class TutorAssignmentDetailView(APIView):
         # Cari subject
         subject_name = "-"
         if assignment.tutor:
-            expertise = TutorExpertise.objects.filter(tutor=assignment.tutor).select_related("subject").first()
-            if expertise and expertise.subject:
-                subject_name = expertise.subject.name
+            subject_name = next(iter(reference_data().tutor_subject_names(assignment.tutor_id)), "-")
 
         # Ambil submissions
         submissions = AssignmentSubmissions.objects.filter(assignment=assignment).select_related("student")
+        media_url = media_url_builder(request, request.query_params.get("user_id"))
         submission_data = [
             {
                 "student_name": s.student.full_name if s.student else "-",
@@ -992,7 +1030,7 @@ class TutorAssignmentDetailView(APIView):
                 "status": "Submitted" if s.submitted_at else "Not Submitted",  # ✅ Tambahan status
                 "grade": s.grade,
                 "feedback": s.feedback,
-                "file_url": request.build_absolute_uri(urljoin(settings.MEDIA_URL, s.file_url)) if s.file_url else None if s.file_url else None
+                "file_url": media_url(s.file_url)
             }
             for s in submissions
         ]
@@ -1003,7 +1041,7 @@ class TutorAssignmentDetailView(APIView):
             "description": assignment.description,
             "due_date": assignment.due_date.isoformat() if assignment.due_date else None,
             "created_at": assignment.created_at.isoformat() if assignment.created_at else None,
-            "file_url": request.build_absolute_uri(settings.MEDIA_URL + assignment.file_url) if assignment.file_url else None,
+            "file_url": media_url(assignment.file_url),
             "class_id": assignment.class_field.id if assignment.class_field else None,
             "class_name": assignment.class_field.class_name if assignment.class_field else "-",
             "subject": subject_name,
@@ -1012,6 +1050,37 @@ class TutorAssignmentDetailView(APIView):
             "submissions": submission_data
         })
         
+class TutorAssignmentSubmissionsDownloadView(APIView):
+    def get(self, request, assignment_id):
+        user = get_media_user(request.query_params.get("user_id"))
+        if user is None:
+            return Response({"error": "user_id tidak valid"}, status=400)
+
+        try:
+            assignment = Assignments.objects.get(id=assignment_id)
+        except Assignments.DoesNotExist:
+            return Response({"error": "Assignment not found"}, status=404)
+
+        # Hanya admin, tutor pembuat tugas, atau tutor yang mengajar kelas tersebut
+        if user.role != "admin":
+            tutor = Tutors.objects.filter(user=user).first()
+            if user.role != "tutor" or tutor is None:
+                return Response({"error": "Akses ditolak"}, status=403)
+            teaches_class = TutorClasses.objects.filter(tutor=tutor, class_field_id=assignment.class_field_id).exists()
+            if assignment.tutor_id != tutor.id and not teaches_class:
+                return Response({"error": "Akses ditolak"}, status=403)
+
+        # ZIP dibangun sambil dikirim: tanpa file sementara, memori konstan berapa pun jumlah siswa
+        response = StreamingHttpResponse(
+            stream_zip(submission_archive_entries(assignment.id)),
+            content_type="application/zip",
+        )
+        filename = f"{archive_name(assignment.title)}_jawaban.zip"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["Cache-Control"] = "no-store"
+        return response
+
+
 class GradeAssignmentSubmissionView(APIView):
     def post(self, request, assignment_id):
         student_name = request.data.get("student_name")
@@ -1062,25 +1131,22 @@ class TutorEditAssignmentView(APIView):
         if not all([title, description, due_date, class_id, subject, user_id]):
             return Response({"error": "Semua field wajib diisi."}, status=400)
 
-        try:
-            tutor = Tutors.objects.get(user__id=user_id)
-            class_obj = Classes.objects.get(id=class_id)
-            subject_obj = Subjects.objects.get(name=subject)
-        except (Tutors.DoesNotExist, Classes.DoesNotExist, Subjects.DoesNotExist):
+        reference = reference_data()
+        subject_id = reference.subject_id(subject, exact=True)
+        class_id = reference.active_class_id(class_id)
+        tutor = Tutors.objects.filter(user__id=user_id).first()
+        if not tutor or class_id is None or subject_id is None:
             return Response({"error": "Tutor, kelas, atau subject tidak valid."}, status=404)
 
         assignment.title = title
         assignment.description = description
         assignment.due_date = due_date
-        assignment.class_field = class_obj
-        assignment.subject = subject_obj
+        assignment.class_field_id = class_id
+        assignment.subject_id = subject_id
         assignment.tutor = tutor
 
         if uploaded_file:
-            ext = os.path.splitext(uploaded_file.name)[1]
-            unique_name = f"{uuid.uuid4().hex}{ext}"
-            saved_path = default_storage.save(f"tugas/{unique_name}", uploaded_file)
-            assignment.file_url = f"/media/{saved_path}"
+            assignment.file_url = store_uploaded_file(uploaded_file)
 
         assignment.save()
 
@@ -1122,6 +1188,7 @@ class StudentPerformanceView(APIView):
         user_id = request.query_params.get("user_id")
         class_filter = request.query_params.get("class", "")
         subject_filter = request.query_params.get("subject", "")
+        page_size = request.query_params.get("page_size")
 
         if not user_id:
             return Response({"error": "user_id diperlukan"}, status=400)
@@ -1131,69 +1198,75 @@ class StudentPerformanceView(APIView):
         except Tutors.DoesNotExist:
             return Response({"error": "Tutor tidak ditemukan"}, status=404)
 
-        # Ambil semua kelas yang diajar tutor
-        tutor_classes = TutorClasses.objects.filter(tutor=tutor).values_list("class_field", flat=True)
-
-        # Ambil semua siswa dari kelas-kelas tersebut
-        student_ids = StudentClasses.objects.filter(class_field__in=tutor_classes).values_list("student_id", flat=True)
-
-        # Filter siswa
-        students = Students.objects.filter(id__in=student_ids)
+        # Siswa yang kelas aktifnya diajar tutor; kelas aktif lewat satu join ke student_classes (is_current)
+        students = (
+            with_current_class(Students.objects)
+            .filter(current_enrollment__class_field__tutorclasses__tutor=tutor)
+            .annotate(class_id=F("current_class_id"), class_name=F("current_class_name"))
+            .distinct()
+            .order_by("id")
+        )
 
         if class_filter:
-            students = students.filter(
-                id__in=StudentClasses.objects.filter(class_field__class_name=class_filter).values_list("student_id", flat=True)
-            )
+            students = students.filter(current_class_name=class_filter)
 
-        data = []
-
-        for student in students:
-            user = student.user
-            student_class = StudentClasses.objects.filter(student=student).select_related("class_field").first()
-            if not student_class:
-                continue
+        total = None
+        page = 1
+        if page_size:
+            try:
+                page_size = max(1, int(page_size))
+                page = max(1, int(request.query_params.get("page", 1)))
+            except ValueError:
+                return Response({"error": "page/page_size harus berupa angka"}, status=400)
+            total = students.count()
+            students = students[(page - 1) * page_size:page * page_size]
 
-            class_name = student_class.class_field.class_name
-            subject_name = subject_filter if subject_filter else None
+        rows = list(students.values("id", "full_name", "user__full_name", "class_id", "class_name"))
+        student_ids = [r["id"] for r in rows]
 
-            assignments = Assignments.objects.filter(
-                class_field=student_class.class_field,
-                tutor=tutor
-            )
-            if subject_filter:
-                assignments = assignments.filter(
-                    tutor__in=TutorExpertise.objects.filter(subject__name=subject_filter).values("tutor")
-                )
+        # Rata-rata nilai per (siswa, kelas) untuk tugas tutor ini, dalam satu query
+        submissions = AssignmentSubmissions.objects.filter(
+            student_id__in=student_ids,
+            assignment__tutor=tutor,
+        )
+        if subject_filter:
+            submissions = submissions.filter(assignment__subject__name=subject_filter)
 
-            assignment_ids = assignments.values_list("id", flat=True)
-            submissions = AssignmentSubmissions.objects.filter(
-                student=student,
-                assignment_id__in=assignment_ids
-            )
+        avg_map = {
+            (s["student_id"], s["assignment__class_field_id"]): s["avg"]
+            for s in submissions.values("student_id", "assignment__class_field_id").annotate(avg=Avg("grade"))
+        }
 
-            avg_score = submissions.aggregate(avg=Avg("grade"))["avg"] or 0
+        attendance_map = attendance_totals_by("student_id", student_id__in=student_ids)
 
-            attendance_qs = Attendance.objects.filter(student=student)
-            total_attendance = attendance_qs.count()
-            confirmed_attendance = attendance_qs.filter(confirmed_by_student=True).count()
-            attendance_percent = f"{int((confirmed_attendance / total_attendance) * 100)}%" if total_attendance > 0 else "0%"
+        subject_display = subject_filter or next(iter(reference_data().tutor_subject_names(tutor.id)), "-")
 
-            subject_display = subject_name or (
-                TutorExpertise.objects.filter(
-                    tutor=tutor
-                ).values_list("subject__name", flat=True).first() or "-"
-            )
+        data = []
+        for r in rows:
+            avg_score = avg_map.get((r["id"], r["class_id"])) or 0
 
             data.append({
-                "id": student.id,
-                "name": user.full_name,
-                "class": class_name,
+                "id": r["id"],
+                "name": r["user__full_name"] or r["full_name"],
+                "class": r["class_name"],
                 "subject": subject_display,
                 "avg_score": round(avg_score),
-                "attendance": attendance_percent,
+                "attendance": attendance_percent(attendance_map.get(r["id"])),
             })
 
-        return Response(data, status=200)
+        if total is None:
+            return Response(data, status=200)
+
+        return Response({
+            "results": data,
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+        }, status=200)
+
+
+ATTENDANCE_RAW_DAYS = 30
+ATTENDANCE_RAW_MAX_DAYS = 366
 
 
 class StudentPerformanceDetailView(APIView):
@@ -1206,7 +1279,7 @@ class StudentPerformanceDetailView(APIView):
         user = student.user
 
         student_class = (
-            StudentClasses.objects
+            current_enrollments()
             .filter(student=student)
             .select_related("class_field")
             .first()
@@ -1229,37 +1302,62 @@ class StudentPerformanceDetailView(APIView):
         )
         subject_name = subject or "-"
 
-        # Assignments & Submission
-        assignments = Assignments.objects.filter(class_field=class_field)
-        assignment_ids = assignments.values_list("id", flat=True)
-        submissions = AssignmentSubmissions.objects.filter(
-            student=student,
-            assignment_id__in=assignment_ids,
+        # Assignments & Submission: satu LEFT JOIN, submission siswa ini di-key by assignment_id
+        rows = (
+            Assignments.objects
+            .filter(class_field=class_field)
+            .annotate(sub=FilteredRelation(
+                "assignmentsubmissions",
+                condition=Q(assignmentsubmissions__student=student),
+            ))
+            .order_by("id", "sub__id")
+            .values_list("id", "title", "sub__grade", "sub__submitted_at")
         )
 
-        avg_score = submissions.aggregate(avg=Avg("grade"))["avg"] or 0
+        submissions_by_assignment = {}
+        for assignment_id, title, grade, submitted_at in rows:
+            submissions_by_assignment.setdefault(assignment_id, (title, grade, submitted_at))
 
-        assignment_data = []
-        for a in assignments:
-            sub = submissions.filter(assignment=a).first()
-            assignment_data.append({
-                "title": a.title,
-                "grade": sub.grade if sub else None,
-                "submitted_at": sub.submitted_at if sub else None,
-            })
+        assignment_data = [
+            {"title": title, "grade": grade, "submitted_at": submitted_at}
+            for title, grade, submitted_at in submissions_by_assignment.values()
+        ]
+        grades = [a["grade"] for a in assignment_data if a["grade"] is not None]
+        avg_score = sum(grades) / len(grades) if grades else 0
+
+        # Attendance: total + timeline per minggu/bulan, baris mentah hanya untuk rentang tertentu
+        group_by = request.query_params.get("group_by", "week")
+        if group_by not in TIMELINE_TRUNC:
+            return Response({"error": "group_by harus 'week' atau 'month'"}, status=400)
+
+        try:
+            start_date = request.query_params.get("start_date")
+            end_date = request.query_params.get("end_date")
+            end_date = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else timezone.localdate()
+            start_date = (
+                datetime.strptime(start_date, "%Y-%m-%d").date() if start_date
+                else end_date - timedelta(days=ATTENDANCE_RAW_DAYS)
+            )
+        except ValueError:
+            return Response({"error": "Format tanggal tidak valid (gunakan YYYY-MM-DD)"}, status=400)
+
+        if start_date > end_date or (end_date - start_date).days > ATTENDANCE_RAW_MAX_DAYS:
+            return Response({"error": f"Rentang tanggal maksimal {ATTENDANCE_RAW_MAX_DAYS} hari"}, status=400)
 
-        # Attendance
-        attendance_qs = Attendance.objects.filter(student=student).order_by("timestamp")
-        total = attendance_qs.count()
-        confirmed = attendance_qs.filter(confirmed_by_student=True).count()
-        attendance_percent = f"{int((confirmed / total) * 100)}%" if total > 0 else "0%"
+        attendance_qs = Attendance.objects.filter(student=student)
+        student_attendance_percent = attendance_percent(attendance_totals(student=student))
 
         attendance_data = [
             {
-                "date": a.timestamp.strftime("%Y-%m-%d") if a.timestamp else "-",
-                "confirmed": a.confirmed_by_student,
+                "date": timestamp.strftime("%Y-%m-%d"),
+                "confirmed": is_confirmed,
             }
-            for a in attendance_qs
+            for timestamp, is_confirmed in (
+                attendance_qs
+                .filter(timestamp__date__gte=start_date, timestamp__date__lte=end_date)
+                .order_by("timestamp")
+                .values_list("timestamp", "confirmed_by_student")
+            )
         ]
 
         # Feedback
@@ -1281,10 +1379,15 @@ class StudentPerformanceDetailView(APIView):
             "class_level": class_level,
             "subject": subject_name,
             "avg_score": round(avg_score),
-            "assignment_count": assignments.count(),
+            "assignment_count": len(assignment_data),
             "assignments": assignment_data,
-            "attendance_percent": attendance_percent,
+            "attendance_percent": student_attendance_percent,
             "attendance": attendance_data,
+            "attendance_range": {
+                "start_date": start_date.strftime("%Y-%m-%d"),
+                "end_date": end_date.strftime("%Y-%m-%d"),
+            },
+            "attendance_timeline": attendance_timeline(attendance_qs, group_by),
             "feedback": feedback_data
         })
         
@@ -1343,7 +1446,7 @@ class TutorGlobalSearchView(APIView):
             })
 
         # Siswa
-        student_ids = StudentClasses.objects.filter(
+        student_ids = current_enrollments().filter(
             class_field__in=TutorClasses.objects.filter(tutor=tutor).values_list("class_field", flat=True)
         ).values_list("student_id", flat=True)
 
@@ -1424,3 +1527,143 @@ class TutorNotificationStatusView(APIView):
                 "assignment_submits": submitted_assignments,
             }
         }, status=200)
+
+
+def _tutor_export_scope(request):
+    # Tutor hanya boleh mengekspor kelas yang diajarnya
+    user_id = request.query_params.get("user_id")
+    if not user_id:
+        return None, Response({"error": "user_id diperlukan"}, status=400)
+
+    try:
+        tutor = Tutors.objects.get(user__id=user_id)
+    except (Tutors.DoesNotExist, ValueError):
+        return None, Response({"error": "Tutor tidak ditemukan"}, status=404)
+
+    class_ids = set(TutorClasses.objects.filter(tutor=tutor).values_list("class_field_id", flat=True))
+    class_id = request.query_params.get("class_id")
+    if class_id:
+        if int(class_id) not in class_ids:
+            return None, Response({"error": "Kelas ini tidak diajar oleh tutor"}, status=403)
+        class_ids = {int(class_id)}
+
+    return list(class_ids), None
+
+
+class TutorAttendanceExportView(APIView):
+    def get(self, request):
+        try:
+            file_type, start_date, end_date = parse_export_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        class_ids, error = _tutor_export_scope(request)
+        if error:
+            return error
+
+        try:
+            return export_response(
+                file_type, "attendance", ATTENDANCE_HEADER,
+                attendance_rows(class_ids=class_ids, start_date=start_date, end_date=end_date),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+
+class TutorGradebookExportView(APIView):
+    def get(self, request):
+        try:
+            file_type, _, _ = parse_export_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+        class_ids, error = _tutor_export_scope(request)
+        if error:
+            return error
+
+        try:
+            return export_response(
+                file_type, "gradebook", GRADEBOOK_HEADER,
+                gradebook_rows(class_ids=class_ids, assignment_id=request.query_params.get("assignment_id")),
+            )
+        except ValueError as e:
+            return Response({"error": str(e)}, status=400)
+
+
+class TutorGradebookAnalyticsView(APIView):
+    def get(self, request):
+        user_id = request.query_params.get("user_id")
+        class_id = request.query_params.get("class_id")
+        assignment_id = request.query_params.get("assignment_id")
+
+        if np is None:
+            return Response({"error": "Analytics membutuhkan paket numpy."}, status=500)
+
+        if not user_id or not (class_id or assignment_id):
+            return Response({"error": "user_id dan class_id atau assignment_id diperlukan"}, status=400)
+
+        try:
+            tutor = Tutors.objects.get(user__id=user_id)
+        except (Tutors.DoesNotExist, ValueError):
+            return Response({"error": "Tutor tidak ditemukan"}, status=404)
+
+        tutor_class_ids = set(TutorClasses.objects.filter(tutor=tutor).values_list("class_field_id", flat=True))
+
+        if assignment_id:
+            try:
+                assignment = Assignments.objects.select_related("class_field").get(id=assignment_id)
+            except (Assignments.DoesNotExist, ValueError):
+                return Response({"error": "Tugas tidak ditemukan"}, status=404)
+            if assignment.tutor_id != tutor.id and assignment.class_field_id not in tutor_class_ids:
+                return Response({"error": "Tugas ini bukan milik kelas tutor"}, status=403)
+
+            class_obj = assignment.class_field
+            assignments = [(assignment.id, assignment.title, assignment.due_date)]
+            submissions = AssignmentSubmissions.objects.filter(assignment=assignment)
+        else:
+            try:
+                class_obj = Classes.objects.get(id=class_id)
+            except (Classes.DoesNotExist, ValueError):
+                return Response({"error": "Kelas tidak ditemukan"}, status=404)
+            if class_obj.id not in tutor_class_ids:
+                return Response({"error": "Kelas ini tidak diajar oleh tutor"}, status=403)
+
+            assignments = list(
+                Assignments.objects.filter(class_field=class_obj)
+                .order_by("due_date", "id")
+                .values_list("id", "title", "due_date")
+            )
+            submissions = AssignmentSubmissions.objects.filter(assignment__class_field=class_obj)
+
+        roster_size = current_enrollments().filter(class_field=class_obj).count() if class_obj else 0
+
+        # Semua nilai diambil dalam satu query, sisanya dihitung vektor dengan numpy
+        rows = list(submissions.values_list("assignment_id", "grade", "submitted_at"))
+        assignment_col, grade_col, time_col = zip(*rows) if rows else ((), (), ())
+
+        grades = np.array(grade_col, dtype=float)
+        submitted_at = np.array(
+            [t.replace(tzinfo=None) if t else None for t in time_col], dtype="datetime64[s]"
+        )
+
+        assignment_ids = np.array([a[0] for a in assignments], dtype=np.int64)
+        sorter = np.argsort(assignment_ids)
+        assignment_index = sorter[np.searchsorted(assignment_ids, np.array(assignment_col, dtype=np.int64), sorter=sorter)]
+
+        expected = roster_size * len(assignments)
+        data = {
+            "scope": "assignment" if assignment_id else "class",
+            "class_id": class_obj.id if class_obj else None,
+            "class_name": class_obj.class_name if class_obj else "-",
+            "roster_size": roster_size,
+            "assignment_count": len(assignments),
+            "submission_count": len(rows),
+            "submission_rate": round(len(rows) / expected * 100, 1) if expected else 0.0,
+            "statistics": grade_statistics(grades),
+            "assignments": per_assignment_summary(assignment_index, grades, assignments, roster_size),
+        }
+
+        if assignment_id:
+            data["submission_curve"] = submission_curve(submitted_at, assignments[0][2], roster_size)
+
+        return Response(data, status=200)